@@ -3,19 +3,29 @@ FastAPI backend for Living Script.
 Serves scenes, generation, versions.
 """
 
+import json
 from pathlib import Path
 import sys
+import time
+from typing import Optional
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 
-from engine.graph import load_scenes
-from engine.generator import build_prompt, generate
+from engine import metrics
+from engine.graph import get_scene_store
+from engine.generator import agenerate, astream_generate, replay_events
 from engine.controls import ModulationParams
-from engine.memory import save_version, load_version, list_versions
+from engine.prefetch import get_prefetcher
+from engine.scheduler import get_scheduler
+from engine.memory import save_version, load_version, list_versions, latest_version_id, version_cursor
+from engine.dialogue import dialogue_of
 from engine.diff import text_diff, metadata_diff
+from engine.timeline import scene_timeline
 
 app = FastAPI(title="Living Script API")
 app.add_middleware(
@@ -24,21 +34,105 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
 
+class TimingMiddleware:
+    """
+    Records request latency per route. A request with an "X-Trace: 1" header gets a
+    Server-Timing response header with the stage timings (scenes, characters, prompt,
+    model, validate, save) measured before the response started.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.ENABLED:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        trace = dict(scope["headers"]).get(b"x-trace") == b"1"
+        spans = metrics.start_trace() if trace else None
+
+        async def send_with_timing(message):
+            if spans is not None and message["type"] == "http.response.start":
+                spans.append(("total", time.perf_counter() - started))
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing(spans).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            metrics.REQUEST_SECONDS.observe(
+                time.perf_counter() - started, getattr(route, "path", "unmatched")
+            )
+
+
+app.add_middleware(TimingMiddleware)
+
+# Resident scene graph: parsed once, re-parsed per file only when it changes on disk.
+scene_store = get_scene_store()
+
+
 @app.get("/api/scenes")
 def api_scenes():
-    scenes = load_scenes()
-    return list(scenes.values())
+    return list(scene_store.scenes().values())
 
 
 @app.get("/api/scenes/{scene_id}")
 def api_scene(scene_id: str):
-    scenes = load_scenes()
-    if scene_id not in scenes:
+    scene = scene_store.get(scene_id)
+    if scene is None:
         return {"error": "Scene not found"}
-    return scenes[scene_id]
+    return scene
+
+
+@app.get("/api/graph")
+def api_graph(start: Optional[str] = None):
+    """
+    Graph panel data: dead ends, orphans, predecessors, and distances/reachability from start.
+    load_errors lists scene files left out of the graph (invalid JSON, no scene_id).
+    """
+    index = scene_store.graph_index()
+    try:
+        return {**index.summary(start), "load_errors": scene_store.load_errors()}
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+
+
+@app.get("/api/graph/route")
+def api_graph_route(source: str, target: Optional[str] = None):
+    """Shortest route from source to target, or to the nearest ending when target is omitted."""
+    index = scene_store.graph_index()
+    try:
+        path = index.shortest_path(source, target)
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+    return {"source": source, "target": target, "reachable": path is not None, "path": path}
+
+
+@app.get("/api/graph/scenes/{scene_id}")
+def api_graph_scene(scene_id: str):
+    """Neighbours of one scene and everything reachable from it."""
+    index = scene_store.graph_index()
+    try:
+        return {
+            "scene_id": scene_id,
+            "successors": index.successors(scene_id),
+            "predecessors": index.predecessors(scene_id),
+            "reachable": index.reachable_from(scene_id),
+        }
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+
+
+# Upper bound on best-of-N per request: each candidate is a concurrent provider call.
+MAX_CANDIDATES = 8
 
 
 class GenerateRequest(BaseModel):
@@ -46,36 +140,174 @@ class GenerateRequest(BaseModel):
     tension: float = 0.5
     emotional_distance: float = 0.5
     silence_density: float = 0.3
+    candidates: Optional[int] = Field(None, ge=1, le=MAX_CANDIDATES)  # best-of-N; None = server default
+    # Skips the generation cache. Prefetched results are still used: each is a fresh,
+    # single-use generation.
+    bypass_cache: bool = False
+    parent_version_id: Optional[str] = None  # None = the scene's latest version
+
+
+def _save_result(req: GenerateRequest, result: dict) -> str:
+    """Save a generated version, linked to its parent. Returns the version_id."""
+    parent = req.parent_version_id or latest_version_id(req.scene_id)
+    result["parent_version_id"] = parent
+    return save_version(
+        req.scene_id,
+        result["dialogue"],
+        result.get("constraints_snapshot", {}),
+        result.get("emotional_params", {}),
+        parent_version_id=parent,
+    )
 
 
 @app.post("/api/generate")
-def api_generate(req: GenerateRequest):
-    scenes = load_scenes()
-    if req.scene_id not in scenes:
+async def api_generate(req: GenerateRequest):
+    scene = scene_store.get(req.scene_id)
+    if scene is None:
         return {"error": "Scene not found"}
-    scene = scenes[req.scene_id]
     modulation = ModulationParams(
         tension=req.tension,
         emotional_distance=req.emotional_distance,
         silence_density=req.silence_density,
     )
+    prefetcher = get_prefetcher()
     try:
-        result = generate(scene, modulation=modulation, dry_run=False)
-        if result.get("dialogue"):
-            save_version(
-                req.scene_id,
-                result["dialogue"],
-                result.get("constraints_snapshot", {}),
-                result.get("emotional_params", {}),
+        result = None
+        if prefetcher:
+            result = await prefetcher.take(req.scene_id, modulation)
+        if result is None:
+            result = await agenerate(
+                scene,
+                modulation=modulation,
+                dry_run=False,
+                candidates=req.candidates,
+                use_cache=not req.bypass_cache,
             )
+        if result.get("dialogue"):
+            result["version_id"] = await run_in_threadpool(_save_result, req, result)
         return result
     except Exception as e:
         return {"error": str(e), "dialogue": ""}
 
 
+@app.post("/api/generate/stream")
+async def api_generate_stream(req: GenerateRequest):
+    """
+    Server-sent events: attempt, line, retry, done (or error).
+    The done event carries the generate() result plus the saved version_id and its parent.
+    """
+    scene = scene_store.get(req.scene_id)
+    if scene is None:
+        return {"error": "Scene not found"}
+    modulation = ModulationParams(
+        tension=req.tension,
+        emotional_distance=req.emotional_distance,
+        silence_density=req.silence_density,
+    )
+
+    prefetcher = get_prefetcher()
+
+    async def generated():
+        result = await prefetcher.take(req.scene_id, modulation) if prefetcher else None
+        if result is not None:
+            for event in replay_events(scene, result):
+                yield event
+            return
+        async for event in astream_generate(scene, modulation=modulation, use_cache=not req.bypass_cache):
+            yield event
+
+    async def events():
+        try:
+            async for event in generated():
+                if event["event"] == "done" and event["result"].get("dialogue"):
+                    result = event["result"]
+                    result["version_id"] = await run_in_threadpool(_save_result, req, result)
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class PrefetchRequest(BaseModel):
+    scene_id: str
+    tension: float = 0.5
+    emotional_distance: float = 0.5
+    silence_density: float = 0.3
+    session: str = "default"
+
+
+@app.post("/api/prefetch")
+async def api_prefetch(req: PrefetchRequest):
+    """Queue background generations for the successors of a scene the user just opened."""
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return {"enabled": False, "queued": []}
+    modulation = ModulationParams(
+        tension=req.tension,
+        emotional_distance=req.emotional_distance,
+        silence_density=req.silence_density,
+    )
+    queued = prefetcher.on_scene_load(req.scene_id, modulation, session=req.session)
+    return {"enabled": True, "queued": queued, **prefetcher.stats()}
+
+
+@app.get("/api/metrics")
+def api_metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/scheduler")
+def api_scheduler():
+    """Model call queue depth and wait times per priority class, in-flight count, 429 state."""
+    return get_scheduler().stats()
+
+
 @app.get("/api/versions/{scene_id}")
-def api_versions(scene_id: str):
-    return list_versions(scene_id)
+def api_versions(
+    scene_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    parent_version_id: Optional[str] = None,
+    min_tension: Optional[float] = None,
+    max_tension: Optional[float] = None,
+    min_emotional_distance: Optional[float] = None,
+    max_emotional_distance: Optional[float] = None,
+    min_silence_density: Optional[float] = None,
+    max_silence_density: Optional[float] = None,
+):
+    """
+    One page of versions, newest first. When more older versions exist, the
+    X-Next-Cursor header holds the `before` cursor for the next page.
+    """
+    bounds = {
+        "tension": (min_tension, max_tension),
+        "emotional_distance": (min_emotional_distance, max_emotional_distance),
+        "silence_density": (min_silence_density, max_silence_density),
+    }
+    param_ranges = {k: v for k, v in bounds.items() if v != (None, None)}
+    # One extra row tells whether another page follows without a COUNT over the history.
+    versions = list_versions(scene_id, limit + 1, before, after, param_ranges or None, parent_version_id)
+    if after and not before:
+        if len(versions) > limit:
+            versions = versions[-limit:]
+    elif len(versions) > limit:
+        versions = versions[:limit]
+        response.headers["X-Next-Cursor"] = version_cursor(versions[-1])
+    return versions
+
+
+@app.get("/api/timeline/{scene_id}")
+def api_timeline(scene_id: str, after: Optional[str] = None, before: Optional[str] = None):
+    """Per-line appeared/disappeared versions and the emotional_shift series, oldest first."""
+    return scene_timeline(scene_id, after=after, before=before)
 
 
 @app.get("/api/versions/{scene_id}/{version_id}")
@@ -99,6 +331,11 @@ def api_diff(req: DiffRequest):
     new_v = load_version(req.scene_id, req.new_version_id)
     if not old_v or not new_v:
         return {"error": "Version not found"}
-    text_diffs = text_diff(old_v.get("text", ""), new_v.get("text", ""))
+    # Versions are immutable, so the comparison is cached by their ids.
+    text_diffs = text_diff(
+        dialogue_of(old_v),
+        dialogue_of(new_v),
+        key=(req.old_version_id, req.new_version_id),
+    )
     meta = metadata_diff(old_v, new_v)
     return {"text_diff": text_diffs, "metadata_diff": meta}
@@ -0,0 +1 @@
+"""Benchmarks for the engine hot paths on synthetic scripts (see run_benchmarks.py)."""
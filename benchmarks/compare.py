@@ -0,0 +1,124 @@
+"""
+Compare two benchmark result files (base vs head) with regression thresholds.
+A benchmark regresses when head's median is more than `threshold` slower than
+base's (relative) and also slower by at least `min_ms`, so timer noise on very fast operations
+never fails a comparison.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_MS = 0.02
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(
+    base: dict[str, Any],
+    head: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    thresholds: Optional[dict[str, float]] = None,
+    min_ms: float = DEFAULT_MIN_MS,
+) -> list[dict[str, Any]]:
+    """
+    One row per (scale, benchmark) present in both documents:
+    {scale, benchmark, base_ms, head_ms, ratio, threshold, status} with status
+    "regression", "improvement" (faster by more than the threshold) or "ok".
+    thresholds overrides the relative threshold per benchmark name. A scale whose
+    spec differs between the two runs is reported with status "spec-changed".
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for scale, head_scale in head.get("scales", {}).items():
+        base_scale = base.get("scales", {}).get(scale)
+        if base_scale is None:
+            continue
+        spec_changed = base_scale.get("spec") != head_scale.get("spec")
+        for bench, result in head_scale["results"].items():
+            before = base_scale["results"].get(bench)
+            if before is None:
+                continue
+            base_ms, head_ms = before["median_ms"], result["median_ms"]
+            limit = thresholds.get(bench, threshold)
+            ratio = head_ms / base_ms if base_ms > 0 else float("inf") if head_ms > 0 else 1.0
+            if spec_changed:
+                status = "spec-changed"
+            elif ratio > 1 + limit and head_ms - base_ms >= min_ms:
+                status = "regression"
+            elif ratio < 1 / (1 + limit) and base_ms - head_ms >= min_ms:
+                status = "improvement"
+            else:
+                status = "ok"
+            rows.append({
+                "scale": scale,
+                "benchmark": bench,
+                "base_ms": base_ms,
+                "head_ms": head_ms,
+                "ratio": round(ratio, 4),
+                "threshold": limit,
+                "status": status,
+            })
+    return rows
+
+
+def format_table(rows: list[dict[str, Any]]) -> str:
+    lines = [f"{'scale':>8}  {'benchmark':<22} {'base ms':>12} {'head ms':>12} {'ratio':>8}  status"]
+    for r in rows:
+        lines.append(
+            f"{r['scale']:>8}  {r['benchmark']:<22} {r['base_ms']:>12.4f} {r['head_ms']:>12.4f} "
+            f"{r['ratio']:>7.2f}x  {r['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None):
+    """CLI: compare base.json head.json; exits 1 if any benchmark regressed.
+    Usage: python run_benchmarks.py compare base.json head.json [--threshold 0.2] [--threshold bench=0.5] [--min-ms 0.02] [--json]
+    """
+    import sys
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    threshold = DEFAULT_THRESHOLD
+    thresholds: dict[str, float] = {}
+    min_ms = DEFAULT_MIN_MS
+    files = []
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        if a in ("--threshold", "--min-ms") and i + 1 < len(argv):
+            value = argv[i + 1]
+            if a == "--min-ms":
+                min_ms = float(value)
+            elif "=" in value:
+                bench, limit = value.split("=", 1)
+                thresholds[bench] = float(limit)
+            else:
+                threshold = float(value)
+            i += 2
+            continue
+        if not a.startswith("--"):
+            files.append(a)
+        i += 1
+    if len(files) != 2:
+        print("Usage: compare base.json head.json [--threshold 0.2] [--threshold bench=0.5] [--min-ms 0.02]", file=sys.stderr)
+        sys.exit(2)
+
+    base, head = load_results(Path(files[0])), load_results(Path(files[1]))
+    rows = compare_results(base, head, threshold, thresholds, min_ms)
+    if "--json" in argv:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"base {base.get('commit') or files[0]} → head {head.get('commit') or files[1]}")
+        print(format_table(rows))
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
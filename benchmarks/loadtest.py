@@ -0,0 +1,233 @@
+"""
+Open-loop load driver for the API server.
+Requests are issued at a fixed (or Poisson) arrival rate regardless of how fast
+earlier ones complete, so queueing shows up as latency instead of silently lowering
+the offered load. Reports throughput, p50/p95/p99 latency, time to first byte for
+streams, errors, and how many generations fell back to sample dialogue.
+Run the API against benchmarks.stub_model to capacity-plan without spending API budget.
+"""
+
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+ENDPOINTS = ("generate", "stream", "scenes", "versions", "graph")
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of unsorted values; None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _summary(values: list[float]) -> dict[str, Optional[float]]:
+    def ms(v: Optional[float]) -> Optional[float]:
+        return round(v * 1000, 2) if v is not None else None
+    return {
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(max(values) if values else None),
+    }
+
+
+async def _request(client: Any, endpoint: str, scene_id: str, bypass_cache: bool) -> dict[str, Any]:
+    """Issue one request. Returns {endpoint, ok, status, latency, ttfb, error, source}."""
+    body = {
+        "scene_id": scene_id,
+        "tension": round(random.random(), 2),
+        "emotional_distance": round(random.random(), 2),
+        "silence_density": round(random.random() * 0.6, 2),
+        "bypass_cache": bypass_cache,
+    }
+    row: dict[str, Any] = {"endpoint": endpoint, "ok": False, "status": None, "ttfb": None, "error": None, "source": None}
+    started = time.perf_counter()
+    try:
+        if endpoint == "stream":
+            async with client.stream("POST", "/api/generate/stream", json=body) as response:
+                row["status"] = response.status_code
+                event = None
+                async for line in response.aiter_lines():
+                    if row["ttfb"] is None:
+                        row["ttfb"] = time.perf_counter() - started
+                    if line.startswith("event: "):
+                        event = line[7:]
+                    elif line.startswith("data: ") and event in ("done", "error"):
+                        data = json.loads(line[6:])
+                        if event == "error":
+                            row["error"] = data.get("error", "error event")
+                        else:
+                            row["source"] = data["result"].get("source")
+        else:
+            if endpoint == "generate":
+                response = await client.post("/api/generate", json=body)
+            elif endpoint == "scenes":
+                response = await client.get("/api/scenes")
+            elif endpoint == "versions":
+                response = await client.get(f"/api/versions/{scene_id}", params={"limit": 50})
+            else:
+                response = await client.get("/api/graph")
+            row["status"] = response.status_code
+            data = response.json()
+            if isinstance(data, dict) and data.get("error"):
+                row["error"] = data["error"]  # the API reports failures as 200 + {"error": ...}
+            elif isinstance(data, dict):
+                row["source"] = data.get("source")
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["latency"] = time.perf_counter() - started
+    if row["error"] is None and row["status"] is not None and row["status"] >= 400:
+        row["error"] = f"HTTP {row['status']}"
+    row["ok"] = row["error"] is None
+    return row
+
+
+async def arun_load(
+    base_url: str,
+    rps: float,
+    duration: float,
+    endpoints: dict[str, float],
+    scene_ids: list[str],
+    max_inflight: int = 1000,
+    poisson: bool = False,
+    bypass_cache: bool = True,
+    timeout: float = 120.0,
+) -> dict[str, Any]:
+    """
+    Offer `rps` requests/second for `duration` seconds, picking endpoints by weight.
+    Arrivals beyond max_inflight outstanding requests are dropped (counted, not sent).
+    Returns the report: totals, achieved rate, latency percentiles overall and per endpoint,
+    errors by message, and response sources (model, cache, mock).
+    """
+    import httpx
+
+    names, weights = list(endpoints), list(endpoints.values())
+    rows: list[dict[str, Any]] = []
+    tasks: set[asyncio.Task] = set()
+    dropped = 0
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        next_at = started
+        sent = 0
+        while next_at - started < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= max_inflight:
+                dropped += 1
+            else:
+                endpoint = random.choices(names, weights)[0]
+                task = asyncio.create_task(_request(client, endpoint, random.choice(scene_ids), bypass_cache))
+                tasks.add(task)
+                task.add_done_callback(lambda t: (tasks.discard(t), rows.append(t.result())))
+                sent += 1
+            next_at += random.expovariate(rps) if poisson else 1 / rps
+        offered = time.perf_counter() - started
+        if tasks:
+            await asyncio.wait(set(tasks))
+        elapsed = time.perf_counter() - started
+
+    report: dict[str, Any] = {
+        "base_url": base_url,
+        "target_rps": rps,
+        "duration_s": round(offered, 3),
+        "sent": sent,
+        "dropped": dropped,
+        "completed": len(rows),
+        "ok": sum(1 for r in rows if r["ok"]),
+        "achieved_rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+        "latency": _summary([r["latency"] for r in rows]),
+        "endpoints": {},
+        "errors": {},
+        "sources": {},
+    }
+    for name in names:
+        subset = [r for r in rows if r["endpoint"] == name]
+        if not subset:
+            continue
+        entry = {"count": len(subset), "errors": sum(1 for r in subset if not r["ok"]), **_summary([r["latency"] for r in subset])}
+        ttfb = [r["ttfb"] for r in subset if r["ttfb"] is not None]
+        if ttfb:
+            entry["ttfb"] = _summary(ttfb)
+        report["endpoints"][name] = entry
+    for r in rows:
+        if r["error"]:
+            key = str(r["error"])[:120]
+            report["errors"][key] = report["errors"].get(key, 0) + 1
+        if r["source"]:
+            report["sources"][r["source"]] = report["sources"].get(r["source"], 0) + 1
+    return report
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lat = report["latency"]
+    lines = [
+        f"{report['completed']}/{report['sent']} completed ({report['ok']} ok, {report['dropped']} dropped) "
+        f"in {report['duration_s']}s — target {report['target_rps']} rps, achieved {report['achieved_rps']} rps",
+        f"latency p50 {lat['p50_ms']} ms  p95 {lat['p95_ms']} ms  p99 {lat['p99_ms']} ms  max {lat['max_ms']} ms",
+    ]
+    for name, e in report["endpoints"].items():
+        line = f"  {name:<9} n={e['count']:<6} err={e['errors']:<5} p50 {e['p50_ms']}  p95 {e['p95_ms']}  p99 {e['p99_ms']} ms"
+        if "ttfb" in e:
+            line += f"  (ttfb p50 {e['ttfb']['p50_ms']}  p99 {e['ttfb']['p99_ms']} ms)"
+        lines.append(line)
+    if report["sources"]:
+        lines.append("sources: " + ", ".join(f"{k}={v}" for k, v in sorted(report["sources"].items())))
+    for message, count in sorted(report["errors"].items(), key=lambda kv: -kv[1]):
+        lines.append(f"  error x{count}: {message}")
+    return "\n".join(lines)
+
+
+def main():
+    """CLI: load-test a running API server.
+    Usage: python run_loadtest.py [--url http://127.0.0.1:8000] [--rps 20] [--duration 30]
+           [--mix generate=1,stream=1,scenes=0.5] [--scenes S1,S2] [--max-inflight 1000]
+           [--poisson] [--use-cache] [--json report.json]
+    """
+    import sys
+
+    def flag_value(flag: str) -> Optional[str]:
+        if flag in sys.argv[:-1]:
+            return sys.argv[sys.argv.index(flag) + 1]
+        return None
+
+    mix: dict[str, float] = {}
+    for part in (flag_value("--mix") or "generate=1").split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            print(f"Unknown endpoint: {name} (available: {', '.join(ENDPOINTS)})", file=sys.stderr)
+            sys.exit(1)
+        mix[name] = float(weight or 1)
+
+    scene_ids = (flag_value("--scenes") or "").split(",") if flag_value("--scenes") else None
+    if scene_ids is None:
+        from engine.graph import load_scenes
+        scene_ids = list(load_scenes())
+
+    report = asyncio.run(arun_load(
+        flag_value("--url") or "http://127.0.0.1:8000",
+        rps=float(flag_value("--rps") or 20),
+        duration=float(flag_value("--duration") or 30),
+        endpoints=mix,
+        scene_ids=scene_ids,
+        max_inflight=int(flag_value("--max-inflight") or 1000),
+        poisson="--poisson" in sys.argv,
+        bypass_cache="--use-cache" not in sys.argv,
+    ))
+    print(format_report(report))
+    out = flag_value("--json")
+    if out:
+        Path(out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if report["completed"] == 0 or report["ok"] < report["completed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
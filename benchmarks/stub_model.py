@@ -0,0 +1,286 @@
+"""
+Local OpenAI-compatible stand-in for the model provider.
+Serves POST /v1/chat/completions (including stream=True and n>1) with dialogue
+shaped from the prompt: speakers from "## Characters", line budget from "Max lines
+of dialogue", forbidden phrases avoided. Latency, token throughput, 5xx and 429
+rates, and the share of outputs that break constraints on purpose are configurable,
+so the engine's scheduler, retries and fallbacks can be load-tested for free.
+Point the engine at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_PORT = 8765
+
+WORDS = (
+    "door window coffee rain keys letter morning silence table coat train light "
+    "kitchen phone hallway glass street minute later never almost still again maybe"
+).split()
+
+# Ways a deliberately bad output breaks the scene constraints.
+BAD_MODES = ("too_many_lines", "forbidden_phrase", "no_speakers")
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    """
+    latency_ms is the median time to first token; latency_dist is fixed, uniform
+    (± jitter × median), lognormal (sigma = jitter) or exponential. tokens_per_second
+    paces the completion after the first token (0 = instant). error_rate answers 500,
+    rate_limit_rate answers 429 with Retry-After; bad_output_rate returns dialogue that
+    fails validation (bad_modes picks how). outputs, if set, are replayed in order
+    instead of generated dialogue.
+    """
+    latency_ms: float = 400.0
+    latency_dist: str = "lognormal"
+    jitter: float = 0.5
+    tokens_per_second: float = 80.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    bad_output_rate: float = 0.0
+    bad_modes: tuple[str, ...] = BAD_MODES
+    outputs: tuple[str, ...] = ()
+    seed: Optional[int] = None
+
+
+class StubModel:
+    """Completion behaviour and counters for one StubConfig."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._next_output = 0
+        self.counts: dict[str, int] = {"requests": 0, "ok": 0, "error": 0, "rate_limited": 0, "bad_output": 0, "streamed": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def first_token_delay(self) -> float:
+        c = self.config
+        median = c.latency_ms / 1000
+        if c.latency_dist == "fixed" or median <= 0:
+            return max(0.0, median)
+        if c.latency_dist == "uniform":
+            return max(0.0, self.rng.uniform(median * (1 - c.jitter), median * (1 + c.jitter)))
+        if c.latency_dist == "exponential":
+            return self.rng.expovariate(math.log(2) / median)  # rate for which median is the median
+        return self.rng.lognormvariate(0.0, c.jitter) * median
+
+    def outcome(self) -> str:
+        """ok, error or rate_limited for the next request."""
+        self._count("requests")
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self._count("rate_limited")
+            return "rate_limited"
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._count("error")
+            return "error"
+        self._count("ok")
+        return "ok"
+
+    def completion(self, prompt: str) -> str:
+        if self.config.outputs:
+            with self._lock:
+                text = self.config.outputs[self._next_output % len(self.config.outputs)]
+                self._next_output += 1
+            return text
+        speakers, max_lines, forbidden = _prompt_constraints(prompt)
+        bad = self.rng.random() < self.config.bad_output_rate
+        lines_count = self.rng.randint(max(1, max_lines // 2), max_lines)
+        mode = None
+        if bad:
+            self._count("bad_output")
+            mode = self.rng.choice(self.config.bad_modes)
+            if mode == "forbidden_phrase" and not forbidden:
+                mode = "too_many_lines"
+            if mode == "too_many_lines":
+                lines_count = max_lines + self.rng.randint(1, 4)
+        lines = []
+        for i in range(lines_count):
+            words = " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(3, 10)))
+            lines.append(f"{speakers[i % len(speakers)]}: {words.capitalize()}.")
+        if mode == "forbidden_phrase":
+            i = self.rng.randrange(len(lines))
+            lines[i] = f"{lines[i][:-1]}, {self.rng.choice(forbidden)}."
+        elif mode == "no_speakers":
+            lines = [line.split(": ", 1)[1] for line in lines]
+        return "\n".join(lines)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self.counts, "config": asdict(self.config)}
+
+
+_CHARACTERS = re.compile(r"^## Characters\n(.+)$", re.MULTILINE)
+_MAX_LINES = re.compile(r"Max lines of dialogue:\s*(\d+)")
+_FORBIDDEN = re.compile(r"Forbidden phrases:\s*(.+)$", re.MULTILINE)
+
+
+def _prompt_constraints(prompt: str) -> tuple[list[str], int, list[str]]:
+    """(speakers, max lines, forbidden phrases) read back from an engine prompt; defaults otherwise."""
+    m = _CHARACTERS.search(prompt)
+    speakers = [s.strip() for s in m.group(1).split(",") if s.strip()] if m else []
+    m = _MAX_LINES.search(prompt)
+    max_lines = int(m.group(1)) if m else 8
+    m = _FORBIDDEN.search(prompt)
+    forbidden = re.findall(r'"([^"]+)"', m.group(1)) if m else []
+    return speakers or ["A", "B"], max(1, max_lines), forbidden
+
+
+def _tokens(text: str) -> list[str]:
+    """Rough tokens: words with their trailing whitespace."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    """FastAPI app serving the stub; stats at GET /stats."""
+    model = StubModel(config or StubConfig())
+    app = FastAPI(title="Living Script model stub")
+    app.state.model = model
+
+    @app.get("/stats")
+    def stats():
+        return model.stats()
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "livingscript"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = "\n".join(m.get("content") or "" for m in messages if isinstance(m, dict))
+        n = max(1, int(body.get("n") or 1))
+        name = body.get("model") or "stub"
+        outcome = model.outcome()
+        await asyncio.sleep(model.first_token_delay())
+        if outcome == "rate_limited":
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": f"{model.config.retry_after:g}"},
+            )
+        if outcome == "error":
+            return JSONResponse({"error": {"message": "Internal error (stub)", "type": "server_error"}}, status_code=500)
+
+        texts = [model.completion(prompt) for _ in range(n)]
+        prompt_tokens = len(_tokens(prompt))
+        completion_tokens = sum(len(_tokens(t)) for t in texts)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        tps = model.config.tokens_per_second
+
+        if body.get("stream"):
+            model._count("streamed")
+            return StreamingResponse(
+                _stream(texts[0], completion_id, created, name, tps),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
+        if tps > 0:
+            await asyncio.sleep(max(len(_tokens(t)) for t in texts) / tps)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": name,
+            "choices": [
+                {"index": i, "message": {"role": "assistant", "content": t}, "finish_reason": "stop"}
+                for i, t in enumerate(texts)
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+async def _stream(text: str, completion_id: str, created: int, name: str, tps: float) -> AsyncIterator[str]:
+    def chunk(delta: dict, finish: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": name,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for token in _tokens(text):
+        if tps > 0:
+            await asyncio.sleep(1 / tps)
+        yield chunk({"content": token})
+    yield chunk({}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+def main():
+    """CLI: run the stub model server.
+    Usage: python run_stub_model.py [--port 8765] [--latency-ms 400] [--latency-dist lognormal|uniform|exponential|fixed]
+           [--jitter 0.5] [--tps 80] [--error-rate 0.01] [--rate-limit-rate 0.05] [--retry-after 1]
+           [--bad-output-rate 0.2] [--bad-modes too_many_lines,forbidden_phrase,no_speakers]
+           [--outputs outputs.json] [--seed 7]
+    """
+    import sys
+    import uvicorn
+
+    def flag_value(flag: str) -> Optional[str]:
+        if flag in sys.argv[:-1]:
+            return sys.argv[sys.argv.index(flag) + 1]
+        return None
+
+    def number(flag: str, default: float) -> float:
+        value = flag_value(flag)
+        return float(value) if value is not None else default
+
+    default = StubConfig()
+    bad_modes = tuple(flag_value("--bad-modes").split(",")) if flag_value("--bad-modes") else default.bad_modes
+    unknown = [m for m in bad_modes if m not in BAD_MODES]
+    if unknown:
+        print(f"Unknown bad mode(s): {', '.join(unknown)} (available: {', '.join(BAD_MODES)})", file=sys.stderr)
+        sys.exit(1)
+    outputs_path = flag_value("--outputs")
+    outputs = tuple(json.loads(Path(outputs_path).read_text(encoding="utf-8"))) if outputs_path else ()
+    seed = flag_value("--seed")
+    config = StubConfig(
+        latency_ms=number("--latency-ms", default.latency_ms),
+        latency_dist=flag_value("--latency-dist") or default.latency_dist,
+        jitter=number("--jitter", default.jitter),
+        tokens_per_second=number("--tps", default.tokens_per_second),
+        error_rate=number("--error-rate", default.error_rate),
+        rate_limit_rate=number("--rate-limit-rate", default.rate_limit_rate),
+        retry_after=number("--retry-after", default.retry_after),
+        bad_output_rate=number("--bad-output-rate", default.bad_output_rate),
+        bad_modes=bad_modes,
+        outputs=outputs,
+        seed=int(seed) if seed is not None else None,
+    )
+    port = int(number("--port", DEFAULT_PORT))
+    print(f"Stub model on http://127.0.0.1:{port}/v1 — set OPENAI_BASE_URL to it (and any OPENAI_API_KEY)", file=sys.stderr)
+    uvicorn.run(create_app(config), host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Hot-path timings at each scale.
+For every ScriptSpec the suite writes a synthetic script to a temp directory, points
+a fresh version store at it, and times the engine entry points the server and CLIs
+use. Each benchmark runs `repeat` rounds over all its items; the result is
+per-operation milliseconds (median and min over rounds), written as JSON for
+benchmarks.compare.
+The suite only relies on the public entry points every commit has (load_scenes,
+traverse, build_prompt, validate, text_diff, list_versions, save_version), so it
+can be copied onto an older checkout to produce a baseline; benchmarks for newer
+APIs are skipped where those do not exist.
+"""
+
+import contextlib
+import gc
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from benchmarks.synthetic import ScriptSpec, make_scenes, make_versions, write_script
+from engine import diff, graph, memory
+from engine.generator import build_prompt
+from engine.graph import load_scenes, traverse, validate_transitions
+from engine.paths import PROJECT_ROOT
+from engine.validator import validate
+
+
+def _optional(module: str, name: str) -> Any:
+    """module.name, or None on a checkout that predates it."""
+    try:
+        return getattr(importlib.import_module(module), name, None)
+    except ImportError:
+        return None
+
+
+RESULTS_FORMAT = 1
+
+SCALES: dict[str, ScriptSpec] = {
+    "small": ScriptSpec(scenes=100, versions=10),
+    "medium": ScriptSpec(scenes=1000, branching=3, characters=40, versions=10),
+    "large": ScriptSpec(scenes=5000, branching=3, characters=200, versions=4),
+}
+
+# traverse() enumerates every route, which is exponential in graph size, so it runs on
+# a fixed graph small enough to enumerate (3440 routes); iter_paths is capped instead.
+TRAVERSE_SPEC = ScriptSpec(scenes=30, branching=2)
+MAX_PATHS = 10_000
+
+
+def measure(
+    fn: Callable[[Any], Any],
+    items: list,
+    repeat: int = 5,
+    setup: Optional[Callable[[], None]] = None,
+) -> dict[str, float]:
+    """Per-item milliseconds over `repeat` rounds of fn(item) for every item; setup runs untimed before each round."""
+    rounds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        rounds.append((time.perf_counter() - started) * 1000 / max(1, len(items)))
+    return {
+        "median_ms": round(statistics.median(rounds), 6),
+        "min_ms": round(min(rounds), 6),
+        "ops": len(items),
+        "rounds": repeat,
+    }
+
+
+def _clear_parse_caches() -> None:
+    for module in ("engine.diff", "engine.dialogue"):
+        clear = _optional(module, "clear_cache")
+        if clear is not None:
+            clear()
+
+
+@contextlib.contextmanager
+def _version_store(path: Path):
+    """Point save_version/list_versions at a fresh store under path for the duration."""
+    if not hasattr(memory, "set_backend"):
+        # Single JSON tree at engine.paths.VERSIONS_DIR, read at call time.
+        previous_dir = memory.VERSIONS_DIR
+        memory.VERSIONS_DIR = path / "versions"
+        try:
+            yield
+        finally:
+            memory.VERSIONS_DIR = previous_dir
+        return
+    previous = memory.get_backend()
+    if hasattr(memory, "SQLiteBackend"):
+        memory.set_backend(memory.SQLiteBackend(path / "versions.sqlite3"))
+    else:
+        memory.set_backend(memory.JsonTreeBackend(path / "versions"))
+    try:
+        yield
+    finally:
+        memory.set_backend(previous)
+
+
+def run_scale(spec: ScriptSpec, repeat: int = 5, on_bench: Optional[Callable[[str, dict], None]] = None) -> dict[str, dict]:
+    """Time every benchmark for one spec. Returns {benchmark: measure() result}."""
+    results: dict[str, dict] = {}
+
+    def record(name: str, result: dict[str, float]) -> None:
+        results[name] = result
+        if on_bench:
+            on_bench(name, result)
+
+    SceneStore = getattr(graph, "SceneStore", None)
+    PromptCompiler = _optional("engine.prompts", "PromptCompiler")
+    iter_paths = getattr(graph, "iter_paths", None)
+    count_paths = getattr(graph, "count_paths", None)
+    paged_list = "limit" in inspect.signature(memory.list_versions).parameters
+    group_commit = getattr(memory, "batch", None)
+
+    with tempfile.TemporaryDirectory(prefix="livingscript-bench-") as tmp:
+        root = Path(tmp)
+        scenes, characters = write_script(spec, root / "scripts")
+        scenes_dir = root / "scripts" / "scenes"
+        by_id = {c["character_id"]: c for c in characters}
+        casts = {sid: [by_id[c] for c in s["characters"]] for sid, s in scenes.items()}
+        ids = list(scenes)
+        start = ids[0]
+
+        if SceneStore is not None:
+            record("load_scenes_cold", measure(lambda _: SceneStore(scenes_dir).scenes(), [None], repeat))
+        load_scenes(scenes_dir)
+        # Without a resident store every call parses the directory, so this is the cold path there.
+        record("load_scenes_warm", measure(lambda _: load_scenes(scenes_dir), [None], repeat))
+        loaded = load_scenes(scenes_dir)
+
+        record("validate_transitions", measure(lambda _: validate_transitions(loaded), [None], repeat))
+        small = {s["scene_id"]: s for s in make_scenes(TRAVERSE_SPEC)}
+        record("traverse", measure(lambda _: traverse(small, next(iter(small))), [None], repeat))
+        if iter_paths is not None:
+            record("iter_paths", measure(lambda _: sum(1 for _ in iter_paths(loaded, start, max_paths=MAX_PATHS)), [None], repeat))
+        if count_paths is not None:
+            record("count_paths", measure(lambda _: count_paths(loaded, start), [None], repeat))
+
+        scene_list = [loaded[sid] for sid in ids]
+        if PromptCompiler is not None:
+            record("build_prompt_cold", measure(
+                lambda s: PromptCompiler().build_prompt(s, casts[s["scene_id"]]), scene_list[:200], repeat
+            ))
+        record("build_prompt", measure(lambda s: build_prompt(s, characters=casts[s["scene_id"]]), scene_list, repeat))
+
+        versions = {sid: make_versions(spec, scenes[sid]) for sid in ids}
+        latest = [(loaded[sid], versions[sid][-1]) for sid in ids]
+        record("validate", measure(lambda p: validate(p[1], p[0], casts[p[0]["scene_id"]]), latest, repeat))
+        pairs = [(texts[i], texts[i + 1]) for texts in versions.values() for i in range(len(texts) - 1)][:2000]
+        record("text_diff", measure(lambda p: diff.text_diff(p[0], p[1]), pairs, repeat, setup=_clear_parse_caches))
+
+        with _version_store(root):
+            with group_commit(max_pending=512) if group_commit else contextlib.nullcontext():
+                for sid in ids:
+                    parent = None
+                    for text in versions[sid]:
+                        parent = memory.save_version(sid, text, {}, {"tension": 0.5}, parent)
+            if paged_list:
+                record("list_versions", measure(lambda sid: memory.list_versions(sid, limit=50), ids, repeat))
+            else:
+                record("list_versions", measure(memory.list_versions, ids, repeat))
+            sample = ids[: min(len(ids), 500)]
+            record("save_version", measure(
+                lambda sid: memory.save_version(sid, versions[sid][-1], {}, {"tension": 0.5}),
+                sample, repeat,
+            ))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(
+    scales: dict[str, ScriptSpec],
+    repeat: int = 5,
+    on_bench: Optional[Callable[[str, str, dict], None]] = None,
+) -> dict[str, Any]:
+    """Run every scale. Returns the results document (see write_results)."""
+    document: dict[str, Any] = {
+        "format": RESULTS_FORMAT,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.time(),
+        "repeat": repeat,
+        "scales": {},
+    }
+    for name, spec in scales.items():
+        results = run_scale(spec, repeat, (lambda bench, r, name=name: on_bench(name, bench, r)) if on_bench else None)
+        document["scales"][name] = {"spec": spec.to_dict(), "results": results}
+    return document
+
+
+def write_results(document: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _parse_scales(value: Optional[str], overrides: dict[str, int | float]) -> dict[str, ScriptSpec]:
+    names: Iterable[str] = value.split(",") if value else ["small", "medium"]
+    scales = {}
+    for name in names:
+        if name not in SCALES:
+            raise KeyError(f"Unknown scale: {name} (available: {', '.join(SCALES)})")
+        spec = SCALES[name]
+        scales[name] = ScriptSpec(**{**spec.to_dict(), **overrides}) if overrides else spec
+    return scales
+
+
+def main():
+    """CLI: run the benchmark suite, or compare two result files.
+    Usage: python run_benchmarks.py [--scales small,medium,large] [--repeat 5] [--out data/benchmarks/results.json]
+           [--scenes N] [--branching B] [--cycle-ratio R] [--characters C] [--versions V] [--lines L] [--seed S]
+           python run_benchmarks.py compare base.json head.json [--threshold 0.2] [--threshold save_version=0.5] [--min-ms 0.02]
+    """
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        from benchmarks.compare import main as compare_main
+        compare_main(sys.argv[2:])
+        return
+
+    def flag_value(flag: str) -> Optional[str]:
+        if flag in sys.argv[:-1]:
+            return sys.argv[sys.argv.index(flag) + 1]
+        return None
+
+    overrides: dict[str, int | float] = {}
+    for flag, field, cast in (
+        ("--scenes", "scenes", int), ("--branching", "branching", int), ("--cycle-ratio", "cycle_ratio", float),
+        ("--characters", "characters", int), ("--versions", "versions", int), ("--lines", "lines", int),
+        ("--seed", "seed", int),
+    ):
+        value = flag_value(flag)
+        if value is not None:
+            overrides[field] = cast(value)
+    try:
+        scales = _parse_scales(flag_value("--scales"), overrides)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        sys.exit(1)
+    out = Path(flag_value("--out") or PROJECT_ROOT / "data" / "benchmarks" / "results.json")
+
+    def on_bench(scale: str, bench: str, result: dict) -> None:
+        print(f"{scale:>8}  {bench:<22} {result['median_ms']:>12.4f} ms/op  (min {result['min_ms']:.4f}, {result['ops']} ops)", file=sys.stderr)
+
+    document = run_suite(scales, repeat=int(flag_value("--repeat") or 5), on_bench=on_bench)
+    write_results(document, out)
+    print(f"Results → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Synthetic scripts at configurable scale: a scenes/ + characters/ tree shaped like
+scripts/ (so the real loaders read it), plus dialogue versions that evolve a few
+lines at a time. Everything is derived from a seed, so two runs at the same
+ScriptSpec produce byte-identical inputs.
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+WORDS = (
+    "door window coffee rain keys letter morning silence table coat train light "
+    "kitchen phone hallway glass street minute answer question later never almost "
+    "still again maybe already enough tomorrow tonight somewhere nothing anything"
+).split()
+
+PHRASES = (
+    "I feel", "to be honest", "you know what I mean", "obviously", "actually",
+    "needless to say", "at the end of the day", "to tell the truth", "let me explain",
+    "as you know", "basically", "literally", "I have to say", "in other words",
+)
+
+EMOTIONS = ("neutral", "uncertain", "tense", "guarded", "warm", "brittle", "resigned", "hopeful")
+
+
+@dataclass(frozen=True)
+class ScriptSpec:
+    """Shape of a synthetic script. cycle_ratio is the share of transitions that point back."""
+
+    scenes: int = 100
+    branching: int = 2
+    cycle_ratio: float = 0.05
+    characters: int = 8
+    versions: int = 10
+    lines: int = 12
+    seed: int = 7
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_characters(spec: ScriptSpec) -> list[dict]:
+    rng = random.Random(spec.seed)
+    return [
+        {
+            "character_id": f"C{i}",
+            "name": f"Character {i}",
+            "voice_notes": _sentence(rng, 8),
+            "traits": rng.sample(EMOTIONS, 2),
+            "forbidden_expressions": rng.sample(PHRASES, 3),
+        }
+        for i in range(spec.characters)
+    ]
+
+
+def make_scenes(spec: ScriptSpec) -> list[dict]:
+    """
+    Scene i always links to i+1 (so every scene is reachable from S0); further links
+    go forward within a window, or — with probability cycle_ratio — back to an earlier
+    scene. The last scene is an ending.
+    """
+    rng = random.Random(spec.seed + 1)
+    ids = [f"S{i}" for i in range(spec.scenes)]
+    cast_size = min(3, spec.characters)
+    scenes = []
+    for i, sid in enumerate(ids):
+        transitions = []
+        if i + 1 < len(ids):
+            transitions.append({"target": ids[i + 1], "type": "default"})
+            for _ in range(spec.branching - 1):
+                if i > 0 and rng.random() < spec.cycle_ratio:
+                    target = rng.randrange(0, i)
+                else:
+                    target = rng.randrange(i + 1, min(len(ids), i + 1 + 4 * spec.branching))
+                transitions.append({"target": ids[target], "type": rng.choice(("emotional", "choice"))})
+        scenes.append({
+            "scene_id": sid,
+            "setting": _sentence(rng, 5),
+            "emotional_state": rng.sample(EMOTIONS, 2),
+            "characters": [f"C{c}" for c in rng.sample(range(spec.characters), cast_size)],
+            "beats": [_sentence(rng, 3) for _ in range(rng.randint(3, 5))],
+            "constraints": {
+                "max_lines": spec.lines + 2,
+                "no_exposition": True,
+                "subtext_over_text": True,
+                "forbidden_words": rng.sample(PHRASES, 3),
+            },
+            "transitions": transitions,
+        })
+    return scenes
+
+
+def make_versions(spec: ScriptSpec, scene: dict) -> list[str]:
+    """spec.versions dialogue texts for a scene; each rewrites ~20% of the previous one's lines."""
+    rng = random.Random(f"{spec.seed}:{scene['scene_id']}")
+    cast = scene["characters"]
+
+    def line(i: int) -> str:
+        return f"{cast[i % len(cast)]}: {_sentence(rng, rng.randint(4, 12))}"
+
+    lines = [line(i) for i in range(spec.lines)]
+    texts = ["\n".join(lines)]
+    for _ in range(spec.versions - 1):
+        for _ in range(max(1, spec.lines // 5)):
+            i = rng.randrange(len(lines))
+            op = rng.random()
+            if op < 0.6 or len(lines) <= 2:
+                lines[i] = line(i)
+            elif op < 0.8:
+                lines.insert(i, line(i))
+            else:
+                del lines[i]
+        texts.append("\n".join(lines))
+    return texts
+
+
+def write_script(spec: ScriptSpec, root: Path) -> tuple[dict[str, dict], list[dict]]:
+    """Write root/scenes/*.json and root/characters/*.json. Returns (scenes by id, characters)."""
+    scenes_dir, characters_dir = root / "scenes", root / "characters"
+    scenes_dir.mkdir(parents=True, exist_ok=True)
+    characters_dir.mkdir(parents=True, exist_ok=True)
+    characters = make_characters(spec)
+    for c in characters:
+        (characters_dir / f"{c['character_id']}.json").write_text(json.dumps(c, indent=2), encoding="utf-8")
+    scenes = make_scenes(spec)
+    for s in scenes:
+        (scenes_dir / f"{s['scene_id']}.json").write_text(json.dumps(s, indent=2), encoding="utf-8")
+    return {s["scene_id"]: s for s in scenes}, characters
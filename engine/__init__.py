@@ -1,8 +1,9 @@
 """Living Script engine — graph, controls, generator, memory, diff, replay."""
 
 from engine.graph import load_scenes, validate_transitions, get_next_scenes, traverse
+from engine.traversal import iter_paths, count_paths
 from engine.controls import ModulationParams
-from engine.generator import build_prompt, generate, call_model
+from engine.generator import build_prompt, generate, agenerate, astream_generate, call_model, acall_model
 from engine.memory import save_version, load_version, list_versions
 from engine.diff import text_diff, changed_lines, emotional_shift, metadata_diff, unified_diff_text
 from engine.replay import parse_dialogue, replay, replay_cli
@@ -12,10 +13,15 @@ __all__ = [
     "validate_transitions",
     "get_next_scenes",
     "traverse",
+    "iter_paths",
+    "count_paths",
     "ModulationParams",
     "build_prompt",
     "generate",
+    "agenerate",
+    "astream_generate",
     "call_model",
+    "acall_model",
     "save_version",
     "load_version",
     "list_versions",
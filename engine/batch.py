@@ -0,0 +1,282 @@
+"""
+Parameter-sweep batch runner for emotional-drift experiments.
+Runs scenes × (tension × distance × silence) on a bounded async worker pool,
+checkpoints every finished point, and writes one columnar results artifact
+instead of a version file per generation.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from engine.characters import load_characters_for_scene
+from engine.controls import ModulationParams
+from engine.generator import agenerate
+from engine.paths import EXPERIMENTS_DIR
+from engine.scheduler import Priority
+from engine.validator import validate
+
+COLUMNS = (
+    "scene_id",
+    "tension",
+    "emotional_distance",
+    "silence_density",
+    "line_count",
+    "valid",
+    "error_count",
+    "warning_count",
+    "errors",
+    "latency_ms",
+    "cached",
+    "version_id",
+)
+
+DEFAULT_STEPS = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+# Versions group-committed per flush when a sweep saves them.
+SAVE_GROUP = 64
+
+
+def parameter_grid(
+    tension: tuple[float, ...] = DEFAULT_STEPS,
+    emotional_distance: tuple[float, ...] = DEFAULT_STEPS,
+    silence_density: tuple[float, ...] = DEFAULT_STEPS,
+) -> list[ModulationParams]:
+    """Cartesian product of slider values."""
+    return [
+        ModulationParams(tension=t, emotional_distance=d, silence_density=s)
+        for t, d, s in itertools.product(tension, emotional_distance, silence_density)
+    ]
+
+
+def _point_key(scene_id: str, tension: float, distance: float, silence: float) -> str:
+    return f"{scene_id}|{tension:.4f}|{distance:.4f}|{silence:.4f}"
+
+
+def _load_checkpoint(path: Path) -> dict[str, dict]:
+    """Completed rows by point key. A torn last line (crash mid-write) is ignored."""
+    rows = {}
+    if not path.exists():
+        return rows
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = _point_key(row["scene_id"], row["tension"], row["emotional_distance"], row["silence_density"])
+            rows[key] = row
+    return rows
+
+
+def to_columns(rows: list[dict]) -> dict[str, list]:
+    """Row dicts → {column: [values]}."""
+    return {col: [row.get(col) for row in rows] for col in COLUMNS}
+
+
+async def _run_point(
+    scene: dict,
+    params: ModulationParams,
+    save_versions: bool,
+    use_cache: bool,
+) -> dict[str, Any]:
+    row = {
+        "scene_id": scene["scene_id"],
+        "tension": params.tension,
+        "emotional_distance": params.emotional_distance,
+        "silence_density": params.silence_density,
+        "version_id": None,
+    }
+    start = time.perf_counter()
+    try:
+        result = await agenerate(scene, modulation=params, use_cache=use_cache, priority=Priority.BATCH)
+    except Exception as e:
+        row.update(line_count=0, valid=False, error_count=1, warning_count=0,
+                   errors=str(e), cached=False)
+    else:
+        validation = validate(result["dialogue"], scene, load_characters_for_scene(scene))
+        row.update(
+            line_count=validation["line_count"],
+            valid=validation["valid"],
+            error_count=len(validation["errors"]),
+            warning_count=len(validation["warnings"]),
+            errors="; ".join(validation["errors"]),
+            cached=result.get("cached", False),
+        )
+        if save_versions and result["dialogue"]:
+            from engine.memory import latest_version_id, save_version
+            row["version_id"] = await asyncio.to_thread(
+                lambda: save_version(
+                    scene["scene_id"],
+                    result["dialogue"],
+                    result.get("constraints_snapshot", {}),
+                    result.get("emotional_params", {}),
+                    parent_version_id=latest_version_id(scene["scene_id"]),
+                )
+            )
+    row["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return row
+
+
+async def arun_sweep(
+    scenes: list[dict],
+    grid: list[ModulationParams],
+    out_dir: Path,
+    workers: int = 16,
+    save_versions: bool = False,
+    use_cache: bool = True,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict[str, list]:
+    """
+    Run every (scene, params) point with at most `workers` generations in flight.
+    Finished points are appended to out_dir/checkpoint.jsonl, so an interrupted sweep
+    resumes where it stopped. Writes out_dir/results.json (columnar) and returns the columns.
+    With save_versions, versions are group-committed (memory.batch) SAVE_GROUP at a time
+    and their checkpoint rows are written only once the commit holding them is done.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = out_dir / "checkpoint.jsonl"
+    done = _load_checkpoint(checkpoint_path)
+
+    # Only this sweep's points: the checkpoint may hold rows from other grids or scenes.
+    keys = []
+    pending: asyncio.Queue = asyncio.Queue()
+    for scene in scenes:
+        for params in grid:
+            key = _point_key(scene["scene_id"], params.tension, params.emotional_distance, params.silence_density)
+            keys.append(key)
+            if key not in done:
+                pending.put_nowait((key, scene, params))
+    total = len(keys)
+    completed = total - pending.qsize()
+
+    if save_versions:
+        from engine.memory import batch
+        group_commit = batch(max_pending=SAVE_GROUP)
+    else:
+        group_commit = contextlib.nullcontext()
+
+    with group_commit as group, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        # With save_versions, a row is checkpointed only after its version is committed,
+        # so a crash never marks a point done whose version was still buffered.
+        unsaved: list[dict] = []
+
+        async def commit(rows: list[dict]) -> None:
+            if group is not None:
+                await asyncio.to_thread(group.flush)
+            for row in rows:
+                checkpoint.write(json.dumps(row) + "\n")
+            checkpoint.flush()
+
+        async def worker() -> None:
+            nonlocal completed, unsaved
+            while True:
+                try:
+                    key, scene, params = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                row = await _run_point(scene, params, save_versions, use_cache)
+                done[key] = row
+                completed += 1
+                unsaved.append(row)
+                if group is None or len(unsaved) >= SAVE_GROUP:
+                    rows, unsaved = unsaved, []
+                    await commit(rows)
+                if on_progress:
+                    on_progress(completed, total)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+        await commit(unsaved)
+        os.fsync(checkpoint.fileno())
+
+    rows = sorted(
+        (done[key] for key in dict.fromkeys(keys)),
+        key=lambda r: (r["scene_id"], r["tension"], r["emotional_distance"], r["silence_density"]),
+    )
+    columns = to_columns(rows)
+    artifact = {"columns": list(COLUMNS), "rows": len(rows), "data": columns}
+    tmp = out_dir / "results.json.tmp"
+    tmp.write_text(json.dumps(artifact, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, out_dir / "results.json")
+    return columns
+
+
+def run_sweep(*args: Any, **kwargs: Any) -> dict[str, list]:
+    """Synchronous arun_sweep()."""
+    return asyncio.run(arun_sweep(*args, **kwargs))
+
+
+def main():
+    """CLI: run a parameter sweep.
+    Usage: python run_batch.py [scene_id ...] [--tension 0,0.5,1] [--distance ...] [--silence ...]
+           [--workers 16] [--out experiments/emotional-drifts/sweep] [--save-versions] [--no-cache]
+    """
+    import sys
+    from engine.graph import load_scenes
+
+    flags_with_values = {"--tension", "--distance", "--silence", "--workers", "--out"}
+    args = []
+    skip = False
+    for a in sys.argv[1:]:
+        if skip:
+            skip = False
+            continue
+        if a in flags_with_values:
+            skip = True
+            continue
+        if not a.startswith("--"):
+            args.append(a)
+
+    def flag_value(flag: str) -> Optional[str]:
+        try:
+            i = sys.argv.index(flag)
+            if i + 1 < len(sys.argv):
+                return sys.argv[i + 1]
+        except ValueError:
+            pass
+        return None
+
+    def steps(flag: str) -> tuple[float, ...]:
+        value = flag_value(flag)
+        return tuple(float(v) for v in value.split(",")) if value else DEFAULT_STEPS
+
+    scenes = load_scenes()
+    scene_ids = args or list(scenes)
+    unknown = [s for s in scene_ids if s not in scenes]
+    if unknown:
+        print(f"Unknown scene(s): {', '.join(unknown)}", file=sys.stderr)
+        print(f"Available: {', '.join(scenes)}")
+        sys.exit(1)
+
+    grid = parameter_grid(steps("--tension"), steps("--distance"), steps("--silence"))
+    out_dir = Path(flag_value("--out") or EXPERIMENTS_DIR / "sweep")
+    workers = int(flag_value("--workers") or 16)
+
+    def on_progress(n: int, total: int) -> None:
+        print(f"\r{n}/{total}", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    columns = run_sweep(
+        [scenes[s] for s in scene_ids],
+        grid,
+        out_dir,
+        workers=workers,
+        save_versions="--save-versions" in sys.argv,
+        use_cache="--no-cache" not in sys.argv,
+        on_progress=on_progress,
+    )
+    elapsed = time.perf_counter() - start
+    rows = len(columns["scene_id"])
+    valid = sum(1 for v in columns["valid"] if v)
+    print(file=sys.stderr)
+    print(f"{rows} points ({valid} valid) in {elapsed:.1f}s → {out_dir / 'results.json'}")
+
+
+if __name__ == "__main__":
+    main()
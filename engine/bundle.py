@@ -0,0 +1,366 @@
+"""
+Script compilation: validate every scene and character against its JSON schema,
+check references across files, and pack scenes, characters and prompt templates
+into one bundle file (data/script.bundle.json).
+The bundle records each source file's mtime and size, so the SceneStore,
+CharacterRegistry and PromptCompiler can seed their caches from it with a single
+read; files edited after the compile are simply re-parsed as usual.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from engine.paths import BUNDLE_PATH, SCRIPTS_DIR
+
+BUNDLE_FORMAT = 1
+
+Validator = Callable[[Any, str], list[str]]
+
+# Keywords that only annotate; everything else outside the supported subset is rejected.
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "default", "examples", "$comment"}
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+
+def compile_schema(schema: dict[str, Any]) -> Validator:
+    """
+    Compile a JSON Schema (draft-07 subset: type, enum, const, required, properties,
+    additionalProperties, items, min/maxItems, min/maxLength, pattern, minimum,
+    maximum) into a function (value, where) -> error messages.
+    """
+    checks: list[Callable[[Any, str, list[str]], None]] = []
+    unknown = set(schema) - _ANNOTATIONS - {
+        "type", "enum", "const", "required", "properties", "additionalProperties", "items",
+        "minItems", "maxItems", "minLength", "maxLength", "pattern", "minimum", "maximum",
+    }
+    if unknown:
+        raise ValueError(f"Unsupported schema keyword(s): {', '.join(sorted(unknown))}")
+
+    type_check = None
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        tests = [_TYPE_CHECKS[n] for n in names]
+        expected = " or ".join(names)
+
+        def type_check(value: Any, where: str, errors: list[str]) -> bool:
+            if any(test(value) for test in tests):
+                return True
+            errors.append(f"{where}: expected {expected}")
+            return False
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, where, errors):
+            if value not in allowed:
+                errors.append(f"{where}: must be one of {', '.join(map(json.dumps, allowed))}")
+        checks.append(check_enum)
+
+    if "const" in schema:
+        const = schema["const"]
+
+        def check_const(value, where, errors):
+            if value != const:
+                errors.append(f"{where}: must be {json.dumps(const)}")
+        checks.append(check_const)
+
+    required = schema.get("required", [])
+    properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    additional_validator = compile_schema(additional) if isinstance(additional, dict) else None
+    if required or properties or additional is not True:
+        def check_object(value, where, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{where}: missing required property '{name}'")
+            for name, item in value.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    errors.extend(validator(item, f"{where}.{name}"))
+                elif additional is False:
+                    errors.append(f"{where}: unexpected property '{name}'")
+                elif additional_validator is not None:
+                    errors.extend(additional_validator(item, f"{where}.{name}"))
+        checks.append(check_object)
+
+    items = compile_schema(schema["items"]) if "items" in schema else None
+    min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+    if items or min_items is not None or max_items is not None:
+        def check_array(value, where, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{where}: needs at least {min_items} item(s)")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{where}: allows at most {max_items} item(s)")
+            if items is not None:
+                for i, item in enumerate(value):
+                    errors.extend(items(item, f"{where}[{i}]"))
+        checks.append(check_array)
+
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    if pattern or min_length is not None or max_length is not None:
+        def check_string(value, where, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{where}: shorter than {min_length}")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{where}: longer than {max_length}")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"{where}: does not match {pattern.pattern}")
+        checks.append(check_string)
+
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_number(value, where, errors):
+            if not _TYPE_CHECKS["number"](value):
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{where}: below minimum {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{where}: above maximum {maximum}")
+        checks.append(check_number)
+
+    def validate(value: Any, where: str = "$") -> list[str]:
+        errors: list[str] = []
+        if type_check is not None and not type_check(value, where, errors):
+            return errors
+        for check in checks:
+            check(value, where, errors)
+        return errors
+
+    return validate
+
+
+_schemas: dict[Path, tuple[int, Validator]] = {}
+_schemas_lock = threading.Lock()
+
+
+def load_schema(path: Path) -> Validator:
+    """Compiled validator for a schema file, recompiled only when the file changes."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _schemas_lock:
+        cached = _schemas.get(path)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+    validator = compile_schema(json.loads(path.read_text(encoding="utf-8")))
+    with _schemas_lock:
+        _schemas[path] = (mtime_ns, validator)
+    return validator
+
+
+def _read_dir(directory: Path, suffix: str, skip: str = "schema.json") -> list[tuple[str, int, int, str]]:
+    """(name, mtime_ns, size, text) per file, sorted by name. Stat precedes read, so a racing edit re-parses later."""
+    files = []
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.name)
+    except FileNotFoundError:
+        return files
+    for entry in entries:
+        if not entry.name.endswith(suffix) or entry.name == skip:
+            continue
+        st = entry.stat()
+        with open(entry.path, encoding="utf-8") as f:
+            files.append((entry.name, st.st_mtime_ns, st.st_size, f.read()))
+    return files
+
+
+def _parse_all(
+    directory: Path,
+    kind: str,
+    id_field: str,
+    validator: Optional[Validator],
+    errors: list[str],
+) -> tuple[dict[str, list], dict[str, str]]:
+    """Parse and validate every JSON file. Returns (file entries, id -> filename)."""
+    entries: dict[str, list] = {}
+    owners: dict[str, str] = {}
+    for name, mtime_ns, size, text in _read_dir(directory, ".json"):
+        where = f"{kind}/{name}"
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            errors.append(f"{where}: invalid JSON ({e.msg} at line {e.lineno})")
+            entries[name] = [mtime_ns, size, None]
+            continue
+        if validator is not None:
+            errors.extend(f"{where}: {msg}" for msg in validator(data, "$"))
+        valid = isinstance(data, dict) and bool(data.get(id_field))
+        entries[name] = [mtime_ns, size, data if valid else None]
+        if not valid:
+            continue
+        item_id = data[id_field]
+        if item_id in owners:
+            errors.append(f"{where}: duplicate {id_field} '{item_id}' (also in {kind}/{owners[item_id]})")
+        else:
+            owners[item_id] = name
+    return entries, owners
+
+
+def compile_scripts(
+    scripts_dir: Optional[Path] = None,
+    out: Optional[Path] = BUNDLE_PATH,
+    start: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Validate scripts/ in one pass and, if there are no errors, write the bundle to
+    `out` (None = check only). Errors: schema violations, invalid JSON, duplicate
+    ids, unknown character ids, transitions to unknown scenes. Warnings: scenes
+    unreachable from `start` (default: the first scene file).
+    Returns {"errors", "warnings", "scenes", "characters", "prompts", "bundle", "seconds"}.
+    """
+    started = time.perf_counter()
+    root = Path(scripts_dir or SCRIPTS_DIR).resolve()
+    scenes_dir, characters_dir, prompts_dir = root / "scenes", root / "characters", root / "prompts"
+    errors: list[str] = []
+    warnings: list[str] = []
+
+    def schema(directory: Path) -> Optional[Validator]:
+        path = directory / "schema.json"
+        return load_schema(path) if path.exists() else None
+
+    scene_files, scene_owner = _parse_all(scenes_dir, "scenes", "scene_id", schema(scenes_dir), errors)
+    character_files, character_owner = _parse_all(
+        characters_dir, "characters", "character_id", schema(characters_dir), errors
+    )
+    prompt_files = {name: [mtime_ns, size, text] for name, mtime_ns, size, text in _read_dir(prompts_dir, ".txt", skip="")}
+
+    scenes = {sid: scene_files[name][2] for sid, name in scene_owner.items()}
+    for sid, scene in scenes.items():
+        where = f"scenes/{scene_owner[sid]}"
+        for cid in scene.get("characters", []):
+            if isinstance(cid, str) and cid not in character_owner:
+                errors.append(f"{where}: unknown character '{cid}'")
+        for t in scene.get("transitions", []):
+            target = t.get("target") if isinstance(t, dict) else None
+            if target and target not in scenes:
+                errors.append(f"{where}: transition to unknown scene '{target}'")
+
+    if scenes:
+        from engine.traversal import GraphIndex
+        start = start or next(iter(scenes))
+        if start not in scenes:
+            errors.append(f"start scene '{start}' not found")
+        else:
+            for sid in GraphIndex(scenes).unreachable(start):
+                warnings.append(f"scenes/{scene_owner[sid]}: '{sid}' is unreachable from {start}")
+
+    bundle_path = None
+    if out is not None and not errors:
+        bundle = {
+            "format": BUNDLE_FORMAT,
+            "scripts_dir": str(root),
+            "created": time.time(),
+            "dirs": {
+                kind: os.stat(directory).st_mtime_ns
+                for kind, directory in (("scenes", scenes_dir), ("characters", characters_dir), ("prompts", prompts_dir))
+                if directory.exists()
+            },
+            "scenes": scene_files,
+            "characters": character_files,
+            "prompts": prompt_files,
+        }
+        out = Path(out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(bundle, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, out)
+        bundle_path = str(out)
+
+    return {
+        "errors": errors,
+        "warnings": warnings,
+        "scenes": len(scene_files),
+        "characters": len(character_files),
+        "prompts": len(prompt_files),
+        "bundle": bundle_path,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+_bundle: Optional[dict[str, Any]] = None
+_bundle_loaded = False
+_bundle_lock = threading.Lock()
+
+
+def load_bundle() -> Optional[dict[str, Any]]:
+    """
+    The compiled bundle, read once per process; None if absent, unreadable or disabled.
+    Env: LIVINGSCRIPT_BUNDLE (path, or 0 to disable; default data/script.bundle.json).
+    """
+    global _bundle, _bundle_loaded
+    with _bundle_lock:
+        if not _bundle_loaded:
+            _bundle_loaded = True
+            setting = os.environ.get("LIVINGSCRIPT_BUNDLE", "")
+            if setting != "0":
+                try:
+                    data = json.loads(Path(setting or BUNDLE_PATH).read_text(encoding="utf-8"))
+                except (OSError, json.JSONDecodeError):
+                    data = None
+                if isinstance(data, dict) and data.get("format") == BUNDLE_FORMAT:
+                    _bundle = data
+        return _bundle
+
+
+def bundle_section(kind: str, directory: Path) -> Optional[tuple[Optional[int], dict[str, list]]]:
+    """
+    (directory mtime_ns at compile time, {filename: [mtime_ns, size, parsed]}) for
+    "scenes", "characters" or "prompts" — only if the bundle was compiled from
+    `directory`. Entries are seeds: callers still stat files and re-parse changed ones.
+    """
+    bundle = load_bundle()
+    if bundle is None:
+        return None
+    if Path(bundle["scripts_dir"]) / kind != Path(directory).resolve():
+        return None
+    return bundle.get("dirs", {}).get(kind), bundle.get(kind, {})
+
+
+def main():
+    """CLI: validate scripts/ and write the bundle.
+    Usage: python run_compile.py [--check] [--out data/script.bundle.json] [--start S1] [--scripts scripts/]
+    """
+    import sys
+
+    def flag_value(flag: str) -> Optional[str]:
+        if flag in sys.argv[:-1]:
+            return sys.argv[sys.argv.index(flag) + 1]
+        return None
+
+    out = None if "--check" in sys.argv else Path(flag_value("--out") or BUNDLE_PATH)
+    scripts = flag_value("--scripts")
+    report = compile_scripts(Path(scripts) if scripts else None, out=out, start=flag_value("--start"))
+    for w in report["warnings"]:
+        print(f"Warning: {w}", file=sys.stderr)
+    for e in report["errors"]:
+        print(f"Error: {e}", file=sys.stderr)
+    summary = (
+        f"{report['scenes']} scenes, {report['characters']} characters, {report['prompts']} prompts"
+        f" in {report['seconds'] * 1000:.0f} ms"
+    )
+    if report["errors"]:
+        print(f"{len(report['errors'])} error(s); {summary}; no bundle written", file=sys.stderr)
+        sys.exit(1)
+    print(f"OK: {summary}" + (f" → {report['bundle']}" if report["bundle"] else ""))
+
+
+if __name__ == "__main__":
+    main()
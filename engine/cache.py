@@ -0,0 +1,177 @@
+"""
+Content-addressed generation cache.
+Keyed by a hash of the final prompt, model name and temperature. In-memory LRU
+tier with optional TTL, plus an optional on-disk tier under data/cache/.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from engine.paths import CACHE_DIR
+
+# Default entry lifetime for the shared cache (seconds): identical prompts replay
+# the same dialogue only for this long.
+DEFAULT_TTL = 3600.0
+
+
+def cache_key(prompt: str, model: str, temperature: float) -> str:
+    """sha256 over (model, temperature, prompt)."""
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\0")
+    h.update(repr(float(temperature)).encode("ascii"))
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+class GenerationCache:
+    """
+    Two-tier cache of generation results (JSON-serializable dicts).
+    max_entries bounds the memory tier (LRU); ttl (seconds, None = forever) applies
+    to both tiers; disk_dir enables the disk tier, pruned to max_disk_entries by age.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[Path] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return entry[1]
+
+    def put(self, key: str, value: dict) -> None:
+        entry = (time.time(), value)
+        with self._lock:
+            self._remember(key, entry)
+        if self.disk_dir:
+            self._disk_put(key, entry)
+
+    def _remember(self, key: str, entry: tuple[float, dict]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, dict]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if self._expired(data.get("created", 0)):
+            path.unlink(missing_ok=True)
+            return None
+        return data["created"], data["value"]
+
+    def _disk_put(self, key: str, entry: tuple[float, dict]) -> None:
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"created": entry[0], "value": entry[1]}), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= max(1, self.max_disk_entries // 10)
+            if prune:
+                self._puts_since_prune = 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Drop expired entries and the oldest ones beyond max_disk_entries."""
+        files = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        excess = len(files) - self.max_disk_entries
+        cutoff = time.time() - self.ttl if self.ttl is not None else None
+        for i, (mtime, path) in enumerate(files):
+            if i < excess or (cutoff is not None and mtime < cutoff):
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "disk": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+_cache: Optional[GenerationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> Optional[GenerationCache]:
+    """
+    Shared cache, configured from the environment; None if disabled.
+    Env: LIVINGSCRIPT_CACHE (0 disables), LIVINGSCRIPT_CACHE_SIZE, LIVINGSCRIPT_CACHE_TTL (seconds,
+    default DEFAULT_TTL; 0 = never expire), LIVINGSCRIPT_CACHE_DISK (1 enables the data/cache/generations/ tier).
+    """
+    global _cache
+    if os.environ.get("LIVINGSCRIPT_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttl = float(os.environ.get("LIVINGSCRIPT_CACHE_TTL") or DEFAULT_TTL)
+            _cache = GenerationCache(
+                max_entries=int(os.environ.get("LIVINGSCRIPT_CACHE_SIZE", 1024)),
+                ttl=ttl if ttl > 0 else None,
+                disk_dir=CACHE_DIR / "generations" if os.environ.get("LIVINGSCRIPT_CACHE_DISK") == "1" else None,
+            )
+        return _cache
@@ -1,32 +1,165 @@
 """Load characters from scripts/characters/."""
 
 import json
+import os
+import threading
 from pathlib import Path
+from typing import Optional
 
+from engine.bundle import bundle_section
 from engine.paths import SCRIPTS_DIR
 
 CHARACTERS_DIR = SCRIPTS_DIR / "characters"
 
 
+class CastBundle:
+    """
+    Resolved per-scene cast. Voices and merged forbidden expressions are not kept
+    here: PromptCompiler and compile_validator already memoize them per scene + cast
+    (keyed on these same character dicts).
+    """
+
+    __slots__ = ("character_ids", "characters")
+
+    def __init__(self, character_ids: tuple[str, ...], characters: tuple[dict, ...]):
+        self.character_ids = character_ids
+        self.characters = characters
+
+
+class CharacterRegistry:
+    """
+    Character index with O(1) lookup by character_id.
+    Files are parsed lazily: a lookup tries the indexed file, then the conventional
+    <character_id>.json, and only rescans the directory when its mtime changed.
+    Each file is re-parsed only when its mtime or size changes.
+    """
+
+    def __init__(self, characters_dir: Optional[Path] = None):
+        self.characters_dir = Path(characters_dir or CHARACTERS_DIR)
+        self._lock = threading.RLock()
+        # filename -> (mtime_ns, size, data or None if unparseable)
+        self._files: dict[str, tuple[int, int, Optional[dict]]] = {}
+        self._index: dict[str, str] = {}
+        self._dir_mtime_ns: Optional[int] = None
+        self._casts: dict[tuple[str, ...], CastBundle] = {}
+
+    def _load(self, name: str) -> Optional[dict]:
+        try:
+            st = os.stat(self.characters_dir / name)
+        except FileNotFoundError:
+            self._forget(name)
+            return None
+        cached = self._files.get(name)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        self._forget(name)
+        try:
+            data = json.loads((self.characters_dir / name).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = None
+        if not isinstance(data, dict) or not data.get("character_id"):
+            data = None
+        self._files[name] = (st.st_mtime_ns, st.st_size, data)
+        if data is not None:
+            self._index[data["character_id"]] = name
+        return data
+
+    def seed(self, files: dict[str, list], dir_mtime_ns: Optional[int] = None) -> None:
+        """Pre-populate from compiled bundle entries ({filename: [mtime_ns, size, data]}); lookups still check stats."""
+        with self._lock:
+            for name, (mtime_ns, size, data) in files.items():
+                if name in self._files:
+                    continue
+                if not isinstance(data, dict) or not data.get("character_id"):
+                    data = None
+                self._files[name] = (mtime_ns, size, data)
+                if data is not None:
+                    self._index.setdefault(data["character_id"], name)
+            if self._dir_mtime_ns is None:
+                self._dir_mtime_ns = dir_mtime_ns
+
+    def _forget(self, name: str) -> None:
+        cached = self._files.pop(name, None)
+        if cached and cached[2] is not None:
+            cid = cached[2]["character_id"]
+            if self._index.get(cid) == name:
+                del self._index[cid]
+
+    def _scan(self, force: bool = False) -> None:
+        try:
+            dir_mtime_ns = os.stat(self.characters_dir).st_mtime_ns
+        except FileNotFoundError:
+            for name in list(self._files):
+                self._forget(name)
+            return
+        if not force and dir_mtime_ns == self._dir_mtime_ns:
+            return
+        names = {
+            p.name for p in self.characters_dir.glob("*.json") if p.name != "schema.json"
+        }
+        for name in list(self._files):
+            if name not in names:
+                self._forget(name)
+        for name in sorted(names):
+            self._load(name)
+        self._dir_mtime_ns = dir_mtime_ns
+
+    def get(self, character_id: str) -> Optional[dict]:
+        """Return a character dict by id, or None. The dict is shared; do not mutate."""
+        with self._lock:
+            for name in (self._index.get(character_id), f"{character_id}.json"):
+                if name is None or name == "schema.json":
+                    continue
+                data = self._load(name)
+                if data is not None and data["character_id"] == character_id:
+                    return data
+            self._scan()
+            name = self._index.get(character_id)
+            return self._load(name) if name else None
+
+    def all(self) -> dict[str, dict]:
+        """Load every character file (re-parsing only changed ones), indexed by character_id."""
+        with self._lock:
+            self._scan(force=True)
+            return {cid: self._files[name][2] for cid, name in self._index.items()}
+
+    def cast(self, scene: dict) -> CastBundle:
+        """Cast bundle for a scene, rebuilt only when one of its character files changed."""
+        ids = tuple(scene.get("characters", []))
+        characters = tuple(c for c in (self.get(cid) for cid in ids) if c is not None)
+        bundle = self._casts.get(ids)
+        if (
+            bundle is not None
+            and len(bundle.characters) == len(characters)
+            and all(a is b for a, b in zip(bundle.characters, characters))
+        ):
+            return bundle
+        bundle = CastBundle(ids, characters)
+        self._casts[ids] = bundle
+        return bundle
+
+
+_registry: Optional[CharacterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_character_registry() -> CharacterRegistry:
+    """Return the shared CharacterRegistry for scripts/characters/."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CharacterRegistry()
+            section = bundle_section("characters", CHARACTERS_DIR)
+            if section is not None:
+                _registry.seed(section[1], section[0])
+        return _registry
+
+
 def load_characters() -> dict[str, dict]:
     """Load all character JSON files, indexed by character_id."""
-    chars = {}
-    if not CHARACTERS_DIR.exists():
-        return chars
-    for path in CHARACTERS_DIR.glob("*.json"):
-        if path.name == "schema.json":
-            continue
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            cid = data.get("character_id")
-            if cid:
-                chars[cid] = data
-        except (json.JSONDecodeError, KeyError):
-            continue
-    return chars
+    return get_character_registry().all()
 
 
 def load_characters_for_scene(scene: dict) -> list[dict]:
     """Load character dicts for characters in the scene."""
-    all_chars = load_characters()
-    return [all_chars[c] for c in scene.get("characters", []) if c in all_chars]
+    return list(get_character_registry().cast(scene).characters)
@@ -0,0 +1,94 @@
+"""
+Shared model clients.
+One connection-pooled OpenAI client per process and one AsyncOpenAI client per
+event loop, configured from the environment. Retries and concurrency limits are
+handled by engine.scheduler, so the clients' own retries are off. Point OPENAI_BASE_URL at any
+OpenAI-compatible server (e.g. a local stub) to test without the real provider.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """
+    Model call settings.
+    Env: LIVINGSCRIPT_MODEL, LIVINGSCRIPT_TEMPERATURE, LIVINGSCRIPT_MODEL_TIMEOUT (seconds),
+    LIVINGSCRIPT_MODEL_CONCURRENCY (max in-flight model calls, enforced by the scheduler),
+    LIVINGSCRIPT_CANDIDATES (default best-of-N sample count; 1 = serial retries only).
+    """
+    model: str = "gpt-4o-mini"
+    temperature: float = 0.7
+    timeout: float = 60.0
+    max_concurrency: int = 256
+    candidates: int = 1
+
+    @classmethod
+    def from_env(cls) -> "ModelConfig":
+        default = cls()
+        return cls(
+            model=os.environ.get("LIVINGSCRIPT_MODEL", default.model),
+            temperature=float(os.environ.get("LIVINGSCRIPT_TEMPERATURE", default.temperature)),
+            timeout=float(os.environ.get("LIVINGSCRIPT_MODEL_TIMEOUT", default.timeout)),
+            max_concurrency=int(os.environ.get("LIVINGSCRIPT_MODEL_CONCURRENCY", default.max_concurrency)),
+            candidates=int(os.environ.get("LIVINGSCRIPT_CANDIDATES", default.candidates)),
+        )
+
+
+_lock = threading.Lock()
+_config: Optional[ModelConfig] = None
+_client: Any = None
+# event loop -> AsyncOpenAI; an async client is bound to the loop it was created on.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def has_api_key() -> bool:
+    """True if real generation is configured."""
+    return bool(os.environ.get("OPENAI_API_KEY"))
+
+
+def get_config() -> ModelConfig:
+    global _config
+    with _lock:
+        if _config is None:
+            _config = ModelConfig.from_env()
+        return _config
+
+
+def configure(**overrides: Any) -> ModelConfig:
+    """Override settings (e.g. configure(max_concurrency=64)). Drops existing clients."""
+    global _config, _client
+    config = replace(get_config(), **overrides)
+    with _lock:
+        _config = config
+        _client = None
+        _async_clients.clear()
+    return config
+
+
+def get_client() -> Any:
+    """Shared synchronous OpenAI client (thread-safe, keeps its connection pool)."""
+    global _client
+    config = get_config()
+    with _lock:
+        if _client is None:
+            from openai import OpenAI
+            _client = OpenAI(timeout=config.timeout, max_retries=0)
+        return _client
+
+
+def get_async_client() -> Any:
+    """Shared AsyncOpenAI client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    config = get_config()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI
+            client = _async_clients[loop] = AsyncOpenAI(timeout=config.timeout, max_retries=0)
+        return client
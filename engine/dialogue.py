@@ -0,0 +1,116 @@
+"""
+Dialogue parsing shared by replay, validation, diffing and the version store.
+A Dialogue keeps the source text plus parallel arrays: one speaker per non-empty
+line ("" when the line has no "NAME:" prefix) and flat offsets into the text
+(line start, content start, line end). The compact form is persisted with each
+version, so stored text is never re-parsed.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Character line: "D: ..." or "J: ..."
+LINE_PATTERN = re.compile(r"^([A-Za-z0-9_]+):\s*(.+)$")
+
+
+class Dialogue:
+    """Parsed dialogue text. Lines are the stripped, non-empty lines of the source."""
+
+    __slots__ = ("source", "speakers", "offsets")
+
+    def __init__(self, source: str, speakers: list[str], offsets: list[int]):
+        self.source = source
+        self.speakers = speakers
+        self.offsets = offsets  # start, content_start, end per line
+
+    @classmethod
+    def parse(cls, text: str) -> "Dialogue":
+        speakers: list[str] = []
+        offsets: list[int] = []
+        pos = 0
+        for raw in text.split("\n"):
+            line = raw.strip()
+            if line:
+                start = pos + raw.index(line[0])
+                m = LINE_PATTERN.match(line)
+                speakers.append(m.group(1) if m else "")
+                offsets.extend((start, start + m.start(2) if m else start, start + len(line)))
+            pos += len(raw) + 1
+        return cls(text, speakers, offsets)
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+    def line(self, i: int) -> str:
+        """Stripped line i."""
+        return self.source[self.offsets[3 * i]: self.offsets[3 * i + 2]]
+
+    def lines(self) -> list[str]:
+        src, off = self.source, self.offsets
+        return [src[off[k]: off[k + 2]] for k in range(0, len(off), 3)]
+
+    def dialogue_lines(self) -> list[str]:
+        """Lines that have a speaker ("NAME: text")."""
+        src, off = self.source, self.offsets
+        return [src[off[3 * i]: off[3 * i + 2]] for i, s in enumerate(self.speakers) if s]
+
+    @property
+    def line_count(self) -> int:
+        """Number of speaker lines."""
+        return sum(1 for s in self.speakers if s)
+
+    def pairs(self) -> list[tuple[str, str]]:
+        """(character, line) per line; lines without a speaker get "?" and their full text."""
+        src, off = self.source, self.offsets
+        return [
+            (s or "?", src[off[3 * i + 1]: off[3 * i + 2]])
+            for i, s in enumerate(self.speakers)
+        ]
+
+    def to_compact(self) -> dict[str, Any]:
+        return {"speakers": self.speakers, "offsets": self.offsets}
+
+    @classmethod
+    def from_compact(cls, text: str, data: dict[str, Any]) -> "Dialogue":
+        return cls(text, list(data["speakers"]), list(data["offsets"]))
+
+
+_parsed: OrderedDict[str, Dialogue] = OrderedDict()
+_parsed_lock = threading.Lock()
+MAX_PARSED = 512
+
+
+def parse(text: str) -> Dialogue:
+    """Dialogue for a text; recent texts are parsed once (generate → validate → save → diff)."""
+    with _parsed_lock:
+        found = _parsed.get(text)
+        if found is not None:
+            _parsed.move_to_end(text)
+            return found
+    dialogue = Dialogue.parse(text)
+    with _parsed_lock:
+        _parsed[text] = dialogue
+        while len(_parsed) > MAX_PARSED:
+            _parsed.popitem(last=False)
+    return dialogue
+
+
+def clear_cache() -> None:
+    """Forget recently parsed texts (e.g. to time cold parses)."""
+    with _parsed_lock:
+        _parsed.clear()
+
+
+def as_dialogue(value: "str | Dialogue") -> Dialogue:
+    return value if isinstance(value, Dialogue) else parse(value)
+
+
+def dialogue_of(version: dict[str, Any]) -> Dialogue:
+    """Dialogue of a stored version, from its persisted compact form when present."""
+    text = version.get("text", "")
+    compact: Optional[dict[str, Any]] = version.get("parsed")
+    if compact:
+        return Dialogue.from_compact(text, compact)
+    return parse(text)
@@ -1,44 +1,273 @@
 """
 Diffing between scene versions.
 Highlights: changed lines, emotional shifts, text diff + metadata diff.
+Line diffs run Myers' algorithm over interned line ids (after trimming the common
+prefix and suffix), with a bounded edit distance; one Comparison per text pair
+serves text_diff, changed_lines and unified_diff_text and is kept in an LRU.
 """
 
-from typing import Any
-import difflib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
 
+from engine.dialogue import Dialogue, as_dialogue
 
-def _lines(text: str) -> list[str]:
-    return [line.strip() for line in text.strip().split("\n") if line.strip()]
+# Edit distance beyond which the trimmed middle is reported as one replacement.
+MAX_EDIT_DISTANCE = 1000
 
+Opcode = tuple[str, int, int, int, int]
 
-def text_diff(old_text: str, new_text: str) -> list[dict[str, Any]]:
+
+def _lines(text: "str | Dialogue") -> list[str]:
+    return as_dialogue(text).lines()
+
+
+def _intern(lines: list[str], table: dict[str, int]) -> list[int]:
+    return [table.setdefault(line, len(table)) for line in lines]
+
+
+def _myers(a: list[int], b: list[int], max_d: int) -> Optional[list[tuple[int, int]]]:
+    """
+    Matched (i, j) pairs of a shortest edit script, or None if it needs more than
+    max_d edits. O((N+M)·D) time, O(D²) trace.
+    """
+    n, m = len(a), len(b)
+    limit = min(n + m, max_d)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+    for d in range(limit + 1):
+        trace.append(v[offset - d - 1: offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace: list[list[int]], x: int, y: int) -> list[tuple[int, int]]:
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        snap = trace[d]  # v before step d, for k in [-d-1, d+1]
+        k = x - y
+        if k == -d or (k != d and snap[k - 1 + d + 1] < snap[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = snap[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y and x > 0 and y > 0:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+
+def _opcodes(a: list[int], b: list[int], max_d: int = MAX_EDIT_DISTANCE) -> list[Opcode]:
+    """difflib-style opcodes; each run of edits between matches is one replace/delete/insert."""
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+    middle = _myers(a[prefix:n - suffix], b[prefix:m - suffix], max_d)
+    matches = [(i, i) for i in range(prefix)]
+    if middle is not None:
+        matches.extend((i + prefix, j + prefix) for i, j in middle)
+    matches.extend((n - suffix + i, m - suffix + i) for i in range(suffix))
+
+    codes: list[Opcode] = []
+    i = j = 0
+    for mi, mj in matches + [(n, m)]:
+        if i < mi or j < mj:
+            tag = "replace" if i < mi and j < mj else "delete" if i < mi else "insert"
+            codes.append((tag, i, mi, j, mj))
+        if mi < n and mj < m:
+            if codes and codes[-1][0] == "equal":
+                _, i1, _, j1, _ = codes[-1]
+                codes[-1] = ("equal", i1, mi + 1, j1, mj + 1)
+            else:
+                codes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return codes
+
+
+def _grouped(codes: list[Opcode], n: int = 3) -> list[list[Opcode]]:
+    """Hunks with up to n lines of context (difflib.SequenceMatcher.get_grouped_opcodes)."""
+    codes = list(codes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+    groups = []
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > n * 2:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def _range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+class Comparison:
+    """
+    One old/new text pair. Interning and the line diff are computed once, lazily;
+    the unified diff (over raw, unstripped lines) likewise.
+    """
+
+    def __init__(self, old: "str | Dialogue", new: "str | Dialogue"):
+        old, new = as_dialogue(old), as_dialogue(new)
+        self.old_text = old.source
+        self.new_text = new.source
+        self._table: dict[str, int] = {}
+        self.old_lines = old.lines()
+        self.new_lines = new.lines()
+        self.old_ids = _intern(self.old_lines, self._table)
+        self.new_ids = _intern(self.new_lines, self._table)
+        self._codes: Optional[list[Opcode]] = None
+        self._hunks: Optional[list[dict[str, Any]]] = None
+        self._changed: Optional[tuple[list[str], list[str]]] = None
+        self._raw_codes: Optional[tuple[list[str], list[str], list[Opcode]]] = None
+
+    @property
+    def opcodes(self) -> list[Opcode]:
+        if self._codes is None:
+            self._codes = _opcodes(self.old_ids, self.new_ids)
+        return self._codes
+
+    def hunks(self) -> list[dict[str, Any]]:
+        if self._hunks is None:
+            old, new = self.old_lines, self.new_lines
+            hunks = []
+            for tag, i1, i2, j1, j2 in self.opcodes:
+                if tag == "equal":
+                    hunks.append({"type": "unchanged", "lines": old[i1:i2]})
+                    continue
+                if i1 < i2:
+                    hunks.append({"type": "removed", "lines": old[i1:i2]})
+                if j1 < j2:
+                    hunks.append({"type": "added", "lines": new[j1:j2]})
+            self._hunks = hunks
+        return [{"type": h["type"], "lines": list(h["lines"])} for h in self._hunks]
+
+    def changed_lines(self) -> tuple[list[str], list[str]]:
+        if self._changed is None:
+            old_set, new_set = set(self.old_ids), set(self.new_ids)
+            lines = {i: line for line, i in self._table.items()}
+            removed = sorted(lines[i] for i in old_set - new_set)
+            added = sorted(lines[i] for i in new_set - old_set)
+            self._changed = removed, added
+        return list(self._changed[0]), list(self._changed[1])
+
+    def unified(self, old_label: str = "old", new_label: str = "new", lineterm: str = "") -> str:
+        """Same output as difflib.unified_diff over splitlines(keepends=True)."""
+        if self._raw_codes is None:
+            a = self.old_text.splitlines(keepends=True)
+            b = self.new_text.splitlines(keepends=True)
+            table: dict[str, int] = {}
+            self._raw_codes = a, b, _opcodes(_intern(a, table), _intern(b, table))
+        a, b, codes = self._raw_codes
+        out = []
+        for group in _grouped(codes):
+            if not out:
+                out.append(f"--- {old_label}{lineterm}")
+                out.append(f"+++ {new_label}{lineterm}")
+            first, last = group[0], group[-1]
+            out.append(f"@@ -{_range(first[1], last[2])} +{_range(first[3], last[4])} @@{lineterm}")
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    out.extend(" " + line for line in a[i1:i2])
+                    continue
+                if tag in ("replace", "delete"):
+                    out.extend("-" + line for line in a[i1:i2])
+                if tag in ("replace", "insert"):
+                    out.extend("+" + line for line in b[j1:j2])
+        return "".join(out)
+
+
+class _ComparisonCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Comparison] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, old: "str | Dialogue", new: "str | Dialogue", key: Optional[Hashable]) -> Comparison:
+        old_text = old.source if isinstance(old, Dialogue) else old
+        new_text = new.source if isinstance(new, Dialogue) else new
+        key = ("versions", key) if key is not None else ("texts", old_text, new_text)
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None and found.old_text == old_text and found.new_text == new_text:
+                self._entries.move_to_end(key)
+                return found
+        comparison = Comparison(old, new)
+        with self._lock:
+            self._entries[key] = comparison
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return comparison
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_comparisons = _ComparisonCache()
+
+
+def clear_cache() -> None:
+    """Forget cached comparisons (e.g. to time cold diffs)."""
+    _comparisons.clear()
+
+
+def compare(old_text: "str | Dialogue", new_text: "str | Dialogue", key: Optional[Hashable] = None) -> Comparison:
+    """
+    Cached Comparison of two texts (or their parsed Dialogues). Pass
+    key=(old_version_id, new_version_id) when diffing stored versions, so reopening
+    a comparison reuses it.
+    """
+    return _comparisons.get(old_text, new_text, key)
+
+
+def text_diff(old_text: "str | Dialogue", new_text: "str | Dialogue", key: Optional[Hashable] = None) -> list[dict[str, Any]]:
     """
     Return list of diff hunks. Each hunk: {"type": "added"|"removed"|"unchanged", "lines": [...]}
     """
-    old_lines = _lines(old_text)
-    new_lines = _lines(new_text)
-    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
-    result = []
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        if tag == "equal":
-            result.append({"type": "unchanged", "lines": old_lines[i1:i2]})
-        elif tag == "replace":
-            result.append({"type": "removed", "lines": old_lines[i1:i2]})
-            result.append({"type": "added", "lines": new_lines[j1:j2]})
-        elif tag == "delete":
-            result.append({"type": "removed", "lines": old_lines[i1:i2]})
-        elif tag == "insert":
-            result.append({"type": "added", "lines": new_lines[j1:j2]})
-    return result
-
-
-def changed_lines(old_text: str, new_text: str) -> tuple[list[str], list[str]]:
+    return compare(old_text, new_text, key).hunks()
+
+
+def changed_lines(old_text: "str | Dialogue", new_text: "str | Dialogue", key: Optional[Hashable] = None) -> tuple[list[str], list[str]]:
     """Return (removed_lines, added_lines)."""
-    old_lines = set(_lines(old_text))
-    new_lines = set(_lines(new_text))
-    removed = sorted(old_lines - new_lines)
-    added = sorted(new_lines - old_lines)
-    return removed, added
+    return compare(old_text, new_text, key).changed_lines()
 
 
 def emotional_shift(
@@ -88,14 +317,12 @@ def metadata_diff(
     }
 
 
-def unified_diff_text(old_text: str, new_text: str, old_label: str = "old", new_label: str = "new") -> str:
+def unified_diff_text(
+    old_text: "str | Dialogue",
+    new_text: "str | Dialogue",
+    old_label: str = "old",
+    new_label: str = "new",
+    key: Optional[Hashable] = None,
+) -> str:
     """Standard unified diff output."""
-    return "".join(
-        difflib.unified_diff(
-            old_text.splitlines(keepends=True),
-            new_text.splitlines(keepends=True),
-            fromfile=old_label,
-            tofile=new_label,
-            lineterm="",
-        )
-    )
+    return compare(old_text, new_text, key).unified(old_label, new_label)
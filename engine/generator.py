@@ -3,20 +3,25 @@ Constrained dialogue generation pipeline.
 Merges scene + constraints → prompt, calls model, returns structured output.
 """
 
-from typing import TYPE_CHECKING, Any, Optional
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Optional
 
-from engine.paths import PROMPTS_DIR
+from engine import metrics
+from engine.cache import GenerationCache, cache_key, get_generation_cache
 from engine.characters import load_characters_for_scene
-from engine.validator import validate
+from engine.client import get_async_client, get_client, get_config, has_api_key
+from engine.prompts import get_prompt_compiler
+from engine.scheduler import ModelRateLimited, Priority, estimate_tokens, get_scheduler
+from engine.validator import IncrementalValidator, validate
 
 if TYPE_CHECKING:
     from engine.controls import ModulationParams
 
 
 def load_template(name: str) -> str:
-    """Load a prompt template from scripts/prompts/."""
-    path = PROMPTS_DIR / name
-    return path.read_text(encoding="utf-8")
+    """Load a prompt template from scripts/prompts/ (cached until the file changes)."""
+    return get_prompt_compiler().source(name)
 
 
 def format_constraints(
@@ -27,64 +32,28 @@ def format_constraints(
     characters: Optional[list[dict]] = None,
 ) -> str:
     """Render the constraints block from scene + modulation params."""
-    template = load_template("constraints.txt")
-    constraints = scene.get("constraints", {})
-    forbidden = list(constraints.get("forbidden_words", []))
-    if characters:
-        for c in characters:
-            forbidden.extend(c.get("forbidden_expressions", []))
-    forbidden_str = ", ".join(f'"{w}"' for w in forbidden) if forbidden else "none"
-    return template.format(
-        max_lines=constraints.get("max_lines", 10),
-        emotional_intensity=emotional_intensity,
-        emotional_distance=emotional_distance,
-        silence_density=silence_density,
-        subtext_over_text=constraints.get("subtext_over_text", True),
-        no_exposition=constraints.get("no_exposition", True),
-        forbidden_language=forbidden_str,
+    return get_prompt_compiler().format_constraints(
+        scene, characters, emotional_intensity, emotional_distance, silence_density
     )
 
 
-def _format_character_voices(characters: list[dict]) -> str:
-    """Format character voice notes and forbidden expressions."""
-    if not characters:
-        return ""
-    lines = []
-    for c in characters:
-        name = c.get("name", c.get("character_id", "?"))
-        voice = c.get("voice_notes", "")
-        forbidden = c.get("forbidden_expressions", [])
-        if voice:
-            lines.append(f"- {name}: {voice}")
-        if forbidden:
-            lines.append(f"  Never says: {', '.join(forbidden)}")
-    if not lines:
-        return ""
-    return "\n" + "\n".join(lines)
-
-
 def build_prompt(
     scene: dict,
     emotional_intensity: float = 5.0,
     emotional_distance: float = 5.0,
     silence_density: float = 0.3,
     characters: Optional[list[dict]] = None,
+    context: Optional[str] = None,
 ) -> str:
-    """Merge scene + constraints into full prompt."""
+    """
+    Merge scene + constraints into full prompt.
+    Static sections are compiled once per scene; only the modulation values are spliced in.
+    context (e.g. a summary of the preceding scene) is added as a "## Previously" section.
+    """
     if characters is None:
         characters = load_characters_for_scene(scene)
-    template = load_template("base_scene.txt")
-    constraints_block = format_constraints(
-        scene, emotional_intensity, emotional_distance, silence_density, characters
-    )
-    character_voices = _format_character_voices(characters)
-    return template.format(
-        setting=scene.get("setting", ""),
-        characters=", ".join(scene.get("characters", [])),
-        character_voices=character_voices,
-        beats="\n".join(f"- {b}" for b in scene.get("beats", [])),
-        emotional_state=", ".join(scene.get("emotional_state", [])),
-        constraints_block=constraints_block,
+    return get_prompt_compiler().build_prompt(
+        scene, characters, emotional_intensity, emotional_distance, silence_density, context
     )
 
 
@@ -99,76 +68,389 @@ def _mock_dialogue(scene: dict) -> str:
     return "\n".join(lines)
 
 
-def call_model(prompt: str, scene: dict | None = None, use_mock: bool = False) -> str:
+def _fallback(scene: dict, reason: str, error: Optional[Exception] = None) -> str:
+    """Sample dialogue in place of model output, counted so outages are not silent."""
+    metrics.MOCK_FALLBACKS.inc(reason)
+    if error is not None:
+        metrics.MODEL_ERRORS.inc(type(error).__name__)
+    return _mock_dialogue(scene)
+
+
+MODEL_RETRIES = 4
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a 429's Retry-After header, if present."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _transient_backoff(attempt: int) -> float:
+    return min(8.0, 0.5 * 2 ** attempt)
+
+
+def _create(prompt: str, priority: Priority, **kwargs: Any) -> Any:
+    """
+    Blocking chat completion through the scheduler. A 429 pauses every priority class
+    and retries; connection errors and 5xx retry with backoff. Raises ModelRateLimited
+    if 429s outlast MODEL_RETRIES.
+    """
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    scheduler = get_scheduler()
+    config = get_config()
+    estimated = estimate_tokens(prompt)
+    for attempt in range(MODEL_RETRIES + 1):
+        last = attempt == MODEL_RETRIES
+        with scheduler.slot(priority, estimated):
+            try:
+                with metrics.stage("model"):
+                    response = get_client().chat.completions.create(
+                        model=config.model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=config.temperature,
+                        **kwargs,
+                    )
+            except RateLimitError as e:
+                if last:
+                    raise ModelRateLimited(f"Rate limited after {MODEL_RETRIES + 1} attempts: {e}") from e
+                scheduler.rate_limited(_retry_after(e))
+                continue
+            except (APIConnectionError, InternalServerError):
+                if last:
+                    raise
+            else:
+                usage = getattr(response, "usage", None)
+                scheduler.record_usage(estimated, usage.total_tokens if usage else None)
+                return response
+        time.sleep(_transient_backoff(attempt))
+
+
+async def _acreate(prompt: str, priority: Priority, **kwargs: Any) -> Any:
+    """Async _create() on the shared AsyncOpenAI client."""
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    scheduler = get_scheduler()
+    config = get_config()
+    estimated = estimate_tokens(prompt)
+    for attempt in range(MODEL_RETRIES + 1):
+        last = attempt == MODEL_RETRIES
+        async with scheduler.aslot(priority, estimated):
+            try:
+                with metrics.stage("model"):
+                    response = await get_async_client().chat.completions.create(
+                        model=config.model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=config.temperature,
+                        **kwargs,
+                    )
+            except RateLimitError as e:
+                if last:
+                    raise ModelRateLimited(f"Rate limited after {MODEL_RETRIES + 1} attempts: {e}") from e
+                scheduler.rate_limited(_retry_after(e))
+                continue
+            except (APIConnectionError, InternalServerError):
+                if last:
+                    raise
+            else:
+                usage = getattr(response, "usage", None)
+                scheduler.record_usage(estimated, usage.total_tokens if usage else None)
+                return response
+        await asyncio.sleep(_transient_backoff(attempt))
+
+
+def call_model(
+    prompt: str,
+    scene: dict | None = None,
+    use_mock: bool = False,
+    priority: Priority = Priority.INTERACTIVE,
+) -> str:
     """
     Call LLM with prompt. Uses OpenAI-compatible API.
     Set OPENAI_API_KEY for real generation. If missing or use_mock=True, returns sample dialogue.
+    Calls are scheduled by priority and rate limits; exhausted 429 retries raise
+    ModelRateLimited instead of falling back to sample dialogue.
     """
     if use_mock and scene:
-        return _mock_dialogue(scene)
+        return _fallback(scene, "requested")
     try:
-        import os
-        if not os.environ.get("OPENAI_API_KEY"):
+        if not has_api_key():
             if scene:
-                return _mock_dialogue(scene)
+                return _fallback(scene, "no_api_key")
             return ""
-        from openai import OpenAI
-        client = OpenAI()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
+        response = _create(prompt, priority)
         return response.choices[0].message.content or ""
+    except ModelRateLimited:
+        raise
     except Exception as e:
         if scene:
-            return _mock_dialogue(scene)
+            return _fallback(scene, "error", e)
+        metrics.MODEL_ERRORS.inc(type(e).__name__)
         raise RuntimeError(f"Model call failed: {e}") from e
 
 
-def generate(
+def call_model_candidates(
+    prompt: str,
+    n: int,
+    scene: dict | None = None,
+    use_mock: bool = False,
+    priority: Priority = Priority.INTERACTIVE,
+) -> list[str]:
+    """
+    Request n completions in one call (the `n` parameter). Same fallbacks as call_model;
+    demo mode returns a single sample.
+    """
+    if use_mock and scene:
+        return [_fallback(scene, "requested")]
+    try:
+        if not has_api_key():
+            if scene:
+                return [_fallback(scene, "no_api_key")]
+            return [""]
+        response = _create(prompt, priority, n=n)
+        return [choice.message.content or "" for choice in response.choices]
+    except ModelRateLimited:
+        raise
+    except Exception as e:
+        if scene:
+            return [_fallback(scene, "error", e)]
+        metrics.MODEL_ERRORS.inc(type(e).__name__)
+        raise RuntimeError(f"Model call failed: {e}") from e
+
+
+async def acall_model(
+    prompt: str,
+    scene: dict | None = None,
+    use_mock: bool = False,
+    priority: Priority = Priority.INTERACTIVE,
+) -> str:
+    """
+    Async call_model on the shared, connection-pooled AsyncOpenAI client.
+    Same scheduling and fallbacks as call_model.
+    """
+    if use_mock and scene:
+        return _fallback(scene, "requested")
+    try:
+        if not has_api_key():
+            if scene:
+                return _fallback(scene, "no_api_key")
+            return ""
+        response = await _acreate(prompt, priority)
+        return response.choices[0].message.content or ""
+    except ModelRateLimited:
+        raise
+    except Exception as e:
+        if scene:
+            return _fallback(scene, "error", e)
+        metrics.MODEL_ERRORS.inc(type(e).__name__)
+        raise RuntimeError(f"Model call failed: {e}") from e
+
+
+async def astream_model(
+    prompt: str,
+    scene: dict | None = None,
+    use_mock: bool = False,
+    priority: Priority = Priority.INTERACTIVE,
+) -> AsyncIterator[str]:
+    """
+    Stream completion text deltas. Closing the iterator (aclose) cancels the upstream request.
+    Holds a scheduler slot for the whole stream; 429s before the first token are retried.
+    Falls back to sample dialogue like call_model if nothing was received yet.
+    """
+    if use_mock or not has_api_key():
+        if scene:
+            yield _fallback(scene, "requested" if use_mock else "no_api_key")
+        return
+    from openai import RateLimitError
+    scheduler = get_scheduler()
+    config = get_config()
+    estimated = estimate_tokens(prompt)
+    emitted = False
+    try:
+        for attempt in range(MODEL_RETRIES + 1):
+            async with scheduler.aslot(priority, estimated):
+                # Model time is the request and the stream read, not the consumer's
+                # time while this generator is suspended at yield.
+                with metrics.stage("model") as timer:
+                    try:
+                        stream = await get_async_client().chat.completions.create(
+                            model=config.model,
+                            messages=[{"role": "user", "content": prompt}],
+                            temperature=config.temperature,
+                            stream=True,
+                        )
+                    except RateLimitError as e:
+                        if attempt == MODEL_RETRIES:
+                            raise ModelRateLimited(f"Rate limited after {MODEL_RETRIES + 1} attempts: {e}") from e
+                        scheduler.rate_limited(_retry_after(e))
+                        continue
+                    try:
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                emitted = True
+                                timer.pause()
+                                yield delta
+                                timer.resume()
+                    finally:
+                        await stream.close()
+                scheduler.record_usage(estimated, None)
+                return
+    except ModelRateLimited:
+        raise
+    except Exception as e:
+        if scene and not emitted:
+            yield _fallback(scene, "error", e)
+            return
+        metrics.MODEL_ERRORS.inc(type(e).__name__)
+        raise RuntimeError(f"Model call failed: {e}") from e
+
+
+MAX_RETRIES = 3
+
+
+def _score(validation: dict[str, Any]) -> tuple[int, int]:
+    """Lower is better: hard errors first, then warnings."""
+    return len(validation["errors"]), len(validation["warnings"])
+
+
+def _best_of(
+    texts: list[str],
     scene: dict,
-    modulation: Optional["ModulationParams"] = None,
-    emotional_intensity: float = 5.0,
-    emotional_distance: float = 5.0,
-    silence_density: float = 0.3,
-    dry_run: bool = False,
-) -> dict[str, Any]:
+    characters: list[dict],
+) -> tuple[str, dict[str, Any]]:
+    """First valid candidate, else the best-scoring one."""
+    best = None
+    for text in texts:
+        with metrics.stage("validate"):
+            validation = validate(text, scene, characters)
+        if validation["valid"]:
+            return text, validation
+        if best is None or _score(validation) < _score(best[1]):
+            best = (text, validation)
+    return best
+
+
+async def _abest_of(
+    prompt: str,
+    n: int,
+    scene: dict,
+    characters: list[dict],
+    priority: Priority = Priority.INTERACTIVE,
+) -> tuple[str, dict[str, Any]]:
     """
-    Full pipeline: build prompt → call model → return structured output.
-    Returns dict with prompt, dialogue, scene_id, emotional_params, constraints_snapshot.
-    If dry_run=True, only builds prompt (no API call).
-    modulation overrides individual intensity/distance/silence params.
+    Run n acall_model requests concurrently and validate each as it lands.
+    Returns the first valid candidate (cancelling the rest), else the best-scoring one.
+    A failed candidate is just missing; sample dialogue is used only if every candidate
+    failed, and ModelRateLimited is raised only if every failure was a rate limit.
     """
+    if not has_api_key():
+        text = _fallback(scene, "no_api_key")
+        with metrics.stage("validate"):
+            return text, validate(text, scene, characters)
+    tasks = [asyncio.create_task(acall_model(prompt, priority=priority)) for _ in range(n)]
+    best = None
+    errors: list[Exception] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                text = await next_done
+            except Exception as e:
+                errors.append(e)
+                continue
+            with metrics.stage("validate"):
+                validation = validate(text, scene, characters)
+            if validation["valid"]:
+                return text, validation
+            if best is None or _score(validation) < _score(best[1]):
+                best = (text, validation)
+    finally:
+        for task in tasks:
+            task.cancel()
+    if best is not None:
+        return best
+    if all(isinstance(e, ModelRateLimited) for e in errors):
+        raise errors[0]
+    # acall_model already counted the model errors.
+    text = _fallback(scene, "error")
+    with metrics.stage("validate"):
+        return text, validate(text, scene, characters)
+
+
+def _cache_slot(prompt: str, use_cache: bool) -> tuple[Optional[GenerationCache], str]:
+    """
+    Cache and key for this prompt under the current model settings. Demo mode (no API
+    key) keys under model "mock", so its sample dialogue is never served once a key is set.
+    """
+    cache = get_generation_cache() if use_cache else None
+    if cache is None:
+        return None, ""
+    config = get_config()
+    model = config.model if has_api_key() else "mock"
+    return cache, cache_key(prompt, model, config.temperature)
+
+
+def _cache_lookup(cache: Optional[GenerationCache], key: str) -> Optional[dict[str, Any]]:
+    if cache is None:
+        return None
+    hit = cache.get(key)
+    metrics.CACHE_LOOKUPS.inc("hit" if hit else "miss")
+    return hit
+
+
+def _cache_store(
+    cache: Optional[GenerationCache],
+    key: str,
+    scene: dict,
+    prompt: str,
+    dialogue: str,
+    validation: dict[str, Any],
+) -> None:
+    """Cache valid output; sample dialogue only in demo mode, never as a fallback for a failed model call."""
+    if cache is None or not validation["valid"]:
+        return
+    if has_api_key() and dialogue == _mock_dialogue(scene):
+        return
+    cache.put(key, {"prompt": prompt, "dialogue": dialogue})
+
+
+def _resolve_params(
+    modulation: Optional["ModulationParams"],
+    emotional_intensity: float,
+    emotional_distance: float,
+    silence_density: float,
+) -> tuple[float, float, float]:
     if modulation:
         params = modulation.to_prompt_params()
-        emotional_intensity = params["emotional_intensity"]
-        emotional_distance = params["emotional_distance"]
-        silence_density = params["silence_density"]
+        return params["emotional_intensity"], params["emotional_distance"], params["silence_density"]
+    return emotional_intensity, emotional_distance, silence_density
 
-    characters = load_characters_for_scene(scene)
-    prompt = build_prompt(
-        scene, emotional_intensity, emotional_distance, silence_density, characters
-    )
 
-    if dry_run:
-        return {
-            "prompt": prompt,
-            "dialogue": "",
-            "scene_id": scene.get("scene_id", ""),
-            "emotional_params": {},
-            "constraints_snapshot": {},
-        }
+def _retry_prompt(prompt: str, attempt: int, validation: dict[str, Any]) -> str:
+    """Tighten the prompt with the previous attempt's validation errors."""
+    metrics.RETRIES.inc()
+    return prompt + f"\n\n[RETRY {attempt+2}/{MAX_RETRIES}]: Previous output had issues: {'; '.join(validation['errors'])}. Please fix."
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        dialogue = call_model(prompt, scene=scene)
-        validation = validate(dialogue, scene, characters)
-        if validation["valid"] or attempt == max_retries - 1:
-            break
-        # Retry with tightened prompt hint
-        prompt = prompt + f"\n\n[RETRY {attempt+2}/{max_retries}]: Previous output had issues: {'; '.join(validation['errors'])}. Please fix."
 
+def _dry_run_result(scene: dict, prompt: str) -> dict[str, Any]:
+    return {
+        "prompt": prompt,
+        "dialogue": "",
+        "scene_id": scene.get("scene_id", ""),
+        "emotional_params": {},
+        "constraints_snapshot": {},
+    }
+
+
+def _result(
+    scene: dict,
+    modulation: Optional["ModulationParams"],
+    prompt: str,
+    dialogue: str,
+    cached: bool = False,
+) -> dict[str, Any]:
     if modulation:
         pp = modulation.to_prompt_params()
         emotional_params = {
@@ -183,18 +465,228 @@ def generate(
         "no_exposition": scene.get("constraints", {}).get("no_exposition", True),
         "subtext_over_text": scene.get("constraints", {}).get("subtext_over_text", True),
     }
+    source = "cache" if cached else "mock" if dialogue == _mock_dialogue(scene) else "model"
+    metrics.GENERATIONS.inc(source)
     return {
         "prompt": prompt,
         "dialogue": dialogue,
         "scene_id": scene.get("scene_id", ""),
         "emotional_params": emotional_params,
         "constraints_snapshot": constraints_snapshot,
+        "cached": cached,
+        "source": source,
     }
 
 
+def generate(
+    scene: dict,
+    modulation: Optional["ModulationParams"] = None,
+    emotional_intensity: float = 5.0,
+    emotional_distance: float = 5.0,
+    silence_density: float = 0.3,
+    dry_run: bool = False,
+    candidates: Optional[int] = None,
+    use_cache: bool = True,
+    priority: Priority = Priority.INTERACTIVE,
+    context: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Full pipeline: build prompt → call model → return structured output.
+    Returns dict with prompt, dialogue, scene_id, emotional_params, constraints_snapshot.
+    If dry_run=True, only builds prompt (no API call).
+    modulation overrides individual intensity/distance/silence params.
+    candidates > 1 samples that many completions in the first round (best-of-N); the
+    serial repair retries only run if none of them validates. Defaults to ModelConfig.candidates.
+    Valid results are cached by (prompt, model, temperature); use_cache=False bypasses the
+    cache. The result's "cached" flag tells whether the model was skipped, and "source"
+    where the dialogue came from: "model", "cache", or "mock" (sample-dialogue fallback).
+    priority selects the scheduler class (interactive, prefetch, batch).
+    context is passed to build_prompt() (summary of the preceding scene).
+    """
+    emotional_intensity, emotional_distance, silence_density = _resolve_params(
+        modulation, emotional_intensity, emotional_distance, silence_density
+    )
+    with metrics.stage("characters"):
+        characters = load_characters_for_scene(scene)
+    with metrics.stage("prompt"):
+        prompt = build_prompt(
+            scene, emotional_intensity, emotional_distance, silence_density, characters, context
+        )
+
+    if dry_run:
+        return _dry_run_result(scene, prompt)
+
+    cache, key = _cache_slot(prompt, use_cache)
+    hit = _cache_lookup(cache, key)
+    if hit:
+        return _result(scene, modulation, hit["prompt"], hit["dialogue"], cached=True)
+
+    n = candidates or get_config().candidates
+    for attempt in range(MAX_RETRIES):
+        if attempt == 0 and n > 1:
+            dialogue, validation = _best_of(
+                call_model_candidates(prompt, n, scene=scene, priority=priority), scene, characters
+            )
+        else:
+            dialogue = call_model(prompt, scene=scene, priority=priority)
+            with metrics.stage("validate"):
+                validation = validate(dialogue, scene, characters)
+        if not validation["valid"]:
+            metrics.VALIDATION_FAILURES.inc()
+        if validation["valid"] or attempt == MAX_RETRIES - 1:
+            break
+        prompt = _retry_prompt(prompt, attempt, validation)
+
+    _cache_store(cache, key, scene, prompt, dialogue, validation)
+    return _result(scene, modulation, prompt, dialogue)
+
+
+async def agenerate(
+    scene: dict,
+    modulation: Optional["ModulationParams"] = None,
+    emotional_intensity: float = 5.0,
+    emotional_distance: float = 5.0,
+    silence_density: float = 0.3,
+    dry_run: bool = False,
+    candidates: Optional[int] = None,
+    use_cache: bool = True,
+    priority: Priority = Priority.INTERACTIVE,
+    context: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Async generate(): same pipeline, cache and result, model calls via acall_model.
+    Best-of-N candidates are requested concurrently; the first valid one wins.
+    """
+    emotional_intensity, emotional_distance, silence_density = _resolve_params(
+        modulation, emotional_intensity, emotional_distance, silence_density
+    )
+    with metrics.stage("characters"):
+        characters = load_characters_for_scene(scene)
+    with metrics.stage("prompt"):
+        prompt = build_prompt(
+            scene, emotional_intensity, emotional_distance, silence_density, characters, context
+        )
+
+    if dry_run:
+        return _dry_run_result(scene, prompt)
+
+    cache, key = _cache_slot(prompt, use_cache)
+    hit = _cache_lookup(cache, key)
+    if hit:
+        return _result(scene, modulation, hit["prompt"], hit["dialogue"], cached=True)
+
+    n = candidates or get_config().candidates
+    for attempt in range(MAX_RETRIES):
+        if attempt == 0 and n > 1:
+            dialogue, validation = await _abest_of(prompt, n, scene, characters, priority)
+        else:
+            dialogue = await acall_model(prompt, scene=scene, priority=priority)
+            with metrics.stage("validate"):
+                validation = validate(dialogue, scene, characters)
+        if not validation["valid"]:
+            metrics.VALIDATION_FAILURES.inc()
+        if validation["valid"] or attempt == MAX_RETRIES - 1:
+            break
+        prompt = _retry_prompt(prompt, attempt, validation)
+
+    _cache_store(cache, key, scene, prompt, dialogue, validation)
+    return _result(scene, modulation, prompt, dialogue)
+
+
+def replay_events(
+    scene: dict,
+    result: dict[str, Any],
+    characters: Optional[list[dict]] = None,
+) -> Iterator[dict[str, Any]]:
+    """astream_generate() events for a finished result (cache hit, prefetch), replayed as a single attempt."""
+    yield {"event": "attempt", "attempt": 1}
+    for line in result["dialogue"].strip().split("\n"):
+        if line.strip():
+            yield {"event": "line", "attempt": 1, "line": line.strip()}
+    if characters is None:
+        characters = load_characters_for_scene(scene)
+    result["validation"] = validate(result["dialogue"], scene, characters)
+    yield {"event": "done", "result": result}
+
+
+async def astream_generate(
+    scene: dict,
+    modulation: Optional["ModulationParams"] = None,
+    emotional_intensity: float = 5.0,
+    emotional_distance: float = 5.0,
+    silence_density: float = 0.3,
+    use_cache: bool = True,
+    priority: Priority = Priority.INTERACTIVE,
+    context: Optional[str] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Streaming generate(). Yields events as dicts:
+      {"event": "attempt", "attempt": n}
+      {"event": "line", "attempt": n, "line": str}        — each completed dialogue line
+      {"event": "retry", "attempt": n, "errors": [...], "aborted": bool}
+      {"event": "done", "result": {...}}                  — same shape as generate() plus "validation"
+    Line count and forbidden phrases are checked per line; on the first hard error the
+    upstream request is cancelled and the retry starts immediately. The last attempt
+    always runs to completion. A cache hit is replayed as a single attempt.
+    """
+    emotional_intensity, emotional_distance, silence_density = _resolve_params(
+        modulation, emotional_intensity, emotional_distance, silence_density
+    )
+    with metrics.stage("characters"):
+        characters = load_characters_for_scene(scene)
+    with metrics.stage("prompt"):
+        prompt = build_prompt(
+            scene, emotional_intensity, emotional_distance, silence_density, characters, context
+        )
+
+    cache, key = _cache_slot(prompt, use_cache)
+    hit = _cache_lookup(cache, key)
+    if hit:
+        for event in replay_events(scene, _result(scene, modulation, hit["prompt"], hit["dialogue"], cached=True), characters):
+            yield event
+        return
+
+    for attempt in range(MAX_RETRIES):
+        last = attempt == MAX_RETRIES - 1
+        checker = IncrementalValidator(scene, characters)
+        aborted = False
+        yield {"event": "attempt", "attempt": attempt + 1}
+        stream = astream_model(prompt, scene=scene, priority=priority)
+        try:
+            async for delta in stream:
+                for line in checker.feed(delta):
+                    yield {"event": "line", "attempt": attempt + 1, "line": line}
+                if checker.errors and not last:
+                    aborted = True
+                    break
+            if not aborted:
+                for line in checker.flush():
+                    yield {"event": "line", "attempt": attempt + 1, "line": line}
+        finally:
+            await stream.aclose()
+        dialogue = checker.text
+        if aborted:
+            validation = {"valid": False, "errors": checker.errors, "warnings": [], "line_count": checker.line_count, "matches": []}
+        else:
+            with metrics.stage("validate"):
+                validation = validate(dialogue, scene, characters)
+        if not validation["valid"]:
+            metrics.VALIDATION_FAILURES.inc()
+        if validation["valid"] or last:
+            break
+        yield {"event": "retry", "attempt": attempt + 1, "errors": validation["errors"], "aborted": aborted}
+        prompt = _retry_prompt(prompt, attempt, validation)
+
+    _cache_store(cache, key, scene, prompt, dialogue, validation)
+    result = _result(scene, modulation, prompt, dialogue)
+    result["validation"] = validation
+    yield {"event": "done", "result": result}
+
+
 def main():
     """CLI: generate dialogue for a scene.
     Usage: python run_generate.py [scene_id] [--dry-run] [--tension 0.7] [--distance 0.4] [--silence 0.5]
+           [--parent version_id]  (default parent: the scene's latest version)
     """
     import sys
     from engine.graph import load_scenes
@@ -202,6 +694,8 @@ def main():
 
     scenes = load_scenes()
     args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--parent" in sys.argv[:-1]:
+        args.remove(sys.argv[sys.argv.index("--parent") + 1])
     dry_run = "--dry-run" in sys.argv
 
     def parse_float(flag: str, default: float) -> float:
@@ -216,6 +710,7 @@ def main():
     tension = parse_float("--tension", 0.5)
     distance = parse_float("--distance", 0.5)
     silence = parse_float("--silence", 0.3)
+    parent = sys.argv[sys.argv.index("--parent") + 1] if "--parent" in sys.argv[:-1] else None
     modulation = ModulationParams(tension=tension, emotional_distance=distance, silence_density=silence)
 
     scene_id = args[0] if args else list(scenes.keys())[0]
@@ -227,12 +722,13 @@ def main():
     scene = scenes[scene_id]
     result = generate(scene, modulation=modulation, dry_run=dry_run)
     if not dry_run and result.get("dialogue"):
-        from engine.memory import save_version
+        from engine.memory import latest_version_id, save_version
         save_version(
             scene_id,
             result["dialogue"],
             result.get("constraints_snapshot", {}),
             result.get("emotional_params", {}),
+            parent_version_id=parent or latest_version_id(scene_id),
         )
     if dry_run:
         print("=== PROMPT (dry run) ===")
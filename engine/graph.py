@@ -4,32 +4,191 @@ Loads scenes from JSON, validates transitions, and supports graph traversal.
 """
 
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 
+from engine import metrics
+from engine.bundle import bundle_section
 from engine.paths import SCENES_DIR
+from engine.traversal import GraphIndex, count_paths, iter_paths
+
+
+class SceneStore:
+    """
+    Process-resident scene graph.
+    Loads scenes/*.json once, then on each refresh only stats the directory and
+    re-parses files whose mtime or size changed. Every change bumps `generation`,
+    which keys the derived data (sorted scene map, adjacency, transition errors).
+    The GraphIndex is replaced by a copy patched with just the scenes whose files changed.
+    """
+
+    def __init__(self, scenes_dir: Optional[Path] = None):
+        self.scenes_dir = Path(scenes_dir or SCENES_DIR)
+        self.generation = 0
+        self._lock = threading.Lock()
+        # filename -> (mtime_ns, size, scene dict or None if unparseable)
+        self._files: dict[str, tuple[int, int, Optional[dict]]] = {}
+        # filename -> why it is not in the graph (bad JSON, not a scene object)
+        self._load_errors: dict[str, str] = {}
+        self._scenes: dict[str, dict] = {}
+        self._next: dict[str, list[tuple[str, str]]] = {}
+        self._errors: Optional[list[str]] = None
+        self._index: Optional[GraphIndex] = None
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stats = {}
+        try:
+            entries = os.scandir(self.scenes_dir)
+        except FileNotFoundError:
+            return stats
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or entry.name == "schema.json":
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                stats[entry.name] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def seed(self, files: dict[str, list]) -> None:
+        """Pre-populate from compiled bundle entries ({filename: [mtime_ns, size, scene]}); refresh still checks stats."""
+        with self._lock:
+            for name, (mtime_ns, size, scene) in files.items():
+                if name not in self._files:
+                    valid = isinstance(scene, dict) and scene.get("scene_id")
+                    self._files[name] = (mtime_ns, size, scene if valid else None)
+                    if not valid:
+                        self._load_errors[name] = "not a scene object with a scene_id"
+
+    def _parse(self, name: str) -> Optional[dict]:
+        """Parsed scene, or None with the reason recorded in load_errors()."""
+        self._load_errors.pop(name, None)
+        try:
+            with open(self.scenes_dir / name, encoding="utf-8") as f:
+                scene = json.load(f)
+        except json.JSONDecodeError as e:
+            self._load_errors[name] = f"invalid JSON: {e}"
+            return None
+        except OSError as e:
+            self._load_errors[name] = f"unreadable: {e}"
+            return None
+        if not isinstance(scene, dict) or not scene.get("scene_id"):
+            self._load_errors[name] = "not a scene object with a scene_id"
+            return None
+        return scene
+
+    def refresh(self) -> int:
+        """Re-parse changed files. Returns the current generation."""
+        with self._lock, metrics.stage("scenes"):
+            stats = self._scan()
+            changed: set[str] = set()  # scene_ids whose file appeared, changed or vanished
+            for name in list(self._files):
+                if name not in stats:
+                    self._load_errors.pop(name, None)
+                    old = self._files.pop(name)[2]
+                    changed.add(old["scene_id"] if old else "")
+            for name, (mtime_ns, size) in stats.items():
+                cached = self._files.get(name)
+                if cached and cached[0] == mtime_ns and cached[1] == size:
+                    continue
+                scene = self._parse(name)
+                self._files[name] = (mtime_ns, size, scene)
+                changed.add(scene["scene_id"] if scene else "")
+                if cached and cached[2]:
+                    changed.add(cached[2]["scene_id"])
+            if changed or self.generation == 0:
+                self._rebuild(changed)
+            return self.generation
+
+    def _rebuild(self, changed: set[str] = frozenset()) -> None:
+        scenes = {}
+        for name in sorted(self._files):
+            scene = self._files[name][2]
+            if scene is not None:
+                scenes[scene["scene_id"]] = scene
+        self._scenes = scenes
+        self._next = {sid: get_next_scenes(scene) for sid, scene in scenes.items()}
+        self._errors = None
+        if self._index is not None:
+            # Swap in a new index; requests holding the old one keep a consistent view.
+            self._index = self._index.updated(scenes, changed)
+        self.generation += 1
+
+    def scenes(self) -> dict[str, dict]:
+        """All scenes indexed by scene_id. The dict is shared; do not mutate."""
+        self.refresh()
+        return self._scenes
+
+    def get(self, scene_id: str) -> Optional[dict]:
+        """Return one scene, or None if unknown."""
+        return self.scenes().get(scene_id)
+
+    def next_scenes(self, scene_id: str) -> list[tuple[str, str]]:
+        """Precomputed (target_id, transition_type) list for a scene."""
+        self.refresh()
+        return self._next.get(scene_id, [])
+
+    def graph_index(self) -> GraphIndex:
+        """Reverse adjacency, reachability, distances, dead ends and orphans for the current graph."""
+        scenes = self.scenes()
+        with self._lock:
+            if self._index is None:
+                self._index = GraphIndex(scenes)
+            return self._index
+
+    def load_errors(self) -> list[str]:
+        """Scene files left out of the graph, as "<file>: <reason>" (the store skips them rather than failing)."""
+        self.refresh()
+        with self._lock:
+            return [f"{name}: {reason}" for name, reason in sorted(self._load_errors.items())]
+
+    def transition_errors(self) -> list[str]:
+        """validate_transitions() over the current graph, cached per generation."""
+        scenes = self.scenes()
+        with self._lock:
+            if self._errors is None:
+                self._errors = _check_transitions(scenes)
+            return list(self._errors)
+
+
+_stores: dict[Path, SceneStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_scene_store(scenes_dir: Optional[Path] = None) -> SceneStore:
+    """Return the shared SceneStore for a scenes directory (default: scripts/scenes/)."""
+    key = Path(scenes_dir or SCENES_DIR).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SceneStore(key)
+            section = bundle_section("scenes", key)
+            if section is not None:
+                store.seed(section[1])
+        return store
 
 
 def load_scenes(scenes_dir: Optional[Path] = None) -> dict[str, dict]:
-    """Load all scene JSON files from the scenes directory."""
-    base = scenes_dir or SCENES_DIR
-    scenes = {}
-    for path in base.glob("*.json"):
-        if path.name == "schema.json":
-            continue
-        with open(path, encoding="utf-8") as f:
-            scene = json.load(f)
-        scene_id = scene.get("scene_id")
-        if scene_id:
-            scenes[scene_id] = scene
-    return scenes
-
-
-def validate_transitions(scenes: dict[str, dict]) -> list[str]:
+    """Load all scene JSON files from the scenes directory (served from the SceneStore)."""
+    return dict(get_scene_store(scenes_dir).scenes())
+
+
+def validate_transitions(scenes: Optional[dict[str, dict]] = None) -> list[str]:
     """
     Validate that all transition targets exist.
     Returns list of error messages (empty if valid).
+    With no argument, checks the resident scene graph (cached until a file changes).
     """
+    if scenes is None:
+        return get_scene_store().transition_errors()
+    return _check_transitions(scenes)
+
+
+def _check_transitions(scenes: dict[str, dict]) -> list[str]:
     errors = []
     scene_ids = set(scenes.keys())
     for scene_id, scene in scenes.items():
@@ -41,10 +200,13 @@ def validate_transitions(scenes: dict[str, dict]) -> list[str]:
     return errors
 
 
-def get_next_scenes(scene: dict) -> list[tuple[str, str]]:
+def get_next_scenes(scene: dict | str) -> list[tuple[str, str]]:
     """
     Return list of (target_id, transition_type) for valid next scenes.
+    Accepts a scene dict, or a scene_id looked up in the resident SceneStore.
     """
+    if isinstance(scene, str):
+        return get_scene_store().next_scenes(scene)
     transitions = scene.get("transitions", [])
     return [(t["target"], t.get("type", "default")) for t in transitions if t.get("target")]
 
@@ -57,29 +219,17 @@ def traverse(
     """
     Enumerate all paths through the graph from start_id.
     Returns list of paths (each path is a list of scene_ids).
+    Use engine.traversal.iter_paths to stream them with limits, or count_paths to count.
     """
-    path = path or [start_id]
-    if start_id not in scenes:
-        return []
-    scene = scenes[start_id]
-    next_scenes = get_next_scenes(scene)
-    if not next_scenes:
-        return [path]  # dead end
-    all_paths = []
-    for target_id, _ in next_scenes:
-        if target_id in path:
-            # loop detected — stop and record path up to loop
-            all_paths.append(path + [f"{target_id} (loop)"])
-        else:
-            sub_paths = traverse(scenes, target_id, path + [target_id])
-            all_paths.extend(sub_paths)
-    return all_paths
+    return list(iter_paths(scenes, start_id, path=path))
 
 
 def main():
     """CLI: load graph and print valid next scenes for a given scene."""
     import sys
     scenes = load_scenes()
+    for e in get_scene_store().load_errors():
+        print(f"Warning: skipped {e}", file=sys.stderr)
     if not scenes:
         print("No scenes found.", file=sys.stderr)
         sys.exit(1)
@@ -101,6 +251,7 @@ def main():
         print(f"  → {target} ({ttype})")
     if not next_scenes:
         print("  (dead end)")
+    print(f"Routes from here: {count_paths(scenes, scene_id)}")
 
 
 if __name__ == "__main__":
@@ -1,25 +1,626 @@
 """
 Scene versioning with semantic metadata.
 Stores text, constraints, emotional parameters, timestamp.
-JSON-based storage — no external DB required.
+Pluggable storage: embedded SQLite (default, data/versions.sqlite3 — no external
+DB required) with a metadata index on (scene_id, timestamp) and text kept in a
+separate table, or the original one-JSON-file-per-version tree.
+In SQLite a version with a parent stores its text as a line delta against the
+parent, with a full snapshot every SNAPSHOT_INTERVAL generations of lineage.
+Each version also carries its parsed dialogue ("parsed": speakers + offsets,
+see engine.dialogue), computed once at save time.
 """
 
+import difflib
 import json
-from datetime import datetime, timezone
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
-from engine.paths import VERSIONS_DIR
+from engine import metrics
+from engine.dialogue import parse
+from engine.paths import VERSIONS_DB, VERSIONS_DIR
 
 
 def _ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def _version_path(scene_id: str, version_id: str) -> Path:
-    return VERSIONS_DIR / scene_id / f"{version_id}.json"
+def _metadata(data: dict[str, Any]) -> dict[str, Any]:
+    """Version metadata as returned by list_versions (no text)."""
+    return {
+        "version_id": data["version_id"],
+        "scene_id": data["scene_id"],
+        "timestamp": data["timestamp"],
+        "emotional_params": data.get("emotional_params", {}),
+        "constraints": data.get("constraints", {}),
+        "parent_version_id": data.get("parent_version_id"),
+    }
+
+
+# Emotional params that can be range-filtered in list_versions.
+PARAM_COLUMNS = ("tension", "emotional_distance", "silence_density")
+
+ParamRanges = dict[str, tuple[Optional[float], Optional[float]]]
+
+
+def version_cursor(version: dict[str, Any]) -> str:
+    """Pagination cursor for a listed version: "<timestamp>|<version_id>"."""
+    return f"{version['timestamp']}|{version['version_id']}"
+
+
+def _cursor_key(item: dict[str, Any] | str) -> tuple[str, ...]:
+    """Sort key of a version or a cursor; a bare-timestamp cursor compares on timestamp only."""
+    if isinstance(item, dict):
+        return item["timestamp"], item["version_id"]
+    ts, _, vid = item.partition("|")
+    return (ts, vid) if vid else (ts,)
+
+
+def _check_param_ranges(param_ranges: Optional[ParamRanges]) -> None:
+    for name in param_ranges or {}:
+        if name not in PARAM_COLUMNS:
+            raise ValueError(f"Unknown emotional param: {name}")
+
+
+def _in_ranges(params: dict[str, Any], param_ranges: Optional[ParamRanges]) -> bool:
+    for name, (lo, hi) in (param_ranges or {}).items():
+        value = params.get(name)
+        if value is None or (lo is not None and value < lo) or (hi is not None and value > hi):
+            return False
+    return True
+
+
+class JsonTreeBackend:
+    """data/versions/<scene_id>/<version_id>.json — one file per version."""
+
+    name = "json"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or VERSIONS_DIR)
+        self._seq_lock = threading.Lock()
+
+    def _path(self, scene_id: str, version_id: str) -> Path:
+        return self.root / scene_id / f"{version_id}.json"
+
+    def _next_seqs(self, scene_id: str, count: int) -> int:
+        """Reserve count commit numbers from the scene's counter (<scene_id>/.seq); returns the first."""
+        path = self.root / scene_id / ".seq"
+        with self._seq_lock:
+            try:
+                last = int(path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                last = 0
+            path.write_text(str(last + count), encoding="utf-8")
+        return last + 1
+
+    def save(self, data: dict[str, Any]) -> None:
+        self.save_many([data])
+
+    def save_many(self, records: list[dict[str, Any]]) -> None:
+        """
+        Write each version to a temp file and rename it into place, so a crash never
+        leaves a torn file. Files are fsynced together before the renames, and each
+        touched directory once after them.
+        """
+        staged = []
+        by_scene: dict[str, list[dict[str, Any]]] = {}
+        for data in records:
+            by_scene.setdefault(data["scene_id"], []).append(data)
+        for scene_id, scene_records in by_scene.items():
+            _ensure_dir(self.root / scene_id)
+            first = self._next_seqs(scene_id, len(scene_records))
+            for offset, data in enumerate(scene_records):
+                data["seq"] = first + offset
+        for data in records:
+            path = self._path(data["scene_id"], data["version_id"])
+            _ensure_dir(path.parent)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, indent=2))
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((tmp, path))
+        for tmp, path in staged:
+            os.replace(tmp, path)
+        if hasattr(os, "O_DIRECTORY"):
+            for directory in {path.parent for _, path in staged}:
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def load(self, scene_id: str, version_id: str) -> dict[str, Any] | None:
+        path = self._path(scene_id, version_id)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def list_since(self, scene_id: str, seq: Optional[int] = None) -> list[dict[str, Any]]:
+        """Metadata plus "seq" of versions written after commit number seq, in write order (legacy files count as 0)."""
+        dir_path = self.root / scene_id
+        if not dir_path.exists():
+            return []
+        versions = []
+        for f in dir_path.glob("*.json"):
+            try:
+                data = json.loads(f.read_text(encoding="utf-8"))
+                meta = {**_metadata(data), "seq": data.get("seq", 0)}
+            except (json.JSONDecodeError, KeyError):
+                continue
+            if seq is None or meta["seq"] > seq:
+                versions.append(meta)
+        versions.sort(key=lambda v: (v["seq"], v["timestamp"], v["version_id"]))
+        return versions
+
+    def list(
+        self,
+        scene_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        param_ranges: Optional[ParamRanges] = None,
+        parent_version_id: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Reads every file of the scene, so cost grows with history; use SQLite for large histories."""
+        _check_param_ranges(param_ranges)
+        dir_path = self.root / scene_id
+        if not dir_path.exists():
+            return []
+        versions = []
+        for f in dir_path.glob("*.json"):
+            try:
+                versions.append(_metadata(json.loads(f.read_text(encoding="utf-8"))))
+            except (json.JSONDecodeError, KeyError):
+                continue
+        versions.sort(key=_cursor_key, reverse=True)
+        if before:
+            bound = _cursor_key(before)
+            versions = [v for v in versions if _cursor_key(v)[: len(bound)] < bound]
+        if after:
+            bound = _cursor_key(after)
+            versions = [v for v in versions if _cursor_key(v)[: len(bound)] > bound]
+        versions = [
+            v for v in versions
+            if _in_ranges(v["emotional_params"], param_ranges)
+            and (parent_version_id is None or v["parent_version_id"] == parent_version_id)
+        ]
+        if limit is not None:
+            versions = versions[-limit:] if after and not before else versions[:limit]
+        return versions
+
+    def iter_all(self):
+        """Every stored version (full records), for migration."""
+        for f in sorted(self.root.glob("*/*.json")):
+            try:
+                data = json.loads(f.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                continue
+            if "version_id" in data and "scene_id" in data and "timestamp" in data:
+                yield data
+
+
+# Longest delta chain before a full snapshot is stored.
+SNAPSHOT_INTERVAL = 16
+
+
+def encode_delta(base: str, text: str) -> list:
+    """
+    Line delta turning base into text: [start, end] copies base lines[start:end],
+    a string is a literal line.
+    """
+    a = base.split("\n")
+    b = text.split("\n")
+    delta: list = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        else:
+            delta.extend(b[j1:j2])
+    return delta
+
+
+def apply_delta(base: str, delta: list) -> str:
+    a = base.split("\n")
+    out: list[str] = []
+    for item in delta:
+        if isinstance(item, str):
+            out.append(item)
+        else:
+            out.extend(a[item[0]:item[1]])
+    return "\n".join(out)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    version_id TEXT NOT NULL UNIQUE,
+    scene_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    parent_version_id TEXT,
+    tension REAL,
+    emotional_distance REAL,
+    silence_density REAL,
+    emotional_params TEXT NOT NULL,
+    constraints TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_scene_time ON versions (scene_id, timestamp);
+CREATE INDEX IF NOT EXISTS versions_scene_seq ON versions (scene_id, seq);
+CREATE TABLE IF NOT EXISTS version_texts (
+    version_id TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS version_dialogue (
+    version_id TEXT PRIMARY KEY,
+    parsed TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS version_deltas (
+    version_id TEXT PRIMARY KEY,
+    base_version_id TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    delta TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_META_COLUMNS = "version_id, scene_id, timestamp, parent_version_id, emotional_params, constraints"
+
+
+class SQLiteBackend:
+    """
+    Embedded SQLite store. Metadata rows are indexed on (scene_id, timestamp);
+    text lives in its own tables so listing never reads it: version_texts holds full
+    snapshots, version_deltas line deltas against a base version (at most
+    snapshot_interval deep). One connection per thread.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[Path] = None, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.path = Path(path or VERSIONS_DB)
+        self.snapshot_interval = snapshot_interval
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # Reconstructed texts of recent versions, so saving a child of the latest
+        # version does not replay its delta chain.
+        self._texts: OrderedDict[str, str] = OrderedDict()
+        self._texts_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            _ensure_dir(self.path.parent)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL: WAL commits are fsynced; group commit (batch()) amortizes the cost.
+            conn.execute("PRAGMA synchronous=FULL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(data: dict[str, Any]) -> tuple:
+        params = data.get("emotional_params", {}) or {}
+        return (
+            data["version_id"],
+            data["scene_id"],
+            data["timestamp"],
+            data.get("parent_version_id"),
+            params.get("tension"),
+            params.get("emotional_distance"),
+            params.get("silence_density"),
+            json.dumps(params),
+            json.dumps(data.get("constraints", {}) or {}),
+        )
+
+    def _remember_text(self, version_id: str, text: str) -> None:
+        with self._texts_lock:
+            self._texts[version_id] = text
+            self._texts.move_to_end(version_id)
+            while len(self._texts) > 256:
+                self._texts.popitem(last=False)
+
+    def _text(self, conn: sqlite3.Connection, version_id: str) -> Optional[str]:
+        """Full text of a version, replaying its delta chain from the nearest snapshot."""
+        chain = []
+        current = version_id
+        while True:
+            with self._texts_lock:
+                text = self._texts.get(current)
+            if text is not None:
+                break
+            row = conn.execute("SELECT text FROM version_texts WHERE version_id = ?", (current,)).fetchone()
+            if row is not None:
+                text = row[0]
+                break
+            row = conn.execute(
+                "SELECT base_version_id, delta FROM version_deltas WHERE version_id = ?", (current,)
+            ).fetchone()
+            if row is None:
+                return None
+            chain.append(row[1])
+            current = row[0]
+        for delta in reversed(chain):
+            text = apply_delta(text, json.loads(delta))
+        if chain:
+            self._remember_text(version_id, text)
+        return text
+
+    def _write_text(self, conn: sqlite3.Connection, data: dict[str, Any]) -> None:
+        """Store text as a delta against the parent, or as a snapshot when that is not worth it."""
+        version_id = data["version_id"]
+        text = data.get("text", "")
+        parent = data.get("parent_version_id")
+        conn.execute("DELETE FROM version_texts WHERE version_id = ?", (version_id,))
+        conn.execute("DELETE FROM version_deltas WHERE version_id = ?", (version_id,))
+        with self._texts_lock:
+            self._texts.pop(version_id, None)
+        base = self._text(conn, parent) if parent and parent != version_id else None
+        if base is not None:
+            row = conn.execute("SELECT depth FROM version_deltas WHERE version_id = ?", (parent,)).fetchone()
+            depth = (row[0] if row else 0) + 1
+            if depth <= self.snapshot_interval:
+                delta = json.dumps(encode_delta(base, text), separators=(",", ":"))
+                if len(delta) < len(text):
+                    conn.execute(
+                        "INSERT INTO version_deltas (version_id, base_version_id, depth, delta) VALUES (?, ?, ?, ?)",
+                        (version_id, parent, depth, delta),
+                    )
+                    self._remember_text(version_id, text)
+                    return
+        conn.execute("INSERT INTO version_texts (version_id, text) VALUES (?, ?)", (version_id, text))
+        self._remember_text(version_id, text)
+
+    def _insert(self, conn: sqlite3.Connection, data: dict[str, Any], verb: str = "INSERT OR REPLACE") -> bool:
+        cursor = conn.execute(
+            f"{verb} INTO versions (version_id, scene_id, timestamp, parent_version_id, tension,"
+            " emotional_distance, silence_density, emotional_params, constraints)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._row(data),
+        )
+        if cursor.rowcount == 0:
+            return False  # INSERT OR IGNORE of an existing version
+        self._write_text(conn, data)
+        parsed = data.get("parsed") or parse(data.get("text", "")).to_compact()
+        conn.execute(
+            "INSERT OR REPLACE INTO version_dialogue (version_id, parsed) VALUES (?, ?)",
+            (data["version_id"], json.dumps(parsed, separators=(",", ":"))),
+        )
+        return True
+
+    def save(self, data: dict[str, Any]) -> None:
+        self.save_many([data])
+
+    def save_many(self, records: list[dict[str, Any]]) -> None:
+        """All records in one transaction (one commit, one WAL sync)."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for data in records:
+                self._insert(conn, data)
 
+    @staticmethod
+    def _meta(row: tuple) -> dict[str, Any]:
+        version_id, scene_id, timestamp, parent, params, constraints = row
+        return {
+            "version_id": version_id,
+            "scene_id": scene_id,
+            "timestamp": timestamp,
+            "emotional_params": json.loads(params),
+            "constraints": json.loads(constraints),
+            "parent_version_id": parent,
+        }
 
+    def load(self, scene_id: str, version_id: str) -> dict[str, Any] | None:
+        conn = self._conn()
+        row = conn.execute(
+            f"SELECT {_META_COLUMNS} FROM versions WHERE version_id = ? AND scene_id = ?",
+            (version_id, scene_id),
+        ).fetchone()
+        if row is None:
+            return None
+        data = self._meta(row)
+        data["text"] = self._text(conn, version_id) or ""
+        parsed = conn.execute("SELECT parsed FROM version_dialogue WHERE version_id = ?", (version_id,)).fetchone()
+        if parsed is not None:
+            data["parsed"] = json.loads(parsed[0])
+        return data
+
+    def list_since(self, scene_id: str, seq: Optional[int] = None) -> list[dict[str, Any]]:
+        """Metadata plus "seq" of versions inserted after row seq, in insertion order."""
+        rows = self._conn().execute(
+            f"SELECT seq, {_META_COLUMNS} FROM versions WHERE scene_id = ? AND seq > ? ORDER BY seq",
+            (scene_id, -1 if seq is None else seq),
+        ).fetchall()
+        return [{**self._meta(row[1:]), "seq": row[0]} for row in rows]
+
+    def list(
+        self,
+        scene_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        param_ranges: Optional[ParamRanges] = None,
+        parent_version_id: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Range scan on the (scene_id, timestamp) index starting at the cursor, so a page
+        costs O(limit) rather than O(history). Ties on timestamp break on insertion order.
+        """
+        _check_param_ranges(param_ranges)
+        conn = self._conn()
+        where = ["scene_id = ?"]
+        args: list[Any] = [scene_id]
+
+        def cursor_clause(cursor: str, op: str) -> None:
+            ts, _, vid = cursor.partition("|")
+            row = conn.execute("SELECT seq FROM versions WHERE version_id = ?", (vid,)).fetchone() if vid else None
+            if row is None:
+                where.append(f"timestamp {op} ?")
+                args.append(ts)
+            else:
+                # Row-value comparison, so SQLite seeks the index to the cursor.
+                where.append(f"(timestamp, seq) {op} (?, ?)")
+                args.extend((ts, row[0]))
+
+        if before:
+            cursor_clause(before, "<")
+        if after:
+            cursor_clause(after, ">")
+        for name, (lo, hi) in (param_ranges or {}).items():
+            if lo is not None:
+                where.append(f"{name} >= ?")
+                args.append(lo)
+            if hi is not None:
+                where.append(f"{name} <= ?")
+                args.append(hi)
+        if parent_version_id is not None:
+            where.append("parent_version_id = ?")
+            args.append(parent_version_id)
+        # Paging forward from an `after` cursor scans upward, then flips to newest-first.
+        ascending = bool(after) and not before
+        order = "ASC" if ascending else "DESC"
+        sql = f"SELECT {_META_COLUMNS} FROM versions WHERE {' AND '.join(where)} ORDER BY timestamp {order}, seq {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        rows = conn.execute(sql, args).fetchall()
+        if ascending:
+            rows.reverse()
+        return [self._meta(row) for row in rows]
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM versions LIMIT 1").fetchone() is None
+
+    def import_versions(self, records) -> int:
+        """Bulk insert full records in one transaction, keeping existing ids. Returns rows added."""
+        conn = self._conn()
+        added = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for data in sorted(records, key=lambda d: d["timestamp"]):
+                added += self._insert(conn, data, verb="INSERT OR IGNORE")
+        return added
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _import_legacy_tree(backend: SQLiteBackend, source: Path = VERSIONS_DIR) -> None:
+    """Import an existing JSON version tree into a still-empty database, so upgrading keeps history."""
+    if not any(source.glob("*/*.json")) or not backend.is_empty():
+        return
+    import sys
+    added = backend.import_versions(JsonTreeBackend(source).iter_all())
+    print(f"Imported {added} versions from {source} into {backend.path}", file=sys.stderr)
+
+
+def get_backend():
+    """
+    Active version store. Env LIVINGSCRIPT_VERSION_STORE=sqlite (default) or json.
+    The first time the SQLite store is opened empty, an existing data/versions/ tree is imported.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind = os.environ.get("LIVINGSCRIPT_VERSION_STORE", "sqlite")
+            if kind == "json":
+                _backend = JsonTreeBackend()
+            else:
+                _backend = SQLiteBackend()
+                _import_legacy_tree(_backend)
+        return _backend
+
+
+def set_backend(backend) -> None:
+    """Swap the version store (e.g. SQLiteBackend(tmp_path) in benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+_clock_lock = threading.Lock()
+_last_us = 0
+
+
+def _next_time() -> datetime:
+    """UTC now, strictly increasing within the process at microsecond resolution."""
+    global _last_us
+    with _clock_lock:
+        us = max(time.time_ns() // 1000, _last_us + 1)
+        _last_us = us
+    return datetime.fromtimestamp(us // 1_000_000, timezone.utc) + timedelta(microseconds=us % 1_000_000)
+
+
+def new_version_id(scene_id: str, now: datetime) -> str:
+    """
+    <scene_id>_<YYYYmmdd_HHMMSS_micro>_<pid>: unique within a process by the monotonic
+    clock, across processes (e.g. several uvicorn workers) by the pid.
+    """
+    return f"{scene_id}_{now.strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+
+
+class SaveBatch:
+    """Versions buffered by batch(); written max_pending at a time in one commit."""
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self._pending: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Held across swap and write: flush() returns only once every earlier add() is stored.
+        self._commit_lock = threading.Lock()
+
+    def add(self, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append(data)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._commit_lock:
+            with self._lock:
+                records, self._pending = self._pending, []
+            if records:
+                get_backend().save_many(records)
+
+
+_batch: ContextVar[Optional[SaveBatch]] = ContextVar("version_save_batch", default=None)
+
+
+@contextmanager
+def batch(max_pending: int = 256):
+    """
+    Group commit: save_version() calls in this context (including tasks and
+    to_thread calls started from it) are buffered and written together, flushed
+    every max_pending saves and on exit. Buffered versions are not visible to
+    load/list until flushed. Nested batch() joins the outer one.
+    """
+    current = _batch.get()
+    if current is not None:
+        yield current
+        return
+    group = SaveBatch(max_pending)
+    token = _batch.set(group)
+    try:
+        yield group
+    finally:
+        _batch.reset(token)
+        group.flush()
+
+
+@metrics.timed("save")
 def save_version(
     scene_id: str,
     text: str,
@@ -30,51 +631,89 @@ def save_version(
     """
     Save a scene version. Returns version_id.
     """
-    _ensure_dir(VERSIONS_DIR / scene_id)
-    now = datetime.now(timezone.utc)
-    timestamp = now.isoformat()
-    version_id = f"{scene_id}_{now.strftime('%Y%m%d_%H%M%S')}"
-    path = _version_path(scene_id, version_id)
+    now = _next_time()
+    version_id = new_version_id(scene_id, now)
     data = {
         "version_id": version_id,
         "scene_id": scene_id,
         "text": text,
         "constraints": constraints,
         "emotional_params": emotional_params,
-        "timestamp": timestamp,
+        "timestamp": now.isoformat(),
         "parent_version_id": parent_version_id,
+        "parsed": parse(text).to_compact(),
     }
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    group = _batch.get()
+    if group is not None:
+        group.add(data)
+    else:
+        get_backend().save(data)
     return version_id
 
 
+def latest_version_id(scene_id: str) -> Optional[str]:
+    """Newest version of a scene (the default parent of the next one), or None."""
+    latest = list_versions(scene_id, limit=1)
+    return latest[0]["version_id"] if latest else None
+
+
 def load_version(scene_id: str, version_id: str) -> dict[str, Any] | None:
     """Load a specific version. Returns None if not found."""
-    path = _version_path(scene_id, version_id)
-    if not path.exists():
-        return None
-    return json.loads(path.read_text(encoding="utf-8"))
+    return get_backend().load(scene_id, version_id)
 
 
-def list_versions(scene_id: str) -> list[dict[str, Any]]:
+def list_versions(
+    scene_id: str,
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    param_ranges: Optional[ParamRanges] = None,
+    parent_version_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
     """
-    List all versions for a scene, newest first.
+    List versions for a scene, newest first.
     Returns list of version metadata (without full text).
+    Pagination: at most `limit` versions strictly older than the `before` cursor and/or
+    newer than the `after` cursor (see version_cursor). Filters: param_ranges maps
+    tension / emotional_distance / silence_density to (min, max), either end None;
+    parent_version_id matches direct children.
+    """
+    return get_backend().list(scene_id, limit, before, after, param_ranges, parent_version_id)
+
+
+def list_versions_since(scene_id: str, seq: Optional[int] = None) -> list[dict[str, Any]]:
+    """
+    Versions of a scene stored after the one with commit number seq (None = all), in the
+    order they were written, each with its "seq". Unlike timestamps, seq follows write
+    order, so versions a group commit wrote late are not missed.
     """
-    dir_path = VERSIONS_DIR / scene_id
-    if not dir_path.exists():
-        return []
-    versions = []
-    for f in dir_path.glob("*.json"):
-        try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-            versions.append({
-                "version_id": data["version_id"],
-                "scene_id": data["scene_id"],
-                "timestamp": data["timestamp"],
-                "emotional_params": data.get("emotional_params", {}),
-                "constraints": data.get("constraints", {}),
-            })
-        except (json.JSONDecodeError, KeyError):
-            continue
-    return sorted(versions, key=lambda v: v["timestamp"], reverse=True)
+    return get_backend().list_since(scene_id, seq)
+
+
+def migrate_json_tree(source: Optional[Path] = None, target: Optional[SQLiteBackend] = None) -> int:
+    """Import a data/versions/ JSON tree into SQLite. Idempotent; returns versions added."""
+    backend = target or SQLiteBackend()
+    return backend.import_versions(JsonTreeBackend(source).iter_all())
+
+
+def main():
+    """CLI: import the legacy JSON version tree. python run_migrate_versions.py [source_dir] [--db path]"""
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    db = None
+    if "--db" in sys.argv:
+        i = sys.argv.index("--db")
+        if i + 1 < len(sys.argv):
+            db = Path(sys.argv[i + 1])
+            args = [a for a in args if a != sys.argv[i + 1]]
+    source = Path(args[0]) if args else VERSIONS_DIR
+    if not source.exists():
+        print(f"No version tree at {source}", file=sys.stderr)
+        sys.exit(1)
+    target = SQLiteBackend(db)
+    added = migrate_json_tree(source, target)
+    print(f"Imported {added} versions from {source} into {target.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Lightweight in-process instrumentation.
+Counters and histograms rendered in the Prometheus text format (/api/metrics), and
+stage timers that also feed an optional per-request trace (Server-Timing header).
+Disabled with LIVINGSCRIPT_METRICS=0: stage() then hands back one shared no-op
+context manager and counters return immediately.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+ENABLED = os.environ.get("LIVINGSCRIPT_METRICS", "1") != "0"
+
+# Seconds; generation stages range from sub-millisecond (prompt render) to a minute (model calls).
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter, one series per tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                out.append(f"{self.name}{_label_text(self.labels, labels)} {value:g}")
+        return out
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not ENABLED:
+            return
+        i = 0
+        buckets = self.buckets
+        while i < len(buckets) and value > buckets[i]:
+            i += 1
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in snapshot:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _label_text(self.labels, labels, 'le="%s"' % le)
+                out.append(f"{self.name}_bucket{bucket_labels} {cumulative:g}")
+            out.append(f"{self.name}_sum{_label_text(self.labels, labels)} {series[-1]:.6f}")
+            out.append(f"{self.name}_count{_label_text(self.labels, labels)} {cumulative:g}")
+        return out
+
+
+_registry: list["Counter | Histogram"] = []
+
+
+def counter(name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+    metric = Counter(name, help, labels)
+    _registry.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, labels, buckets)
+    _registry.append(metric)
+    return metric
+
+
+STAGE_SECONDS = histogram(
+    "livingscript_stage_seconds",
+    "Time spent per pipeline stage (scenes, characters, prompt, model, validate, save).",
+    ("stage",),
+)
+REQUEST_SECONDS = histogram("livingscript_request_seconds", "API request latency by route.", ("route",))
+GENERATIONS = counter(
+    "livingscript_generations_total",
+    "Finished generations by where the dialogue came from (model, cache, mock).",
+    ("source",),
+)
+MOCK_FALLBACKS = counter(
+    "livingscript_mock_fallbacks_total",
+    "Sample dialogue returned instead of model output (no_api_key, error, requested).",
+    ("reason",),
+)
+MODEL_ERRORS = counter("livingscript_model_errors_total", "Failed model calls by exception type.", ("error",))
+RETRIES = counter("livingscript_generation_retries_total", "Repair retries after failed validation.")
+VALIDATION_FAILURES = counter("livingscript_validation_failures_total", "Generation attempts that failed validation.")
+CACHE_LOOKUPS = counter("livingscript_cache_lookups_total", "Generation cache lookups (hit, miss).", ("result",))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Per-request trace: [(stage, seconds)] while a trace is active (see start_trace()).
+_trace: ContextVar[Optional[list[tuple[str, float]]]] = ContextVar("livingscript_trace", default=None)
+
+
+def start_trace() -> list[tuple[str, float]]:
+    """Record stage timings for the current context (and threads/tasks started from it)."""
+    spans: list[tuple[str, float]] = []
+    _trace.set(spans)
+    return spans
+
+
+def server_timing(spans: list[tuple[str, float]]) -> str:
+    """Server-Timing header value; repeated stages (retries) are summed, in first-seen order."""
+    totals: dict[str, list[float]] = {}
+    for name, seconds in spans:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    return ", ".join(
+        f"{name};dur={total * 1000:.2f}" + (f';desc="x{n}"' if n > 1 else "")
+        for name, (total, n) in totals.items()
+    )
+
+
+class _Stage:
+    __slots__ = ("name", "started", "elapsed")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.elapsed = 0.0
+        self.started = time.perf_counter()
+        return self
+
+    def pause(self) -> None:
+        """Stop the clock, e.g. while a generator is suspended at yield."""
+        if self.started is not None:
+            self.elapsed += time.perf_counter() - self.started
+            self.started = None
+
+    def resume(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.pause()
+        STAGE_SECONDS.observe(self.elapsed, self.name)
+        spans = _trace.get()
+        if spans is not None:
+            spans.append((self.name, self.elapsed))
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def pause(self) -> None:
+        return None
+
+    def resume(self) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str) -> "_Stage | _NoStage":
+    """
+    Context manager timing one stage into livingscript_stage_seconds and the active
+    trace. The value it enters as has pause() and resume() to leave time out.
+    """
+    return _Stage(name) if ENABLED else _NO_STAGE
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of stage() for sync and async functions."""
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with _Stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -7,3 +7,7 @@ SCRIPTS_DIR = PROJECT_ROOT / "scripts"
 SCENES_DIR = SCRIPTS_DIR / "scenes"
 PROMPTS_DIR = SCRIPTS_DIR / "prompts"
 VERSIONS_DIR = PROJECT_ROOT / "data" / "versions"
+VERSIONS_DB = PROJECT_ROOT / "data" / "versions.sqlite3"
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+BUNDLE_PATH = PROJECT_ROOT / "data" / "script.bundle.json"
+EXPERIMENTS_DIR = PROJECT_ROOT / "experiments" / "emotional-drifts"
@@ -0,0 +1,287 @@
+"""
+Whole-path script generation.
+Plans a set of scenes (everything reachable from a start scene, an explicit path,
+or a chosen subgraph), gives each scene one predecessor — the previous scene on its
+shortest route from a root — and generates them as a dependency DAG: a scene starts
+as soon as its predecessor's version exists, with a compact summary of that version
+as prompt context, so independent branches run in parallel.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from engine.characters import load_characters_for_scene
+from engine.controls import ModulationParams
+from engine.dialogue import parse
+from engine.generator import agenerate
+from engine.scheduler import Priority
+from engine.validator import validate
+
+SUMMARY_LINES = 4
+SUMMARY_LINE_CHARS = 200
+
+
+def plan(
+    scenes: dict[str, dict],
+    start: Optional[str] = None,
+    path: Optional[list[str]] = None,
+    subgraph: Optional[list[str]] = None,
+) -> dict[str, Optional[str]]:
+    """
+    {scene_id: predecessor scene_id or None}, in generation order (BFS from the roots).
+    path: consecutive scenes, each a transition of the previous one ("X (loop)"
+    markers from traverse() are dropped). subgraph: a set of scenes; roots are those
+    no other selected scene transitions to. Otherwise every scene reachable from
+    start (default: the first scene). Raises KeyError / ValueError for unknown scenes
+    or broken paths.
+    """
+    if path is not None:
+        steps = [sid for sid in path if not sid.endswith(" (loop)")]
+        for sid in steps:
+            if sid not in scenes:
+                raise KeyError(f"Unknown scene: {sid}")
+        if len(set(steps)) != len(steps):
+            raise ValueError("Path visits a scene twice; each scene is generated once")
+        order: dict[str, Optional[str]] = {}
+        for prev, sid in zip([None] + steps, steps):
+            if prev is not None and sid not in {t.get("target") for t in scenes[prev].get("transitions", [])}:
+                raise ValueError(f"No transition from {prev} to {sid}")
+            order[sid] = prev
+        return order
+
+    if subgraph is not None:
+        selected = list(dict.fromkeys(subgraph))
+        for sid in selected:
+            if sid not in scenes:
+                raise KeyError(f"Unknown scene: {sid}")
+    else:
+        start = start if start is not None else next(iter(scenes), None)
+        if start is None:
+            return {}
+        if start not in scenes:
+            raise KeyError(f"Unknown scene: {start}")
+        selected = None
+
+    def successors(sid: str) -> list[str]:
+        targets = (t.get("target") for t in scenes[sid].get("transitions", []))
+        return [t for t in targets if t in scenes and (selected is None or t in chosen)]
+
+    if selected is None:
+        chosen: set[str] = set(scenes)
+        roots = [start]
+    else:
+        chosen = set(selected)
+        has_pred = {t for sid in selected for t in successors(sid) if t != sid}
+        roots = [sid for sid in selected if sid not in has_pred]
+
+    order = {}
+    for root in roots + (selected or []):  # scenes only reachable through a cycle become roots
+        if root in order:
+            continue
+        order[root] = None
+        queue = deque([root])
+        while queue:
+            sid = queue.popleft()
+            for t in successors(sid):
+                if t not in order:
+                    order[t] = sid
+                    queue.append(t)
+    return order
+
+
+def summarize(scene: dict, dialogue: str, max_lines: int = SUMMARY_LINES) -> str:
+    """Compact summary of a generated scene for the next scene's prompt: setting, register, last lines."""
+    parts = [f"Scene {scene.get('scene_id', '?')}: {scene.get('setting', '').strip()}"]
+    register = ", ".join(scene.get("emotional_state", []))
+    if register:
+        parts.append(f"Emotional register: {register}.")
+    lines = parse(dialogue).dialogue_lines()[-max_lines:] if dialogue else []
+    if lines:
+        parts.append("It ended:")
+        parts.extend(line if len(line) <= SUMMARY_LINE_CHARS else line[: SUMMARY_LINE_CHARS - 1] + "…" for line in lines)
+    return "\n".join(parts)
+
+
+async def agenerate_path(
+    scenes: dict[str, dict],
+    order: dict[str, Optional[str]],
+    modulation: Optional[ModulationParams] = None,
+    workers: int = 8,
+    save_versions: bool = True,
+    use_cache: bool = True,
+    dry_run: bool = False,
+    on_scene: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Generate every scene in `order` (from plan()) with at most `workers` generations
+    in flight. Each scene waits only for its predecessor; if that one fails, the scene
+    and everything after it are skipped; a generation, validation or save error marks
+    the scene failed rather than aborting the run. Returns {scene_id: row} in plan order, where
+    row has scene_id, predecessor, status ("ok", "failed", "skipped"), dialogue,
+    valid, errors, cached, version_id, latency_ms and the context used.
+    Versions are group-committed (memory.batch) and chained to each scene's latest version.
+    """
+    limit = asyncio.Semaphore(max(1, workers))
+    done: dict[str, asyncio.Future] = {sid: asyncio.get_running_loop().create_future() for sid in order}
+    rows: dict[str, dict[str, Any]] = {}
+
+    async def run(sid: str) -> None:
+        scene = scenes[sid]
+        prev = order[sid]
+        row: dict[str, Any] = {
+            "scene_id": sid, "predecessor": prev, "status": "ok", "dialogue": "",
+            "valid": False, "errors": [], "cached": False, "version_id": None,
+            "latency_ms": 0.0, "context": None,
+        }
+        try:
+            if prev is not None:
+                parent = await done[prev]
+                if parent["status"] != "ok":
+                    row.update(status="skipped", errors=[f"predecessor {prev} {parent['status']}"])
+                    return
+                row["context"] = summarize(scenes[prev], parent["dialogue"])
+            async with limit:
+                started = time.perf_counter()
+                try:
+                    result = await agenerate(
+                        scene, modulation=modulation, dry_run=dry_run, use_cache=use_cache,
+                        priority=Priority.BATCH, context=row["context"],
+                    )
+                except Exception as e:
+                    row.update(status="failed", errors=[str(e)])
+                    return
+                finally:
+                    row["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            row["dialogue"] = result["dialogue"]
+            if dry_run:
+                row["prompt"] = result["prompt"]
+                return
+            try:
+                validation = validate(result["dialogue"], scene, load_characters_for_scene(scene))
+            except Exception as e:
+                row.update(status="failed", errors=[f"validation failed: {e}"])
+                return
+            row.update(valid=validation["valid"], errors=validation["errors"], cached=result.get("cached", False))
+            if save_versions and result["dialogue"]:
+                from engine.memory import latest_version_id, save_version
+                try:
+                    row["version_id"] = await asyncio.to_thread(
+                        lambda: save_version(
+                            sid,
+                            result["dialogue"],
+                            result.get("constraints_snapshot", {}),
+                            result.get("emotional_params", {}),
+                            parent_version_id=latest_version_id(sid),
+                        )
+                    )
+                except Exception as e:
+                    row.update(status="failed", errors=[*row["errors"], f"save failed: {e}"])
+        finally:
+            rows[sid] = row
+            done[sid].set_result(row)
+            if on_scene:
+                on_scene(row)
+
+    if save_versions and not dry_run:
+        from engine.memory import batch
+        group_commit = batch(max_pending=64)
+    else:
+        group_commit = contextlib.nullcontext()
+    with group_commit:
+        await asyncio.gather(*(run(sid) for sid in order))
+    return {sid: rows[sid] for sid in order}
+
+
+def generate_path(*args: Any, **kwargs: Any) -> dict[str, dict[str, Any]]:
+    """Synchronous agenerate_path()."""
+    return asyncio.run(agenerate_path(*args, **kwargs))
+
+
+def main():
+    """CLI: draft a whole branching script.
+    Usage: python run_pipeline.py [start_scene] [--path S1,S2,S4] [--scenes S1,S2,S3]
+           [--tension 0.5] [--distance 0.5] [--silence 0.3] [--workers 8]
+           [--out draft.json] [--dry-run] [--no-save] [--no-cache]
+    """
+    import sys
+    from engine.graph import load_scenes
+
+    flags_with_values = {"--path", "--scenes", "--tension", "--distance", "--silence", "--workers", "--out"}
+    args = []
+    skip = False
+    for a in sys.argv[1:]:
+        if skip:
+            skip = False
+            continue
+        if a in flags_with_values:
+            skip = True
+            continue
+        if not a.startswith("--"):
+            args.append(a)
+
+    def flag_value(flag: str) -> Optional[str]:
+        if flag in sys.argv[:-1]:
+            return sys.argv[sys.argv.index(flag) + 1]
+        return None
+
+    def ids(flag: str) -> Optional[list[str]]:
+        value = flag_value(flag)
+        return [s.strip() for s in value.split(",") if s.strip()] if value else None
+
+    scenes = load_scenes()
+    try:
+        order = plan(scenes, start=args[0] if args else None, path=ids("--path"), subgraph=ids("--scenes"))
+    except (KeyError, ValueError) as e:
+        print(e.args[0] if e.args else e, file=sys.stderr)
+        print(f"Available: {', '.join(scenes)}")
+        sys.exit(1)
+
+    modulation = ModulationParams(
+        tension=float(flag_value("--tension") or 0.5),
+        emotional_distance=float(flag_value("--distance") or 0.5),
+        silence_density=float(flag_value("--silence") or 0.3),
+    )
+    dry_run = "--dry-run" in sys.argv
+
+    def on_scene(row: dict[str, Any]) -> None:
+        mark = "✓" if row["valid"] or (dry_run and row["status"] == "ok") else "✗"
+        via = f" ← {row['predecessor']}" if row["predecessor"] else ""
+        print(f"{mark} {row['scene_id']}{via} [{row['status']}, {row['latency_ms']:.0f} ms]", file=sys.stderr)
+
+    start = time.perf_counter()
+    rows = generate_path(
+        scenes,
+        order,
+        modulation=modulation,
+        workers=int(flag_value("--workers") or 8),
+        save_versions="--no-save" not in sys.argv,
+        use_cache="--no-cache" not in sys.argv,
+        dry_run=dry_run,
+        on_scene=on_scene,
+    )
+    elapsed = time.perf_counter() - start
+
+    out = flag_value("--out")
+    if out:
+        out_path = Path(out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"order": list(order), "scenes": rows}, indent=2), encoding="utf-8")
+        os.replace(tmp, out_path)
+    else:
+        for sid, row in rows.items():
+            print(f"=== {sid}" + (f" (after {row['predecessor']})" if row["predecessor"] else "") + " ===")
+            print(row.get("prompt", "") if dry_run else row["dialogue"] or f"[{row['status']}: {'; '.join(row['errors'])}]")
+            print()
+    valid = sum(1 for row in rows.values() if row["valid"])
+    print(f"{len(rows)} scenes ({valid} valid) in {elapsed:.1f}s" + (f" → {out}" if out else ""), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
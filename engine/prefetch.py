@@ -0,0 +1,160 @@
+"""
+Speculative pre-generation of successor scenes.
+When a scene is opened, queue background generations for its graph successors at
+the current slider values. Results live briefly and are consumed (once) by
+/api/generate and /api/generate/stream.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from engine.controls import ModulationParams
+from engine.graph import get_scene_store
+from engine.scheduler import Priority
+
+PrefetchKey = tuple[str, float, float, float]
+
+
+def prefetch_key(scene_id: str, modulation: ModulationParams) -> PrefetchKey:
+    return (
+        scene_id,
+        round(modulation.tension, 4),
+        round(modulation.emotional_distance, 4),
+        round(modulation.silence_density, 4),
+    )
+
+
+class Prefetcher:
+    """
+    Per-process prefetcher; must be used from a running event loop.
+    max_successors bounds what one scene load queues, max_inflight bounds total
+    background generations, ttl (seconds) bounds how long a result is kept.
+    Opening another scene cancels the session's prefetches that are no longer relevant
+    (unless another session still wants them); sessions are client ids, the
+    max_sessions most recently active are tracked.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 120.0,
+        max_successors: int = 4,
+        max_inflight: int = 8,
+        max_sessions: int = 1024,
+    ):
+        self.ttl = ttl
+        self.max_successors = max_successors
+        self.max_inflight = max_inflight
+        self.max_sessions = max_sessions
+        self._results: dict[PrefetchKey, tuple[float, dict[str, Any]]] = {}
+        self._tasks: dict[PrefetchKey, asyncio.Task] = {}
+        self._sessions: OrderedDict[str, set[PrefetchKey]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._results.items() if expires < now]:
+            del self._results[key]
+
+    def on_scene_load(
+        self,
+        scene_id: str,
+        modulation: ModulationParams,
+        session: str = "default",
+    ) -> list[str]:
+        """Queue successor generations for scene_id. Returns the scene_ids queued."""
+        self._expire()
+        store = get_scene_store()
+        wanted = {
+            prefetch_key(target, modulation)
+            for target, _ in store.next_scenes(scene_id)[: self.max_successors]
+        }
+        # Keep the scene just opened: the user is likely to regenerate it next.
+        keep = wanted | {prefetch_key(scene_id, modulation)}
+        previous = self._sessions.pop(session, set())
+        self._sessions[session] = keep
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        others = set().union(*(keys for s, keys in self._sessions.items() if s != session))
+        for key in previous - keep - others:
+            task = self._tasks.pop(key, None)
+            if task is not None and not task.done():
+                task.cancel()
+                self.cancelled += 1
+
+        queued = []
+        for key in sorted(wanted):
+            if key in self._results or key in self._tasks:
+                continue
+            if len(self._tasks) >= self.max_inflight:
+                break
+            scene = store.get(key[0])
+            if scene is None:
+                continue
+            self._tasks[key] = asyncio.create_task(self._run(key, scene, modulation))
+            queued.append(key[0])
+        return queued
+
+    async def _run(self, key: PrefetchKey, scene: dict, modulation: ModulationParams) -> dict[str, Any]:
+        from engine.generator import agenerate
+        try:
+            # Fresh generations only: a prefetched result stands in for an explicit regenerate.
+            result = await agenerate(scene, modulation=modulation, use_cache=False, priority=Priority.PREFETCH)
+            self._results[key] = (time.monotonic() + self.ttl, result)
+            return result
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    async def take(self, scene_id: str, modulation: ModulationParams) -> Optional[dict[str, Any]]:
+        """
+        Consume a prefetched result for (scene, sliders). Waits for a prefetch already
+        in flight rather than starting a duplicate request. None if nothing was prefetched.
+        """
+        self._expire()
+        key = prefetch_key(scene_id, modulation)
+        entry = self._results.pop(key, None)
+        if entry is None and key in self._tasks:
+            try:
+                await asyncio.shield(self._tasks[key])
+            except Exception:
+                pass
+            entry = self._results.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def stats(self) -> dict[str, Any]:
+        self._expire()
+        return {
+            "inflight": len(self._tasks),
+            "ready": len(self._results),
+            "hits": self.hits,
+            "misses": self.misses,
+            "cancelled": self.cancelled,
+        }
+
+
+_prefetcher: Optional[Prefetcher] = None
+
+
+def get_prefetcher() -> Optional[Prefetcher]:
+    """
+    Shared Prefetcher, or None unless enabled (it spends model calls speculatively).
+    Env: LIVINGSCRIPT_PREFETCH=1, LIVINGSCRIPT_PREFETCH_TTL, LIVINGSCRIPT_PREFETCH_BUDGET (max in flight).
+    """
+    global _prefetcher
+    if os.environ.get("LIVINGSCRIPT_PREFETCH") != "1":
+        return None
+    if _prefetcher is None:
+        _prefetcher = Prefetcher(
+            ttl=float(os.environ.get("LIVINGSCRIPT_PREFETCH_TTL", 120)),
+            max_inflight=int(os.environ.get("LIVINGSCRIPT_PREFETCH_BUDGET", 8)),
+        )
+    return _prefetcher
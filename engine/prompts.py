@@ -0,0 +1,277 @@
+"""
+Compiled prompt templates.
+Templates in scripts/prompts/ are parsed once into literal/slot segments. Each
+scene's static sections (setting, beats, voices, forbidden language) are rendered
+once; per call only the modulation values are spliced in.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from string import Formatter
+from typing import Any, Optional
+
+from engine.bundle import bundle_section
+from engine.paths import PROMPTS_DIR
+
+# Fields filled per call from ModulationParams; everything else is static per scene.
+DYNAMIC_FIELDS = ("emotional_intensity", "emotional_distance", "silence_density")
+
+_formatter = Formatter()
+
+# A compiled template is a list of literal strings and (field_name, conversion, format_spec) slots.
+Segments = list[Any]
+
+
+def compile_template(text: str) -> Segments:
+    """Parse a str.format template into literal and slot segments."""
+    segments: Segments = []
+    for literal, field, spec, conversion in _formatter.parse(text):
+        if literal:
+            segments.append(literal)
+        if field is not None:
+            segments.append((field, conversion, spec or ""))
+    return segments
+
+
+def _format_slot(slot: tuple, values: dict[str, Any]) -> str:
+    field, conversion, spec = slot
+    value, _ = _formatter.get_field(field, (), values)
+    value = _formatter.convert_field(value, conversion)
+    return _formatter.format_field(value, spec)
+
+
+def render_partial(segments: Segments, values: dict[str, Any], keep: tuple[str, ...] = DYNAMIC_FIELDS) -> Segments:
+    """
+    Resolve every slot not named in `keep`. A value that is itself a segment list
+    is spliced in (nested templates). Adjacent literals are merged.
+    """
+    out: Segments = []
+
+    def emit(part: Any) -> None:
+        if isinstance(part, str):
+            if out and isinstance(out[-1], str):
+                out[-1] += part
+            elif part:
+                out.append(part)
+        else:
+            out.append(part)
+
+    for seg in segments:
+        if isinstance(seg, str):
+            emit(seg)
+            continue
+        field, conversion, spec = seg
+        if field in keep:
+            emit(seg)
+            continue
+        value = values.get(field)
+        if isinstance(value, list) and not conversion and not spec:
+            for part in value:
+                emit(part)
+        else:
+            emit(_format_slot(seg, values))
+    return out
+
+
+class ScenePrompt:
+    """A scene's prompt with only the modulation slots left open."""
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: Segments):
+        self.segments = segments
+
+    def render(
+        self,
+        emotional_intensity: float = 5.0,
+        emotional_distance: float = 5.0,
+        silence_density: float = 0.3,
+    ) -> str:
+        values = {
+            "emotional_intensity": emotional_intensity,
+            "emotional_distance": emotional_distance,
+            "silence_density": silence_density,
+        }
+        return "".join(seg if isinstance(seg, str) else _format_slot(seg, values) for seg in self.segments)
+
+
+class _CompiledEntry:
+    __slots__ = ("scene", "characters", "templates_generation", "prompt", "constraints")
+
+    def __init__(self, scene, characters, templates_generation, prompt, constraints):
+        self.scene = scene
+        self.characters = characters
+        self.templates_generation = templates_generation
+        self.prompt = prompt
+        self.constraints = constraints
+
+
+def forbidden_language(scene: dict, characters: Optional[list[dict]] = None) -> str:
+    """Merged scene + character forbidden phrases, quoted for the prompt."""
+    forbidden = list(scene.get("constraints", {}).get("forbidden_words", []))
+    if characters:
+        for c in characters:
+            forbidden.extend(c.get("forbidden_expressions", []))
+    return ", ".join(f'"{w}"' for w in forbidden) if forbidden else "none"
+
+
+def with_context(prompt: str, context: str) -> str:
+    """Insert a "## Previously" section (what happened in the preceding scene) before the first section."""
+    section = f"## Previously\n{context.strip()}\n\n"
+    i = prompt.find("\n## ")
+    return prompt + "\n\n" + section.rstrip() if i < 0 else prompt[: i + 1] + section + prompt[i + 1:]
+
+
+def format_character_voices(characters: list[dict]) -> str:
+    """Format character voice notes and forbidden expressions."""
+    if not characters:
+        return ""
+    lines = []
+    for c in characters:
+        name = c.get("name", c.get("character_id", "?"))
+        voice = c.get("voice_notes", "")
+        forbidden = c.get("forbidden_expressions", [])
+        if voice:
+            lines.append(f"- {name}: {voice}")
+        if forbidden:
+            lines.append(f"  Never says: {', '.join(forbidden)}")
+    if not lines:
+        return ""
+    return "\n" + "\n".join(lines)
+
+
+class PromptCompiler:
+    """
+    Caches compiled templates (invalidated by file mtime/size) and per-scene
+    compiled prompts. A scene entry is reused while the scene dict and character
+    dicts are the same objects — the SceneStore swaps in a new dict when a scene
+    file changes, which invalidates the entry.
+    """
+
+    def __init__(self, prompts_dir: Optional[Path] = None, max_scenes: int = 4096):
+        self.prompts_dir = Path(prompts_dir or PROMPTS_DIR)
+        self.max_scenes = max_scenes
+        self.generation = 0
+        self._lock = threading.Lock()
+        # name -> (mtime_ns, size, source, segments)
+        self._templates: dict[str, tuple[int, int, str, Segments]] = {}
+        self._scenes: OrderedDict[str, _CompiledEntry] = OrderedDict()
+
+    def _load(self, name: str) -> tuple[str, Segments]:
+        path = self.prompts_dir / name
+        st = os.stat(path)
+        cached = self._templates.get(name)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2], cached[3]
+        with self._lock:
+            source = path.read_text(encoding="utf-8")
+            segments = compile_template(source)
+            self._templates[name] = (st.st_mtime_ns, st.st_size, source, segments)
+            self.generation += 1
+        return source, segments
+
+    def seed(self, files: dict[str, list]) -> None:
+        """Pre-populate from compiled bundle entries ({filename: [mtime_ns, size, source]}); loads still check stats."""
+        with self._lock:
+            for name, (mtime_ns, size, source) in files.items():
+                if name not in self._templates:
+                    self._templates[name] = (mtime_ns, size, source, compile_template(source))
+
+    def source(self, name: str) -> str:
+        """Raw template text."""
+        return self._load(name)[0]
+
+    def _compile_scene(self, scene: dict, characters: list[dict]) -> _CompiledEntry:
+        constraints = scene.get("constraints", {})
+        constraints_segments = render_partial(
+            self._load("constraints.txt")[1],
+            {
+                "max_lines": constraints.get("max_lines", 10),
+                "subtext_over_text": constraints.get("subtext_over_text", True),
+                "no_exposition": constraints.get("no_exposition", True),
+                "forbidden_language": forbidden_language(scene, characters),
+            },
+        )
+        prompt_segments = render_partial(
+            self._load("base_scene.txt")[1],
+            {
+                "setting": scene.get("setting", ""),
+                "characters": ", ".join(scene.get("characters", [])),
+                "character_voices": format_character_voices(characters),
+                "beats": "\n".join(f"- {b}" for b in scene.get("beats", [])),
+                "emotional_state": ", ".join(scene.get("emotional_state", [])),
+                "constraints_block": constraints_segments,
+            },
+        )
+        return _CompiledEntry(
+            scene, tuple(characters), self.generation,
+            ScenePrompt(prompt_segments), ScenePrompt(constraints_segments),
+        )
+
+    def compile(self, scene: dict, characters: Optional[list[dict]] = None) -> _CompiledEntry:
+        """Return the compiled entry for a scene, recompiling if any input changed."""
+        characters = characters or []
+        # Stat templates first so an edited template bumps the generation.
+        self._load("base_scene.txt")
+        self._load("constraints.txt")
+        key = scene.get("scene_id", "")
+        entry = self._scenes.get(key)
+        if (
+            entry is not None
+            and entry.scene is scene
+            and entry.templates_generation == self.generation
+            and len(entry.characters) == len(characters)
+            and all(a is b for a, b in zip(entry.characters, characters))
+        ):
+            return entry
+        entry = self._compile_scene(scene, characters)
+        with self._lock:
+            self._scenes[key] = entry
+            self._scenes.move_to_end(key)
+            while len(self._scenes) > self.max_scenes:
+                self._scenes.popitem(last=False)
+        return entry
+
+    def build_prompt(
+        self,
+        scene: dict,
+        characters: Optional[list[dict]] = None,
+        emotional_intensity: float = 5.0,
+        emotional_distance: float = 5.0,
+        silence_density: float = 0.3,
+        context: Optional[str] = None,
+    ) -> str:
+        prompt = self.compile(scene, characters).prompt.render(
+            emotional_intensity, emotional_distance, silence_density
+        )
+        return with_context(prompt, context) if context else prompt
+
+    def format_constraints(
+        self,
+        scene: dict,
+        characters: Optional[list[dict]] = None,
+        emotional_intensity: float = 5.0,
+        emotional_distance: float = 5.0,
+        silence_density: float = 0.3,
+    ) -> str:
+        return self.compile(scene, characters).constraints.render(
+            emotional_intensity, emotional_distance, silence_density
+        )
+
+
+_compiler: Optional[PromptCompiler] = None
+_compiler_lock = threading.Lock()
+
+
+def get_prompt_compiler() -> PromptCompiler:
+    """Return the shared PromptCompiler for scripts/prompts/."""
+    global _compiler
+    with _compiler_lock:
+        if _compiler is None:
+            _compiler = PromptCompiler()
+            section = bundle_section("prompts", PROMPTS_DIR)
+            if section is not None:
+                _compiler.seed(section[1])
+        return _compiler
@@ -3,29 +3,19 @@ Replay mode for generated scenes.
 Line-by-line playback, adjustable pacing, optional pause on silence.
 """
 
-import re
 import sys
 import time
 from typing import Callable, Optional
 
-# Pattern: "D: ..." or "J: ..." — character lines
-LINE_PATTERN = re.compile(r"^([A-Za-z0-9_]+):\s*(.+)$")
+from engine.dialogue import LINE_PATTERN, Dialogue, as_dialogue, dialogue_of
 
 
-def parse_dialogue(text: str) -> list[tuple[str, str]]:
-    """Parse dialogue into (character, line) pairs."""
-    lines = []
-    for raw in text.strip().split("\n"):
-        raw = raw.strip()
-        if not raw:
-            continue
-        m = LINE_PATTERN.match(raw)
-        if m:
-            lines.append((m.group(1), m.group(2)))
-        else:
-            # Unmatched line — treat as continuation or narrator, use "?"
-            lines.append(("?", raw))
-    return lines
+def parse_dialogue(text: "str | Dialogue") -> list[tuple[str, str]]:
+    """
+    Parse dialogue into (character, line) pairs.
+    Unmatched lines (continuation or narrator) get character "?".
+    """
+    return as_dialogue(text).pairs()
 
 
 def _base_duration(line: str, words_per_min: int = 120) -> float:
@@ -47,7 +37,7 @@ def _silence_multiplier(line: str, silence_density: float) -> float:
 
 
 def replay(
-    text: str,
+    text: "str | Dialogue",
     on_line: Callable[[str, str, int, int], None],
     pace: float = 1.0,
     silence_density: float = 0.3,
@@ -69,7 +59,7 @@ def replay(
             time.sleep(delay)
 
 
-def replay_cli(text: str, pace: float = 1.0, silence_density: float = 0.3) -> None:
+def replay_cli(text: "str | Dialogue", pace: float = 1.0, silence_density: float = 0.3) -> None:
     """CLI: print lines to stdout with pacing."""
 
     def on_line(char: str, line: str, i: int, total: int) -> None:
@@ -123,9 +113,8 @@ def main():
         print(f"Version not found: {scene_id} / {version_id}", file=sys.stderr)
         sys.exit(1)
 
-    text = data.get("text", "")
     silence_density = data.get("emotional_params", {}).get("silence_density", 0.3)
-    replay_cli(text, pace=pace, silence_density=silence or silence_density)
+    replay_cli(dialogue_of(data), pace=pace, silence_density=silence or silence_density)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,276 @@
+"""
+Priority-aware scheduling for model calls.
+Every call_model variant takes a slot from the shared ModelScheduler: slots are
+granted strictly by priority class (interactive before prefetch before batch),
+subject to in-flight, requests-per-minute and tokens-per-minute limits, and all
+classes pause together after a provider 429.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Iterator, Optional
+
+
+class ModelRateLimited(RuntimeError):
+    """Provider 429s persisted through every retry."""
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BATCH = 2
+
+
+def estimate_tokens(prompt: str, completion_budget: int = 512) -> int:
+    """Rough token charge for a request: ~4 chars per prompt token plus a completion budget."""
+    return len(prompt) // 4 + completion_budget
+
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second, up to capacity."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact; may go negative."""
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "enqueued", "granted", "cancelled", "event", "loop", "future")
+
+    def __init__(self, priority: Priority, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ModelScheduler:
+    """
+    Thread- and event-loop-safe slot scheduler. Limits left as None are unlimited.
+    Use `with scheduler.slot(priority, tokens):` or `async with scheduler.aslot(...)`.
+    """
+
+    def __init__(
+        self,
+        max_inflight: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_backoff: float = 60.0,
+    ):
+        self.max_inflight = max_inflight
+        self.max_backoff = max_backoff
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._inflight = 0
+        self._paused_until = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._timer_at: Optional[float] = None
+        self._consecutive_429 = 0
+        self._waits = {p: [0, 0.0, 0.0] for p in Priority}  # count, total seconds, max seconds
+        self.rate_limited_count = 0
+
+    def _dispatch(self) -> None:
+        """Grant head-of-queue waiters while limits allow; if rate-blocked, arm a timer to retry."""
+        now = time.monotonic()
+        while self._heap:
+            waiter = self._heap[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if self.max_inflight is not None and self._inflight >= self.max_inflight:
+                return  # the next release() dispatches again
+            wait = max(
+                self._paused_until - now,
+                self._requests.delay(1, now) if self._requests else 0.0,
+                self._tokens.delay(waiter.tokens, now) if self._tokens else 0.0,
+            )
+            if wait > 0:
+                self._arm_timer(now + wait)
+                return
+            heapq.heappop(self._heap)
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(waiter.tokens)
+            self._inflight += 1
+            waited = now - waiter.enqueued
+            stats = self._waits[waiter.priority]
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+            waiter.granted = True
+            waiter.wake()
+
+    def _arm_timer(self, deadline: float) -> None:
+        if self._timer_at is not None and self._timer_at <= deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(0.0, deadline - time.monotonic()), self._on_timer)
+        self._timer.daemon = True
+        self._timer_at = deadline
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._timer_at = None
+            self._dispatch()
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (int(waiter.priority), next(self._seq), waiter))
+            self._dispatch()
+
+    def release(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+            self._dispatch()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            waiter.cancelled = True
+            if waiter.granted:
+                self._inflight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.INTERACTIVE, tokens: int = 0) -> Iterator[None]:
+        """Blocking acquire for synchronous callers."""
+        waiter = _Waiter(priority, tokens)
+        waiter.event = threading.Event()
+        self._enqueue(waiter)
+        try:
+            waiter.event.wait()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, priority: Priority = Priority.INTERACTIVE, tokens: int = 0) -> AsyncIterator[None]:
+        """Async acquire; cancellation while queued gives the place up."""
+        waiter = _Waiter(priority, tokens)
+        waiter.loop = asyncio.get_running_loop()
+        waiter.future = waiter.loop.create_future()
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_usage(self, estimated: int, actual: Optional[int]) -> None:
+        """Reconcile the token charge with the provider-reported usage; resets 429 backoff."""
+        with self._lock:
+            self._consecutive_429 = 0
+            if self._tokens and actual is not None:
+                self._tokens.adjust(actual - estimated)
+
+    def rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """A provider 429: pause every class for retry_after or exponential backoff. Returns the pause."""
+        with self._lock:
+            self.rate_limited_count += 1
+            self._consecutive_429 += 1
+            if retry_after is None:
+                backoff = min(self.max_backoff, 2 ** (self._consecutive_429 - 1))
+                retry_after = backoff * (0.5 + random.random() / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._dispatch()
+            return retry_after
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and wait time per priority class, in flight, limits, 429 state."""
+        with self._lock:
+            depth = {p.name.lower(): 0 for p in Priority}
+            for _, _, waiter in self._heap:
+                if not waiter.cancelled:
+                    depth[waiter.priority.name.lower()] += 1
+            return {
+                "queue_depth": depth,
+                "wait_seconds": {
+                    p.name.lower(): {"count": c, "total": round(t, 4), "max": round(m, 4)}
+                    for p, (c, t, m) in self._waits.items()
+                },
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+                "requests_per_minute": self._requests.rate * 60 if self._requests else None,
+                "tokens_per_minute": self._tokens.rate * 60 if self._tokens else None,
+                "rate_limited": self.rate_limited_count,
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            }
+
+
+_scheduler: Optional[ModelScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ModelScheduler:
+    """
+    Shared scheduler. In-flight limit is ModelConfig.max_concurrency.
+    Env: LIVINGSCRIPT_RPM, LIVINGSCRIPT_TPM (unset = unlimited).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from engine.client import get_config
+            rpm = os.environ.get("LIVINGSCRIPT_RPM")
+            tpm = os.environ.get("LIVINGSCRIPT_TPM")
+            _scheduler = ModelScheduler(
+                max_inflight=get_config().max_concurrency,
+                requests_per_minute=float(rpm) if rpm else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+            )
+        return _scheduler
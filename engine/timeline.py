@@ -0,0 +1,131 @@
+"""
+Scene evolution across versions ("blame").
+Walks a scene's versions oldest to newest, diffing each against the previous one,
+and records for every dialogue line the version where it appeared and the one where
+it disappeared, plus the emotional_shift series. Timelines are cached per scene and
+extended with only the versions saved since the last call.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from engine.dialogue import dialogue_of
+from engine.diff import _intern, _opcodes, emotional_shift
+from engine.memory import list_versions, list_versions_since, load_version
+
+
+class SceneTimeline:
+    """Line lifetimes and emotional shifts for one scene, built incrementally."""
+
+    def __init__(self, scene_id: str):
+        self.scene_id = scene_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.versions: list[dict[str, Any]] = []
+        self.lines: list[dict[str, Any]] = []
+        self._table: dict[str, int] = {}
+        self._live: list[int] = []  # indexes into self.lines, in the latest version's order
+        self._live_ids: list[int] = []
+        self._params: dict[str, float] = {}
+        self._seq: Optional[int] = None  # highest store commit number added
+
+    def add(self, version: dict[str, Any]) -> None:
+        """Extend with the next version (full record, including text)."""
+        version_id = version["version_id"]
+        lines = dialogue_of(version).lines()
+        ids = _intern(lines, self._table)
+        live = []
+        for tag, i1, i2, j1, j2 in _opcodes(self._live_ids, ids):
+            if tag == "equal":
+                live.extend(self._live[i1:i2])
+                continue
+            for index in self._live[i1:i2]:
+                self.lines[index]["disappeared"] = version_id
+            for text in lines[j1:j2]:
+                live.append(len(self.lines))
+                self.lines.append({"text": text, "appeared": version_id, "disappeared": None})
+        self._live, self._live_ids = live, ids
+
+        params = version.get("emotional_params", {})
+        self.versions.append({
+            "version_id": version_id,
+            "timestamp": version["timestamp"],
+            "parent_version_id": version.get("parent_version_id"),
+            "emotional_params": params,
+            "emotional_shift": emotional_shift(self._params, params) if self.versions else [],
+        })
+        self._params = params
+
+    def refresh(self) -> None:
+        """
+        Add the versions stored since the last refresh (by store commit number). A
+        version written late with a timestamp before ones already added (group
+        commit) rebuilds the timeline.
+        """
+        with self._lock:
+            newer = list_versions_since(self.scene_id, self._seq)
+            if not newer:
+                return
+            if self.versions and min(v["timestamp"] for v in newer) < self.versions[-1]["timestamp"]:
+                self._reset()
+                newer = list_versions_since(self.scene_id)
+            # Same order as list_versions: timestamp, ties in write order.
+            newer.sort(key=lambda v: (v["timestamp"], v["seq"]))
+            for meta in newer:
+                version = load_version(self.scene_id, meta["version_id"])
+                if version is not None:
+                    self.add(version)
+            self._seq = max(v["seq"] for v in newer)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "scene_id": self.scene_id,
+                "versions": [dict(v) for v in self.versions],
+                "lines": [dict(line) for line in self.lines],
+                "current": list(self._live),
+            }
+
+
+_timelines: OrderedDict[str, SceneTimeline] = OrderedDict()
+_timelines_lock = threading.Lock()
+MAX_CACHED_TIMELINES = 64
+
+
+def get_timeline(scene_id: str) -> SceneTimeline:
+    """Cached timeline for a scene, brought up to date with its stored versions."""
+    with _timelines_lock:
+        timeline = _timelines.get(scene_id)
+        if timeline is None:
+            timeline = _timelines[scene_id] = SceneTimeline(scene_id)
+        _timelines.move_to_end(scene_id)
+        while len(_timelines) > MAX_CACHED_TIMELINES:
+            _timelines.popitem(last=False)
+    timeline.refresh()
+    return timeline
+
+
+def scene_timeline(
+    scene_id: str,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Evolution of a scene, oldest version first:
+    {"scene_id", "versions": [{version_id, timestamp, parent_version_id, emotional_params,
+    emotional_shift}], "lines": [{text, appeared, disappeared}], "current": [line indexes
+    of the newest version, in order]}. A line's disappeared is None while it is live.
+    after/before (list_versions cursors) restrict it to a range of versions; ranged
+    timelines are computed on demand rather than cached.
+    """
+    if after is None and before is None:
+        return get_timeline(scene_id).to_dict()
+    timeline = SceneTimeline(scene_id)
+    for meta in reversed(list_versions(scene_id, after=after, before=before)):
+        version = load_version(scene_id, meta["version_id"])
+        if version is not None:
+            timeline.add(version)
+    return timeline.to_dict()
@@ -0,0 +1,376 @@
+"""
+Path enumeration, counting and structural queries over the scene graph.
+Scenes are compiled to integer ids with successor lists; enumeration is an
+iterative DFS that tracks the current path as a bitset, and counting runs a DP over
+the strongly-connected-component condensation, so it never enumerates paths.
+GraphIndex adds reverse adjacency, reachability bitsets, BFS distances and
+dead-end / orphan sets, kept up to date by the SceneStore as scene files change.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Iterator, Optional
+
+
+class CompiledGraph:
+    """
+    Scene graph as integer adjacency. succ[v] keeps transition order and
+    multiplicity; a target that is not a known scene is -1.
+    """
+
+    __slots__ = ("ids", "index", "succ", "_components")
+
+    def __init__(self, scenes: dict[str, dict]):
+        self.ids = list(scenes)
+        self.index = {sid: i for i, sid in enumerate(self.ids)}
+        self.succ: list[list[int]] = []
+        for sid in self.ids:
+            transitions = scenes[sid].get("transitions", [])
+            self.succ.append([self.index.get(t["target"], -1) for t in transitions if t.get("target")])
+        self._components: Optional[tuple[list[int], list[list[int]]]] = None
+
+    def copy(self) -> "CompiledGraph":
+        """Same ids; successor lists copied at the top level, so replacing succ[v] leaves this graph untouched."""
+        graph = CompiledGraph.__new__(CompiledGraph)
+        graph.ids, graph.index, graph.succ = self.ids, self.index, list(self.succ)
+        graph._components = self._components
+        return graph
+
+    def components(self) -> tuple[list[int], list[list[int]]]:
+        """
+        Tarjan's SCCs, iteratively: (component id per node, components in reverse
+        topological order — every edge leaves a component for an earlier one).
+        """
+        if self._components is not None:
+            return self._components
+        n = len(self.ids)
+        succ = self.succ
+        order = [-1] * n
+        low = [0] * n
+        comp = [-1] * n
+        on_stack = [False] * n
+        stack: list[int] = []
+        comps: list[list[int]] = []
+        counter = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                v, i = work[-1]
+                edges = succ[v]
+                if i < len(edges):
+                    work[-1] = (v, i + 1)
+                    t = edges[i]
+                    if t < 0:
+                        continue
+                    if order[t] == -1:
+                        order[t] = low[t] = counter
+                        counter += 1
+                        stack.append(t)
+                        on_stack[t] = True
+                        work.append((t, 0))
+                    elif on_stack[t]:
+                        low[v] = min(low[v], order[t])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == order[v]:
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp[w] = len(comps)
+                        members.append(w)
+                        if w == v:
+                            break
+                    comps.append(members)
+        self._components = (comp, comps)
+        return self._components
+
+
+def iter_paths(
+    scenes: "dict[str, dict] | CompiledGraph",
+    start_id: str,
+    max_depth: Optional[int] = None,
+    max_paths: Optional[int] = None,
+    path: Optional[list[str]] = None,
+) -> Iterator[list[str]]:
+    """
+    Lazily yield the paths traverse() returns, in the same order: each ends at a
+    dead end, or with "<id> (loop)" where it would revisit a scene on the path;
+    transitions to unknown scenes are skipped. max_depth caps path length in scenes
+    (longer paths are yielded cut at that length); max_paths stops after that many.
+    path is the route already taken to start_id (default [start_id]).
+    """
+    graph = scenes if isinstance(scenes, CompiledGraph) else CompiledGraph(scenes)
+    start = graph.index.get(start_id)
+    if start is None or max_paths == 0:
+        return
+    ids, succ, index = graph.ids, graph.succ, graph.index
+    prefix = list(path or [start_id])
+    if not succ[start]:
+        yield prefix
+        return
+    on_path = 0
+    for sid in prefix:
+        if sid in index:
+            on_path |= 1 << index[sid]
+    emitted = 0
+    stack = [start]  # stack[1:] are the scenes appended after prefix
+    positions = [0]
+    while stack:
+        v = stack[-1]
+        i = positions[-1]
+        edges = succ[v]
+        if i >= len(edges):
+            stack.pop()
+            positions.pop()
+            if stack:
+                on_path &= ~(1 << v)
+            continue
+        positions[-1] = i + 1
+        t = edges[i]
+        if t < 0:
+            continue
+        if on_path >> t & 1:
+            tail = f"{ids[t]} (loop)"
+        elif not succ[t] or (max_depth is not None and len(prefix) + len(stack) >= max_depth):
+            tail = ids[t]
+        else:
+            stack.append(t)
+            positions.append(0)
+            on_path |= 1 << t
+            continue
+        found = prefix + [ids[x] for x in stack[1:]]
+        found.append(tail)
+        yield found
+        emitted += 1
+        if max_paths is not None and emitted >= max_paths:
+            return
+
+
+def count_paths(scenes: "dict[str, dict] | CompiledGraph", start_id: str) -> int:
+    """
+    Number of routes from start_id without enumerating them: a DP over the SCC
+    condensation, where a cycle counts as a single step and a route ends at a dead
+    end or at a cycle with no way out. On acyclic graphs this is len(traverse(...)).
+    """
+    graph = scenes if isinstance(scenes, CompiledGraph) else CompiledGraph(scenes)
+    start = graph.index.get(start_id)
+    if start is None:
+        return 0
+    comp, comps = graph.components()
+    succ = graph.succ
+    counts = [0] * len(comps)
+    for c, members in enumerate(comps):  # sinks first
+        v = members[0]
+        if len(members) == 1 and v not in succ[v]:
+            counts[c] = 1 if not succ[v] else sum(counts[comp[t]] for t in succ[v] if t >= 0)
+            continue
+        exits = [comp[t] for v in members for t in succ[v] if t >= 0 and comp[t] != c]
+        counts[c] = sum(counts[e] for e in exits) if exits else 1
+    return counts[comp[start]]
+
+
+def _scene_succ(scene: dict, index: dict[str, int]) -> list[int]:
+    return [index.get(t["target"], -1) for t in scene.get("transitions", []) if t.get("target")]
+
+
+class GraphIndex:
+    """
+    Query index over a CompiledGraph. Reachability is one bitset per scene (bit v
+    set if v can be reached, the scene itself included), computed over the SCC
+    condensation; BFS distances are cached per start scene. An index is never
+    modified once published: updated() returns a new one with changed scenes applied,
+    so concurrent readers keep a consistent view. Added edges that close no cycle
+    extend the bitsets directly, anything else recomputes them on next use.
+    """
+
+    def __init__(self, scenes: dict[str, dict]):
+        self.graph = CompiledGraph(scenes)
+        self.pred: list[list[int]] = [[] for _ in self.graph.ids]
+        for v, edges in enumerate(self.graph.succ):
+            for t in edges:
+                if t >= 0:
+                    self.pred[t].append(v)
+        self._reach: Optional[list[int]] = None
+        self._distances: dict[int, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def updated(self, scenes: dict[str, dict], changed: set[str]) -> "GraphIndex":
+        """
+        A new index with the changed scenes applied (copy-on-write: this one is left
+        as is). Adding, removing or renaming scenes rebuilds.
+        """
+        graph = self.graph
+        if len(scenes) != len(graph.ids) or any(sid not in graph.index for sid in scenes):
+            return GraphIndex(scenes)
+        index = GraphIndex.__new__(GraphIndex)
+        index.graph = graph.copy()
+        index.pred = list(self.pred)
+        index._reach = self._reach
+        index._distances = dict(self._distances)
+        index._lock = threading.Lock()
+        succ, pred = index.graph.succ, index.pred
+        for sid in changed:
+            if sid not in scenes:
+                continue
+            v = graph.index[sid]
+            old, new = succ[v], _scene_succ(scenes[sid], graph.index)
+            if old == new:
+                continue
+            succ[v] = new
+            index.graph._components = None
+            index._distances.clear()
+            for t in {t for t in old + new if t >= 0}:
+                pred[t] = list(pred[t])  # the previous index still shares the old list
+            for t in old:
+                if t >= 0:
+                    pred[t].remove(v)
+            for t in new:
+                if t >= 0:
+                    pred[t].append(v)
+            if index._reach is None:
+                continue
+            old_targets = {t for t in old if t >= 0}
+            new_targets = {t for t in new if t >= 0}
+            if old_targets - new_targets:
+                index._reach = None  # removals can shrink closures anywhere upstream
+                continue
+            for t in new_targets - old_targets:
+                if index._reach is None:
+                    break
+                if index._reach[t] >> v & 1:
+                    index._reach = None  # the new edge closes a cycle
+                    break
+                extra = index._reach[t]
+                bit = 1 << v
+                index._reach = [r | extra if r & bit else r for r in index._reach]
+        return index
+
+    # -- queries --------------------------------------------------------------
+
+    def _ids(self, nodes) -> list[str]:
+        ids = self.graph.ids
+        return [ids[v] for v in nodes]
+
+    def _node(self, scene_id: str) -> int:
+        try:
+            return self.graph.index[scene_id]
+        except KeyError:
+            raise KeyError(f"Unknown scene: {scene_id}") from None
+
+    def successors(self, scene_id: str) -> list[str]:
+        return self._ids(dict.fromkeys(t for t in self.graph.succ[self._node(scene_id)] if t >= 0))
+
+    def predecessors(self, scene_id: str) -> list[str]:
+        return self._ids(dict.fromkeys(self.pred[self._node(scene_id)]))
+
+    def reach(self) -> list[int]:
+        """Reachability bitset per scene."""
+        with self._lock:
+            if self._reach is None:
+                self._reach = self._compute_reach()
+            return self._reach
+
+    def _compute_reach(self) -> list[int]:
+        comp, comps = self.graph.components()
+        succ = self.graph.succ
+        by_comp = [0] * len(comps)
+        for c, members in enumerate(comps):  # sinks first
+            bits = 0
+            for v in members:
+                bits |= 1 << v
+                for t in succ[v]:
+                    if t >= 0 and comp[t] != c:
+                        bits |= by_comp[comp[t]]
+            by_comp[c] = bits
+        return [by_comp[comp[v]] for v in range(len(succ))]
+
+    def reachable(self, source: str, target: str) -> bool:
+        return bool(self.reach()[self._node(source)] >> self._node(target) & 1)
+
+    def reachable_from(self, source: str) -> list[str]:
+        bits = self.reach()[self._node(source)]
+        return self._ids(v for v in range(len(self.graph.ids)) if bits >> v & 1)
+
+    def distances(self, start: str) -> dict[str, int]:
+        """BFS hop counts from start to every reachable scene."""
+        dist = self._bfs(self._node(start))
+        ids = self.graph.ids
+        return {ids[v]: d for v, d in enumerate(dist) if d >= 0}
+
+    def _bfs(self, start: int) -> list[int]:
+        dist = self._distances.get(start)
+        if dist is None:
+            succ = self.graph.succ
+            dist = [-1] * len(succ)
+            dist[start] = 0
+            queue = deque([start])
+            while queue:
+                v = queue.popleft()
+                for t in succ[v]:
+                    if t >= 0 and dist[t] < 0:
+                        dist[t] = dist[v] + 1
+                        queue.append(t)
+            self._distances[start] = dist
+        return dist
+
+    def shortest_path(self, source: str, target: Optional[str] = None) -> Optional[list[str]]:
+        """Fewest-transition route from source to target (default: the nearest dead end)."""
+        start = self._node(source)
+        dist = self._bfs(start)
+        if target is None:
+            ends = [v for v in self._dead_end_nodes() if dist[v] >= 0]
+            if not ends:
+                return None
+            goal = min(ends, key=lambda v: dist[v])
+        else:
+            goal = self._node(target)
+            if dist[goal] < 0:
+                return None
+        route = [goal]
+        while route[-1] != start:
+            v = route[-1]
+            route.append(next(p for p in self.pred[v] if dist[p] == dist[v] - 1))
+        route.reverse()
+        return self._ids(route)
+
+    def _dead_end_nodes(self) -> list[int]:
+        return [v for v, edges in enumerate(self.graph.succ) if not any(t >= 0 for t in edges)]
+
+    def dead_ends(self) -> list[str]:
+        """Scenes with no transition to an existing scene (endings, or broken links)."""
+        return self._ids(self._dead_end_nodes())
+
+    def orphans(self) -> list[str]:
+        """Scenes no other scene transitions to."""
+        return self._ids(v for v, preds in enumerate(self.pred) if not any(p != v for p in preds))
+
+    def unreachable(self, start: str) -> list[str]:
+        bits = self.reach()[self._node(start)]
+        return self._ids(v for v in range(len(self.graph.ids)) if not bits >> v & 1)
+
+    def summary(self, start: Optional[str] = None) -> dict[str, Any]:
+        """Everything the graph panel needs, relative to start (default: first scene)."""
+        ids = self.graph.ids
+        start = start if start is not None else (ids[0] if ids else None)
+        result: dict[str, Any] = {
+            "start": start,
+            "dead_ends": self.dead_ends(),
+            "orphans": self.orphans(),
+            "predecessors": {sid: self._ids(dict.fromkeys(self.pred[v])) for v, sid in enumerate(ids)},
+        }
+        if start is not None:
+            result["distances"] = self.distances(start)
+            result["unreachable"] = self.unreachable(start)
+            result["path_count"] = count_paths(self.graph, start)
+            result["nearest_ending"] = self.shortest_path(start)
+        return result
@@ -3,59 +3,245 @@ Post-generation validation. Checks beats, line count, forbidden words.
 Returns validation result; triggers retry if invalid.
 """
 
-import re
+import threading
+from collections import OrderedDict, deque
 from typing import Any
 
-# Character line pattern: "D: ..." or "J: ..."
-LINE_PATTERN = re.compile(r"^[A-Za-z0-9_]+:\s*.+$")
+from engine.dialogue import LINE_PATTERN, Dialogue, as_dialogue
 
 
-def _dialogue_lines(text: str) -> list[str]:
+def _dialogue_lines(text: "str | Dialogue") -> list[str]:
     """Extract dialogue lines (character: line) from text."""
-    return [l.strip() for l in text.strip().split("\n") if l.strip() and LINE_PATTERN.match(l.strip())]
+    return as_dialogue(text).dialogue_lines()
+
+
+def _forbidden_phrases(scene: dict, characters: list[dict] | None = None) -> list[str]:
+    """Lowercased forbidden phrases from the scene and its characters."""
+    forbidden = list(scene.get("constraints", {}).get("forbidden_words", []))
+    if characters:
+        for c in characters:
+            forbidden.extend(c.get("forbidden_expressions", []))
+    return [f.lower() for f in forbidden if f]
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over lowercased patterns: one pass over the text finds
+    every occurrence of every pattern. Patterns flagged `bounded` only match as whole
+    words (no letter, digit or underscore right before or after a word-character edge).
+    """
+
+    def __init__(self, patterns: list[str], bounded: list[bool]):
+        self.patterns = patterns
+        self._starts_word = [b and _is_word(p[0]) for p, b in zip(patterns, bounded)]
+        self._ends_word = [b and _is_word(p[-1]) for p, b in zip(patterns, bounded)]
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(index)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def finditer(self, text: str):
+        """Yield (pattern_index, start, end) for each match in `text` (already lowercased)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for index in out[state]:
+                start = i + 1 - len(self.patterns[index])
+                if self._starts_word[index] and start > 0 and _is_word(text[start - 1]):
+                    continue
+                if self._ends_word[index] and i + 1 < n and _is_word(text[i + 1]):
+                    continue
+                yield index, start, i + 1
+
+
+class CompiledValidator:
+    """
+    validate() for one scene + cast, compiled once: forbidden phrases (whole-word)
+    and beat keywords (substring, as before) share a single automaton, so a text is
+    scanned once however many phrases there are.
+    """
+
+    def __init__(self, scene: dict, characters: list[dict] | None = None):
+        self.scene = scene
+        self.characters = tuple(characters or ())
+        self.max_lines = scene.get("constraints", {}).get("max_lines", 999)
+        self.forbidden = _forbidden_phrases(scene, characters)
+        patterns: dict[tuple[str, bool], int] = {}
+        self._forbidden_ids = [patterns.setdefault((p, True), len(patterns)) for p in self.forbidden]
+        self._beats = []
+        for beat in scene.get("beats", []):
+            words = [w for w in beat.lower().split() if len(w) > 2]
+            self._beats.append((beat, [patterns.setdefault((w, False), len(patterns)) for w in words]))
+        self.matcher = PhraseMatcher([p for p, _ in patterns], [b for _, b in patterns])
+        self._is_forbidden = [b for _, b in patterns]
+
+    def matches(self, text: str) -> tuple[set[int], list[dict[str, Any]]]:
+        """Pattern ids found, and forbidden-phrase matches with positions in `text`."""
+        found: set[int] = set()
+        hits = []
+        for index, start, end in self.matcher.finditer(text.lower()):
+            found.add(index)
+            if self._is_forbidden[index]:
+                hits.append({"phrase": self.matcher.patterns[index], "start": start, "end": end})
+        return found, hits
+
+    def forbidden_in(self, text: str) -> list[str]:
+        """Forbidden phrases occurring in `text`, in constraint order."""
+        found, _ = self.matches(text)
+        return [phrase for phrase, i in zip(self.forbidden, self._forbidden_ids) if i in found]
+
+    def validate(self, text: "str | Dialogue") -> dict[str, Any]:
+        errors = []
+        warnings = []
+        dialogue = as_dialogue(text)
+        line_count = dialogue.line_count
+
+        # Max lines
+        if line_count > self.max_lines:
+            errors.append(f"Too many lines: {line_count} (max {self.max_lines})")
+
+        found, hits = self.matches(dialogue.source)
+
+        # Beats (soft check - any keyword of the beat appears somewhere)
+        for beat, word_ids in self._beats:
+            if not any(i in found for i in word_ids):
+                warnings.append(f"Beat '{beat}' may be missing or weakly represented")
+
+        # Forbidden expressions (from characters and scene)
+        for phrase, i in zip(self.forbidden, self._forbidden_ids):
+            if i in found:
+                errors.append(f"Forbidden phrase: '{phrase}'")
+
+        return {
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings,
+            "line_count": line_count,
+            "matches": hits,
+        }
+
+
+_compiled: OrderedDict[str, CompiledValidator] = OrderedDict()
+_compiled_lock = threading.Lock()
+MAX_COMPILED = 1024
+
+
+def compile_validator(scene: dict, characters: list[dict] | None = None) -> CompiledValidator:
+    """
+    Cached CompiledValidator for a scene. Reused while the scene dict and character
+    dicts are the same objects (the scene store and character registry replace
+    them when their files change).
+    """
+    key = scene.get("scene_id", "")
+    cast = tuple(characters or ())
+    with _compiled_lock:
+        entry = _compiled.get(key)
+        if (
+            entry is not None
+            and entry.scene is scene
+            and len(entry.characters) == len(cast)
+            and all(a is b for a, b in zip(entry.characters, cast))
+        ):
+            _compiled.move_to_end(key)
+            return entry
+    entry = CompiledValidator(scene, characters)
+    with _compiled_lock:
+        _compiled[key] = entry
+        _compiled.move_to_end(key)
+        while len(_compiled) > MAX_COMPILED:
+            _compiled.popitem(last=False)
+    return entry
 
 
 def validate(
-    text: str,
+    text: "str | Dialogue",
     scene: dict,
     characters: list[dict] | None = None,
 ) -> dict[str, Any]:
     """
     Validate generated dialogue against scene constraints.
-    Returns {"valid": bool, "errors": list[str], "warnings": list[str]}.
-    """
-    errors = []
-    warnings = []
-    lines = _dialogue_lines(text)
-
-    # Max lines
-    max_lines = scene.get("constraints", {}).get("max_lines", 999)
-    if len(lines) > max_lines:
-        errors.append(f"Too many lines: {len(lines)} (max {max_lines})")
-
-    # Beats (soft check - look for keywords)
-    beats = scene.get("beats", [])
-    text_lower = text.lower()
-    for beat in beats:
-        # Simple keyword presence - beat words should appear somewhere
-        words = beat.lower().split()
-        if not any(w in text_lower for w in words if len(w) > 2):
-            warnings.append(f"Beat '{beat}' may be missing or weakly represented")
-
-    # Forbidden expressions (from characters and scene)
-    forbidden = list(scene.get("constraints", {}).get("forbidden_words", []))
-    if characters:
-        for c in characters:
-            forbidden.extend(c.get("forbidden_expressions", []))
-    forbidden = [f.lower() for f in forbidden if f]
-
-    for phrase in forbidden:
-        if phrase.lower() in text.lower():
-            errors.append(f"Forbidden phrase: '{phrase}'")
-
-    return {
-        "valid": len(errors) == 0,
-        "errors": errors,
-        "warnings": warnings,
-        "line_count": len(lines),
-    }
+    Returns {"valid": bool, "errors": list[str], "warnings": list[str], "line_count": int,
+    "matches": [{"phrase", "start", "end"}]} (forbidden-phrase positions in text).
+    """
+    return compile_validator(scene, characters).validate(text)
+
+
+class IncrementalValidator:
+    """
+    Hard-constraint checks (line count, forbidden phrases) run one completed line
+    at a time while output streams in. feed() returns newly completed lines;
+    `errors` becomes non-empty as soon as a constraint is broken.
+    """
+
+    def __init__(self, scene: dict, characters: list[dict] | None = None):
+        self.compiled = compile_validator(scene, characters)
+        self.max_lines = self.compiled.max_lines
+        self.line_count = 0
+        self.errors: list[str] = []
+        self._parts: list[str] = []
+        self._pending = ""
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add streamed text. Returns the non-empty lines completed by this chunk."""
+        self._parts.append(chunk)
+        *complete, self._pending = (self._pending + chunk).split("\n")
+        return self._check(complete)
+
+    def flush(self) -> list[str]:
+        """End of stream: check the trailing partial line."""
+        pending, self._pending = self._pending, ""
+        return self._check([pending])
+
+    def _check(self, raw_lines: list[str]) -> list[str]:
+        lines = []
+        for raw in raw_lines:
+            line = raw.strip()
+            if not line:
+                continue
+            lines.append(line)
+            if LINE_PATTERN.match(line):
+                self.line_count += 1
+                if self.line_count == self.max_lines + 1:
+                    self.errors.append(f"Too many lines: {self.line_count} (max {self.max_lines})")
+            for phrase in self.compiled.forbidden_in(line):
+                self.errors.append(f"Forbidden phrase: '{phrase}'")
+        return lines
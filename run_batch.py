@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""CLI entry point for parameter-sweep batch runs. Run from project root."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).resolve().parent / ".env")
+from engine.batch import main
+main()
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""CLI entry point for the benchmark suite. Run from project root."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from benchmarks.suite import main
+main()
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""Import the legacy data/versions/ JSON tree into the SQLite version store. Run from project root."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from engine.memory import main
+main()
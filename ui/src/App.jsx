@@ -97,6 +97,7 @@ export default function App() {
           <ControlPanel
             scene={selectedScene}
             onRegenerate={handleRegenerate}
+            onPartial={setDialogue}
             onReplay={() => setShowReplay(true)}
             hasDialogue={!!dialogue}
           />
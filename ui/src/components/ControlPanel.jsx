@@ -1,16 +1,38 @@
-import React, { useState } from 'react'
+import React, { useEffect, useState } from 'react'
 
-export default function ControlPanel({ scene, onRegenerate, onReplay, hasDialogue }) {
+// Identifies this browser tab to the prefetcher, so clients don't cancel each other's prefetches.
+const SESSION_ID = globalThis.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`
+
+export default function ControlPanel({ scene, onRegenerate, onPartial, onReplay, hasDialogue }) {
   const [tension, setTension] = useState(0.5)
   const [distance, setDistance] = useState(0.5)
   const [silence, setSilence] = useState(0.3)
   const [loading, setLoading] = useState(false)
+  // Same scene and sliders replay the cached take; "fresh" (or shift-click) asks the model again.
+  const [fresh, setFresh] = useState(false)
+
+  // Ask the server to pre-generate likely next scenes at the current slider values.
+  useEffect(() => {
+    if (!scene) return
+    fetch('/api/prefetch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        scene_id: scene.scene_id,
+        tension,
+        emotional_distance: distance,
+        silence_density: silence,
+        session: SESSION_ID,
+      }),
+    }).catch(() => {})
+  }, [scene?.scene_id])
 
-  const handleRegenerate = async () => {
+  const handleRegenerate = async (e) => {
     if (!scene) return
+    const bypassCache = fresh || Boolean(e?.shiftKey)
     setLoading(true)
     try {
-      const res = await fetch('/api/generate', {
+      const res = await fetch('/api/generate/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -18,10 +40,38 @@ export default function ControlPanel({ scene, onRegenerate, onReplay, hasDialogu
           tension,
           emotional_distance: distance,
           silence_density: silence,
+          bypass_cache: bypassCache,
         }),
       })
-      const data = await res.json()
-      onRegenerate?.(data)
+      // Server-sent events: show lines as they arrive, reset on retry, finish on done.
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let lines = []
+      let result = null
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const events = buffer.split('\n\n')
+        buffer = events.pop()
+        for (const raw of events) {
+          const data = raw.split('\n').find((l) => l.startsWith('data: '))
+          if (!data) continue
+          const event = JSON.parse(data.slice(6))
+          if (event.event === 'attempt') {
+            lines = []
+          } else if (event.event === 'line') {
+            lines = [...lines, event.line]
+            onPartial?.(lines.join('\n'))
+          } else if (event.event === 'done') {
+            result = event.result
+          } else if (event.event === 'error') {
+            result = { error: event.error, dialogue: '' }
+          }
+        }
+      }
+      onRegenerate?.(result)
     } catch (e) {
       console.error(e)
       onRegenerate?.(null)
@@ -77,6 +127,15 @@ export default function ControlPanel({ scene, onRegenerate, onReplay, hasDialogu
           className="w-full accent-amber-600"
         />
       </div>
+      <label className="flex items-center gap-2 text-xs text-stone-500" title="Skip the cache and ask the model for a new take (or shift-click Regenerate)">
+        <input
+          type="checkbox"
+          checked={fresh}
+          onChange={(e) => setFresh(e.target.checked)}
+          className="accent-amber-600"
+        />
+        Fresh take
+      </label>
       <button
         onClick={handleRegenerate}
         disabled={loading}
@@ -2,6 +2,7 @@ import React, { useEffect, useState, useMemo } from 'react'
 
 export default function SceneGraph({ selectedScene, onSelectScene, pathHistory }) {
   const [scenes, setScenes] = useState([])
+  const [index, setIndex] = useState(null)
 
   useEffect(() => {
     fetch('/api/scenes')
@@ -10,8 +11,19 @@ export default function SceneGraph({ selectedScene, onSelectScene, pathHistory }
       .catch(() => setScenes([]))
   }, [])
 
+  useEffect(() => {
+    const params = selectedScene?.scene_id ? `?start=${encodeURIComponent(selectedScene.scene_id)}` : ''
+    fetch(`/api/graph${params}`)
+      .then((r) => r.json())
+      .then((data) => setIndex(data.error ? null : data))
+      .catch(() => setIndex(null))
+  }, [selectedScene?.scene_id])
+
   const selectedId = selectedScene?.scene_id
   const pathSet = new Set(pathHistory?.map((s) => s?.scene_id || s) || [])
+  const deadEnds = new Set(index?.dead_ends || [])
+  const orphans = new Set(index?.orphans || [])
+  const unreachable = new Set(index?.unreachable || [])
 
   // Build edges from transitions
   const edges = useMemo(() => {
@@ -78,19 +90,29 @@ export default function SceneGraph({ selectedScene, onSelectScene, pathHistory }
           if (!pos) return null
           const isSelected = scene.scene_id === selectedId
           const inPath = pathSet.has(scene.scene_id)
+          const distance = index?.distances?.[scene.scene_id]
+          const hints = [
+            deadEnds.has(scene.scene_id) && 'ending',
+            orphans.has(scene.scene_id) && 'orphan',
+            unreachable.has(scene.scene_id) && `unreachable from ${index?.start}`,
+            distance > 0 && `${distance} step${distance === 1 ? '' : 's'} from ${index?.start}`,
+          ].filter(Boolean)
           return (
             <g
               key={scene.scene_id}
               cursor="pointer"
               onClick={() => onSelectScene(scene)}
+              opacity={unreachable.has(scene.scene_id) ? 0.45 : 1}
             >
+              <title>{[scene.scene_id, ...hints].join(' · ')}</title>
               <circle
                 cx={pos.x}
                 cy={pos.y}
                 r={nodeRadius}
                 fill={isSelected ? 'rgb(217 119 6 / 0.4)' : inPath ? 'rgb(68 64 60)' : 'rgb(41 37 36)'}
-                stroke={isSelected ? 'rgb(245 158 11)' : 'rgb(87 83 78)'}
+                stroke={isSelected ? 'rgb(245 158 11)' : orphans.has(scene.scene_id) ? 'rgb(220 38 38)' : 'rgb(87 83 78)'}
                 strokeWidth={isSelected ? 2 : 1}
+                strokeDasharray={deadEnds.has(scene.scene_id) ? '3 2' : undefined}
               />
               <text
                 x={pos.x}
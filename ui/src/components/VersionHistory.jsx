@@ -1,5 +1,7 @@
 import React, { useEffect, useState } from 'react'
 
+const PAGE_SIZE = 50
+
 export default function VersionHistory({
   sceneId,
   selectedVersion,
@@ -11,17 +13,42 @@ export default function VersionHistory({
   refreshTrigger,
 }) {
   const [versions, setVersions] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [compareFrom, setCompareFrom] = useState(null)
   const [compareTo, setCompareTo] = useState(null)
 
+  const fetchPage = (before) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) })
+    if (before) params.set('before', before)
+    return fetch(`/api/versions/${sceneId}?${params}`).then(async (r) => ({
+      page: await r.json(),
+      cursor: r.headers.get('X-Next-Cursor'),
+    }))
+  }
+
   useEffect(() => {
     if (!sceneId) return
-    fetch(`/api/versions/${sceneId}`)
-      .then((r) => r.json())
-      .then(setVersions)
-      .catch(() => setVersions([]))
+    fetchPage(null)
+      .then(({ page, cursor }) => {
+        setVersions(page)
+        setNextCursor(cursor)
+      })
+      .catch(() => {
+        setVersions([])
+        setNextCursor(null)
+      })
   }, [sceneId, refreshTrigger])
 
+  const loadOlder = () => {
+    if (!nextCursor) return
+    fetchPage(nextCursor)
+      .then(({ page, cursor }) => {
+        setVersions((prev) => [...prev, ...(Array.isArray(page) ? page : [])])
+        setNextCursor(cursor)
+      })
+      .catch(() => setNextCursor(null))
+  }
+
   if (!sceneId) {
     return (
       <div className="p-3 text-stone-500 text-sm">
@@ -54,6 +81,14 @@ export default function VersionHistory({
             </button>
           ))
         )}
+        {nextCursor && (
+          <button
+            onClick={loadOlder}
+            className="w-full px-2 py-1 rounded text-xs text-stone-500 hover:bg-stone-800 hover:text-stone-300"
+          >
+            Load older…
+          </button>
+        )}
       </div>
       {list.length >= 2 && (
         <div className="border-t border-stone-700 pt-2 space-y-1">